@@ -1,9 +1,10 @@
 """
 Configuration settings for the Quantum Email Backend
 """
+import json
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 # Load environment variables from .env file
 try:
@@ -32,6 +33,48 @@ class Config:
     IMAP_USERNAME: str = os.getenv("IMAP_USERNAME", "")
     IMAP_PASSWORD: str = os.getenv("IMAP_PASSWORD", "")
     IMAP_USE_SSL: bool = os.getenv("IMAP_USE_SSL", "true").lower() == "true"
+    IMAP_FETCH_BATCH_SIZE: int = int(os.getenv("IMAP_FETCH_BATCH_SIZE", "100"))  # messages per FETCH command
+    
+    # Local Message Store (UID-based incremental sync)
+    MESSAGE_STORE_PATH: str = os.getenv("MESSAGE_STORE_PATH", str(Path(__file__).parent / "message_store.db"))
+    IMAP_SYNC_WINDOW: int = int(os.getenv("IMAP_SYNC_WINDOW", "500"))  # newest messages cached per folder
+    IMAP_FLAG_SYNC_INTERVAL: float = float(os.getenv("IMAP_FLAG_SYNC_INTERVAL", "60.0"))  # seconds between flag diffs
+    IMAP_CONDSTORE_ENABLED: bool = os.getenv("IMAP_CONDSTORE_ENABLED", "true").lower() == "true"  # use CONDSTORE/QRESYNC if offered
+    
+    # IMAP IDLE Push (new mail pushed to /events subscribers)
+    IMAP_IDLE_ENABLED: bool = os.getenv("IMAP_IDLE_ENABLED", "true").lower() == "true"
+    IMAP_IDLE_FOLDERS: List[str] = [f.strip() for f in os.getenv("IMAP_IDLE_FOLDERS", "INBOX").split(",") if f.strip()]
+    IMAP_IDLE_RENEW_INTERVAL: float = float(os.getenv("IMAP_IDLE_RENEW_INTERVAL", "1500.0"))  # re-issue IDLE, seconds
+    IMAP_IDLE_POLL_INTERVAL: float = float(os.getenv("IMAP_IDLE_POLL_INTERVAL", "0.5"))  # shutdown check, seconds
+    SSE_QUEUE_SIZE: int = int(os.getenv("SSE_QUEUE_SIZE", "100"))  # buffered events per subscriber
+    SSE_KEEPALIVE_INTERVAL: float = float(os.getenv("SSE_KEEPALIVE_INTERVAL", "15.0"))  # seconds
+    
+    # Sync Scheduler (background sync of several accounts and folders)
+    SYNC_ENABLED: bool = os.getenv("SYNC_ENABLED", "false").lower() == "true"
+    SYNC_FOLDERS: List[str] = [f.strip() for f in os.getenv("SYNC_FOLDERS", "INBOX").split(",") if f.strip()]
+    SYNC_INTERVAL: float = float(os.getenv("SYNC_INTERVAL", "300.0"))  # seconds between sync rounds
+    SYNC_MAX_CONCURRENCY: int = int(os.getenv("SYNC_MAX_CONCURRENCY", "8"))  # folder syncs in flight, all accounts
+    SYNC_ACCOUNT_CONNECTIONS: int = int(os.getenv("SYNC_ACCOUNT_CONNECTIONS", "2"))  # sessions per account
+    SYNC_THROTTLE_BACKOFF: float = float(os.getenv("SYNC_THROTTLE_BACKOFF", "5.0"))  # first pause when throttled, seconds
+    SYNC_THROTTLE_MAX_BACKOFF: float = float(os.getenv("SYNC_THROTTLE_MAX_BACKOFF", "300.0"))  # seconds
+    SYNC_THROTTLE_RETRIES: int = int(os.getenv("SYNC_THROTTLE_RETRIES", "3"))  # per folder and round
+    # Further accounts as a JSON list of {"username", "password", "server", "port",
+    # "use_ssl", "folders", "connections"} (the IMAP_* account is always included)
+    IMAP_ACCOUNTS: List[Dict] = json.loads(os.getenv("IMAP_ACCOUNTS", "[]"))
+    
+    # Mail I/O Configuration (blocking SMTP/IMAP calls run in dedicated thread pools)
+    SMTP_WORKERS: int = int(os.getenv("SMTP_WORKERS", "8"))
+    IMAP_WORKERS: int = int(os.getenv("IMAP_WORKERS", "4"))
+    SMTP_TIMEOUT: float = float(os.getenv("SMTP_TIMEOUT", "30.0"))  # socket timeout, seconds
+    IMAP_TIMEOUT: float = float(os.getenv("IMAP_TIMEOUT", "30.0"))  # socket timeout, seconds
+    SMTP_OPERATION_TIMEOUT: float = float(os.getenv("SMTP_OPERATION_TIMEOUT", "60.0"))  # per send, seconds
+    IMAP_OPERATION_TIMEOUT: float = float(os.getenv("IMAP_OPERATION_TIMEOUT", "60.0"))  # per fetch, seconds
+    
+    # IMAP Connection Pool (one authenticated session per concurrent IMAP call)
+    IMAP_POOL_SIZE: int = int(os.getenv("IMAP_POOL_SIZE", "4"))  # match IMAP_WORKERS
+    IMAP_POOL_IDLE_TIMEOUT: float = float(os.getenv("IMAP_POOL_IDLE_TIMEOUT", "300.0"))  # close unused sessions, seconds
+    IMAP_POOL_HEALTH_CHECK_INTERVAL: float = float(os.getenv("IMAP_POOL_HEALTH_CHECK_INTERVAL", "60.0"))  # NOOP before reuse, seconds
+    IMAP_POOL_CHECKOUT_TIMEOUT: float = float(os.getenv("IMAP_POOL_CHECKOUT_TIMEOUT", "30.0"))  # wait for a free session, seconds
     
     # QKD KME Configuration
     # Use 127.0.0.1 instead of localhost to force IPv4 (avoids ::1 IPv6 connection issues)
@@ -39,6 +82,35 @@ class Config:
     QKD_MASTER_SAE_ID: str = os.getenv("QKD_MASTER_SAE_ID", "SENDER_SAE")
     QKD_SLAVE_SAE_ID: str = os.getenv("QKD_SLAVE_SAE_ID", "RECEIVER_SAE")
     
+    # QKD KME HTTP Client Configuration (shared, pooled connection to the KME)
+    QKD_KME_HTTP2: bool = os.getenv("QKD_KME_HTTP2", "false").lower() == "true"
+    QKD_KME_MAX_CONNECTIONS: int = int(os.getenv("QKD_KME_MAX_CONNECTIONS", "20"))
+    QKD_KME_MAX_KEEPALIVE: int = int(os.getenv("QKD_KME_MAX_KEEPALIVE", "10"))
+    QKD_KME_KEEPALIVE_EXPIRY: float = float(os.getenv("QKD_KME_KEEPALIVE_EXPIRY", "30.0"))  # seconds
+    QKD_KME_TIMEOUT: float = float(os.getenv("QKD_KME_TIMEOUT", "10.0"))  # seconds
+    QKD_KME_CONNECT_TIMEOUT: float = float(os.getenv("QKD_KME_CONNECT_TIMEOUT", "5.0"))  # seconds
+    
+    # Encryption Key Prefetch Buffer (per slave SAE)
+    QKD_KEY_BUFFER_ENABLED: bool = os.getenv("QKD_KEY_BUFFER_ENABLED", "true").lower() == "true"
+    QKD_KEY_BUFFER_SIZE: int = int(os.getenv("QKD_KEY_BUFFER_SIZE", "20"))  # high-water mark
+    QKD_KEY_BUFFER_LOW_WATER: int = int(os.getenv("QKD_KEY_BUFFER_LOW_WATER", "5"))
+    QKD_KEY_BUFFER_BATCH: int = int(os.getenv("QKD_KEY_BUFFER_BATCH", "10"))  # keys per enc_keys call
+    
+    # Decryption Key Cache (keys retrieved via dec_keys)
+    DECRYPT_KEY_CACHE_ENABLED: bool = os.getenv("DECRYPT_KEY_CACHE_ENABLED", "true").lower() == "true"
+    DECRYPT_KEY_CACHE_MAX_ENTRIES: int = int(os.getenv("DECRYPT_KEY_CACHE_MAX_ENTRIES", "1024"))
+    DECRYPT_KEY_CACHE_MAX_BYTES: int = int(os.getenv("DECRYPT_KEY_CACHE_MAX_BYTES", str(1024 * 1024)))
+    DECRYPT_KEY_CACHE_TTL: float = float(os.getenv("DECRYPT_KEY_CACHE_TTL", "300.0"))  # seconds
+    DECRYPT_KEY_CACHE_PURGE_INTERVAL: float = float(os.getenv("DECRYPT_KEY_CACHE_PURGE_INTERVAL", "30.0"))  # expiry sweep, seconds
+    
+    # Message Cache (parsed messages for /decrypt, keyed by folder, UIDVALIDITY and UID)
+    MESSAGE_CACHE_ENABLED: bool = os.getenv("MESSAGE_CACHE_ENABLED", "true").lower() == "true"
+    MESSAGE_CACHE_MAX_ENTRIES: int = int(os.getenv("MESSAGE_CACHE_MAX_ENTRIES", "1000"))
+    MESSAGE_CACHE_MAX_BYTES: int = int(os.getenv("MESSAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    
+    # Attachment Streaming (one MIME part per request, fetched in partial FETCH chunks)
+    IMAP_PART_CHUNK_SIZE: int = int(os.getenv("IMAP_PART_CHUNK_SIZE", str(256 * 1024)))  # octets per FETCH
+    
     # Backend API Configuration
     BACKEND_HOST: str = os.getenv("BACKEND_HOST", "0.0.0.0")
     BACKEND_PORT: int = int(os.getenv("BACKEND_PORT", "8001"))
@@ -47,10 +119,23 @@ class Config:
     DEFAULT_KEY_SIZE: int = 256  # bits
     DEFAULT_SECURITY_LEVEL: str = "L2"  # L1, L2, L3, L4
     
+    # Crypto Worker Pool (L3 Kyber work runs in separate processes)
+    CRYPTO_PQC_WORKERS: int = int(os.getenv("CRYPTO_PQC_WORKERS", "2"))  # 0 disables the process pool
+    CRYPTO_FAST_WORKERS: int = int(os.getenv("CRYPTO_FAST_WORKERS", "4"))
+    CRYPTO_INLINE_THRESHOLD: int = int(os.getenv("CRYPTO_INLINE_THRESHOLD", "4096"))  # bytes
+    CRYPTO_START_METHOD: str = os.getenv("CRYPTO_START_METHOD", "spawn")  # spawn, forkserver, fork
+    
+    # Pre-generated Kyber-512 Pool (L3)
+    KYBER_POOL_ENABLED: bool = os.getenv("KYBER_POOL_ENABLED", "true").lower() == "true"
+    KYBER_POOL_SIZE: int = int(os.getenv("KYBER_POOL_SIZE", "16"))
+    KYBER_POOL_ENCAPSULATE: bool = os.getenv("KYBER_POOL_ENCAPSULATE", "true").lower() == "true"
+    KYBER_POOL_IDLE_DELAY: float = float(os.getenv("KYBER_POOL_IDLE_DELAY", "0.05"))  # seconds
+    
     # Email Settings
     EMAIL_ENCRYPTION_HEADER: str = "X-Quantum-Encryption"
     EMAIL_KEY_ID_HEADER: str = "X-Quantum-Key-ID"
     EMAIL_SECURITY_LEVEL_HEADER: str = "X-Quantum-Security-Level"
+    EMAIL_NONCE_HEADER: str = "X-Quantum-Nonce"  # IV of an encrypted L2 attachment part
     
 
 config = Config()
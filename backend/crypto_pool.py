@@ -0,0 +1,244 @@
+"""
+Crypto Worker Pool Module
+Runs message encryption/decryption off the event loop, with L3 (Kyber-512)
+work isolated in a process pool
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from config import config
+from encryption import encrypt_message, decrypt_message, KyberMaterial
+from models import SecurityLevel, EncryptionMetadata
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _timed_call(func: Callable[..., Any], args: tuple) -> Tuple[Any, float]:
+    """Run func(*args) in a worker and report its service time"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _warmup() -> bool:
+    """No-op task used to start worker processes ahead of the first request"""
+    return True
+
+
+class _LaneStats:
+    """Counters for one worker lane"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.inline = 0
+        self.pending = 0
+        self.max_pending = 0
+        self.total_service_time = 0.0
+        self.max_service_time = 0.0
+        self.total_wait_time = 0.0
+
+    def to_dict(self) -> Dict:
+        finished = self.completed + self.failed
+        return {
+            "lane": self.name,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "inline": self.inline,
+            "queue_depth": self.pending,
+            "max_queue_depth": self.max_pending,
+            "avg_service_time": self.total_service_time / finished if finished else 0.0,
+            "max_service_time": self.max_service_time,
+            "avg_wait_time": self.total_wait_time / finished if finished else 0.0
+        }
+
+
+class CryptoPool:
+    """
+    Worker pool for per-message cryptography.
+
+    Two independent lanes are used so cheap work is never queued behind
+    expensive work:
+    - "pqc": L3 (Kyber-512 hybrid) jobs, run in a ProcessPoolExecutor so the
+      pure-Python Kyber code does not hold the event loop's GIL
+    - "fast": L1/L2/L4 jobs, run in a small thread pool, or inline on the
+      event loop when the payload is below the inline threshold
+    """
+
+    def __init__(
+        self,
+        pqc_workers: Optional[int] = None,
+        fast_workers: Optional[int] = None,
+        inline_threshold: Optional[int] = None,
+        start_method: Optional[str] = None
+    ):
+        """
+        Initialize the CryptoPool.
+
+        Args:
+            pqc_workers: Number of L3 worker processes, 0 to use the fast lane (defaults to config)
+            fast_workers: Number of L1/L2 worker threads (defaults to config)
+            inline_threshold: Payloads below this many bytes run inline (defaults to config)
+            start_method: multiprocessing start method for L3 workers (defaults to config)
+        """
+        self.pqc_workers = config.CRYPTO_PQC_WORKERS if pqc_workers is None else pqc_workers
+        self.fast_workers = fast_workers or config.CRYPTO_FAST_WORKERS
+        self.inline_threshold = config.CRYPTO_INLINE_THRESHOLD if inline_threshold is None else inline_threshold
+        self.start_method = start_method or config.CRYPTO_START_METHOD
+
+        self._pqc_executor: Optional[ProcessPoolExecutor] = None
+        self._fast_executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {
+            "pqc": _LaneStats("pqc"),
+            "fast": _LaneStats("fast")
+        }
+
+    def start(self):
+        """Create the executors and warm up the L3 worker processes"""
+        if self._fast_executor is None:
+            self._fast_executor = ThreadPoolExecutor(max_workers=self.fast_workers, thread_name_prefix="crypto")
+
+        if self._pqc_executor is None and self.pqc_workers > 0:
+            self._pqc_executor = ProcessPoolExecutor(
+                max_workers=self.pqc_workers,
+                mp_context=multiprocessing.get_context(self.start_method)
+            )
+            for _ in range(self.pqc_workers):
+                self._pqc_executor.submit(_warmup)
+
+        logger.info(
+            f"CryptoPool started with {self.pqc_workers} L3 process(es), "
+            f"{self.fast_workers} fast thread(s), inline below {self.inline_threshold} bytes"
+        )
+
+    def shutdown(self):
+        """Shut down both executors"""
+        if self._pqc_executor is not None:
+            self._pqc_executor.shutdown(wait=False, cancel_futures=True)
+            self._pqc_executor = None
+        if self._fast_executor is not None:
+            self._fast_executor.shutdown(wait=False, cancel_futures=True)
+            self._fast_executor = None
+        logger.info("CryptoPool shut down")
+
+    def _lane(self, security_level: SecurityLevel) -> Tuple[str, Executor]:
+        """Pick the lane and executor for a security level"""
+        if self._fast_executor is None:
+            self.start()
+
+        if security_level == SecurityLevel.L3 and self._pqc_executor is not None:
+            return "pqc", self._pqc_executor
+        return "fast", self._fast_executor
+
+    async def _run(self, security_level: SecurityLevel, size: int, func: Callable[..., Any], *args) -> Any:
+        """Run a crypto job on the appropriate lane and record metrics"""
+        lane, executor = self._lane(security_level)
+        stats = self._stats[lane]
+        stats.submitted += 1
+
+        # Tiny non-PQC jobs are cheaper to run than to hand off
+        if lane == "fast" and security_level != SecurityLevel.L3 and size < self.inline_threshold:
+            stats.inline += 1
+            try:
+                result, service_time = _timed_call(func, args)
+            except Exception:
+                stats.failed += 1
+                raise
+            stats.completed += 1
+            stats.total_service_time += service_time
+            stats.max_service_time = max(stats.max_service_time, service_time)
+            return result
+
+        stats.pending += 1
+        stats.max_pending = max(stats.max_pending, stats.pending)
+        submitted_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, service_time = await loop.run_in_executor(executor, _timed_call, func, args)
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            stats.pending -= 1
+
+        stats.completed += 1
+        stats.total_service_time += service_time
+        stats.max_service_time = max(stats.max_service_time, service_time)
+        stats.total_wait_time += max(0.0, time.perf_counter() - submitted_at - service_time)
+        return result
+
+    async def encrypt(
+        self,
+        plaintext: str,
+        key: str,
+        key_id: str,
+        security_level: SecurityLevel,
+        sender_sae_id: str,
+        receiver_sae_id: str,
+        kyber_material: Optional[KyberMaterial] = None
+    ) -> Tuple[str, EncryptionMetadata]:
+        """
+        Encrypt a message on the worker pool (see encryption.encrypt_message).
+
+        Returns:
+            Tuple of (encrypted_message, metadata)
+        """
+        # With a ready encapsulation, L3 encryption is only AES work
+        lane_level = security_level
+        if security_level == SecurityLevel.L3 and kyber_material is not None and kyber_material[2] is not None:
+            lane_level = SecurityLevel.L2
+
+        return await self._run(
+            lane_level,
+            len(plaintext),
+            encrypt_message,
+            plaintext, key, key_id, security_level, sender_sae_id, receiver_sae_id, kyber_material
+        )
+
+    async def decrypt(self, ciphertext: str, key: str, metadata: EncryptionMetadata) -> str:
+        """
+        Decrypt a message on the worker pool (see encryption.decrypt_message).
+
+        Returns:
+            Decrypted plaintext message
+        """
+        return await self._run(
+            SecurityLevel(metadata.security_level),
+            len(ciphertext),
+            decrypt_message,
+            ciphertext, key, metadata
+        )
+
+    async def run_pqc(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Run an arbitrary picklable job on the L3 lane.
+
+        Returns:
+            The job's return value
+        """
+        return await self._run(SecurityLevel.L3, 0, func, *args)
+
+    def queue_depth(self, lane: str) -> int:
+        """Number of jobs submitted to a lane ("pqc" or "fast") that have not finished"""
+        return self._stats[lane].pending
+
+    def stats(self) -> Dict:
+        """Return per-lane queue depth and service time metrics"""
+        return {
+            "pqc_workers": self.pqc_workers,
+            "fast_workers": self.fast_workers,
+            "inline_threshold": self.inline_threshold,
+            "lanes": [lane.to_dict() for lane in self._stats.values()]
+        }
+
+
+# Singleton instance
+crypto_pool = CryptoPool()
@@ -4,17 +4,38 @@ Handles fetching and decrypting emails via IMAP
 """
 import imaplib
 import email
+import base64
+import binascii
+import quopri
+import select
+import ssl
+import threading
+import time
 from email.header import decode_header
+from email.parser import BytesHeaderParser
 from email.utils import parsedate_to_datetime, parseaddr
-from datetime import datetime
+from datetime import date, datetime
 import logging
-from typing import List, Dict, Optional
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from config import config
+from imap_parser import parse_fetch_response, find_item, walk_bodystructure
+from message_store import message_store
+from message_cache import message_cache
+from imap_pool import IMAPConnectionPool, PooledConnection, CONNECTION_ERRORS
+from part_stream import PartStream, CipherFactory, IDENTITY_ENCODINGS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Unsolicited responses that mean a selected folder changed (RFC 3501, RFC 7162)
+MAILBOX_UPDATES = ('EXISTS', 'EXPUNGE', 'FETCH', 'VANISHED')
+
+
+class StaleCursorError(Exception):
+    """Raised when a page cursor predates a UIDVALIDITY change of its folder"""
+
 
 class EmailReceiver:
     """Handles IMAP email receiving operations"""
@@ -25,7 +46,9 @@ class EmailReceiver:
         imap_port: Optional[int] = None,
         username: Optional[str] = None,
         password: Optional[str] = None,
-        use_ssl: bool = True
+        use_ssl: bool = True,
+        timeout: Optional[float] = None,
+        pool_size: Optional[int] = None
     ):
         """
         Initialize the EmailReceiver with IMAP configuration.
@@ -36,30 +59,112 @@ class EmailReceiver:
             username: IMAP authentication username
             password: IMAP authentication password
             use_ssl: Whether to use SSL encryption
+            timeout: Socket timeout in seconds (defaults to config)
+            pool_size: Maximum number of pooled IMAP connections (defaults to config)
         """
         self.imap_server = imap_server or config.IMAP_SERVER
         self.imap_port = imap_port or config.IMAP_PORT
         self.username = username or config.IMAP_USERNAME
         self.password = password or config.IMAP_PASSWORD
         self.use_ssl = use_ssl
-        self.connection = None
+        self.timeout = timeout or config.IMAP_TIMEOUT
+        self.fetch_batch_size = config.IMAP_FETCH_BATCH_SIZE
+        self.sync_window = config.IMAP_SYNC_WINDOW
+        self.flag_sync_interval = config.IMAP_FLAG_SYNC_INTERVAL
+        self.use_extensions = config.IMAP_CONDSTORE_ENABLED
+        self.part_chunk_size = config.IMAP_PART_CHUNK_SIZE
+        # Header fields transferred for body-less listings
+        self.summary_headers = [
+            'FROM', 'TO', 'SUBJECT', 'DATE', 'MESSAGE-ID',
+            config.EMAIL_ENCRYPTION_HEADER.upper(),
+            config.EMAIL_KEY_ID_HEADER.upper(),
+            config.EMAIL_SECURITY_LEVEL_HEADER.upper()
+        ]
+        # imaplib connections are not thread-safe: each call checks out its
+        # own pooled connection, bound to the calling thread while it runs
+        self.pool = IMAPConnectionPool(self._open_connection, size=pool_size)
+        self._local = threading.local()
         
         logger.info(f"EmailReceiver initialized with server: {self.imap_server}:{self.imap_port}")
     
+    @property
+    def connection(self) -> Optional[imaplib.IMAP4]:
+        """The imaplib connection checked out by the current thread, if any"""
+        pooled = getattr(self._local, 'pooled', None)
+        return pooled.imap if pooled else None
+    
+    @property
+    def condstore(self) -> bool:
+        """Whether CONDSTORE is available on the current connection"""
+        pooled = getattr(self._local, 'pooled', None)
+        return bool(pooled and pooled.condstore)
+    
+    @property
+    def qresync(self) -> bool:
+        """Whether QRESYNC is enabled on the current connection"""
+        pooled = getattr(self._local, 'pooled', None)
+        return bool(pooled and pooled.qresync)
+    
+    @contextmanager
+    def _checkout(self) -> Iterator[PooledConnection]:
+        """
+        Bind a pooled connection to the current thread for one operation.
+        
+        Re-entrant: nested calls on the same thread reuse the bound connection.
+        """
+        pooled = getattr(self._local, 'pooled', None)
+        if pooled is not None:
+            yield pooled
+            return
+        
+        with self.pool.connection() as pooled:
+            self._local.pooled = pooled
+            try:
+                yield pooled
+            finally:
+                self._local.pooled = None
+    
+    def _note_failure(self, error: Exception):
+        """Mark the current connection for replacement after a connection-level error"""
+        pooled = getattr(self._local, 'pooled', None)
+        if pooled is not None and isinstance(error, CONNECTION_ERRORS):
+            pooled.broken = True
+    
+    def _open_connection(self) -> PooledConnection:
+        """
+        Open and authenticate a new IMAP connection (pool factory).
+        
+        Returns:
+            The connection with its enabled extensions
+        """
+        if self.use_ssl:
+            imap = imaplib.IMAP4_SSL(self.imap_server, self.imap_port, timeout=self.timeout)
+        else:
+            imap = imaplib.IMAP4(self.imap_server, self.imap_port, timeout=self.timeout)
+        
+        try:
+            imap.login(self.username, self.password)
+        except Exception:
+            try:
+                imap.shutdown()
+            except Exception:
+                pass
+            raise
+        
+        pooled = PooledConnection(imap)
+        self._detect_extensions(pooled)
+        return pooled
+    
     def connect(self) -> bool:
         """
-        Connect to IMAP server.
+        Connect to IMAP server (opens or verifies a pooled connection).
         
         Returns:
             True if connection successful, False otherwise
         """
         try:
-            if self.use_ssl:
-                self.connection = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
-            else:
-                self.connection = imaplib.IMAP4(self.imap_server, self.imap_port)
-            
-            self.connection.login(self.username, self.password)
+            with self._checkout():
+                pass
             logger.info("Connected to IMAP server successfully")
             return True
             
@@ -67,14 +172,37 @@ class EmailReceiver:
             logger.error(f"Failed to connect to IMAP server: {e}")
             return False
     
+    def _detect_extensions(self, pooled: PooledConnection):
+        """Read post-login capabilities and enable QRESYNC when offered"""
+        if not self.use_extensions:
+            return
+        
+        imap = pooled.imap
+        try:
+            status, data = imap.capability()
+            if status != 'OK' or not data or not data[-1]:
+                return
+            capabilities = tuple(data[-1].decode().upper().split())
+            imap.capabilities = capabilities
+            
+            pooled.condstore = 'CONDSTORE' in capabilities or 'QRESYNC' in capabilities
+            if 'QRESYNC' in capabilities and 'ENABLE' in capabilities:
+                status, _ = imap.enable('QRESYNC')
+                pooled.qresync = status == 'OK'
+        except Exception as e:
+            logger.warning(f"Failed to enable CONDSTORE/QRESYNC, using UID/flags diff: {e}")
+            pooled.condstore = False
+            pooled.qresync = False
+        
+        logger.info(f"IMAP extensions: CONDSTORE={pooled.condstore}, QRESYNC={pooled.qresync}")
+    
     def disconnect(self):
-        """Disconnect from IMAP server"""
-        if self.connection:
-            try:
-                self.connection.logout()
-                logger.info("Disconnected from IMAP server")
-            except Exception as e:
-                logger.error(f"Error during disconnect: {e}")
+        """Disconnect from IMAP server (closes the pooled connections)"""
+        try:
+            self.pool.close()
+            logger.info("Disconnected from IMAP server")
+        except Exception as e:
+            logger.error(f"Error during disconnect: {e}")
     
     def list_folders(self) -> List[str]:
         """
@@ -83,152 +211,1378 @@ class EmailReceiver:
         Returns:
             List of folder names
         """
-        if not self.connection:
-            raise Exception("Not connected to IMAP server")
-        
-        try:
-            status, folders = self.connection.list()
-            if status == 'OK':
-                folder_list = []
-                for folder in folders:
-                    # Parse folder name from response
-                    folder_str = folder.decode() if isinstance(folder, bytes) else folder
-                    # Extract folder name (format: '(\\Flags) "/" "FolderName"')
-                    parts = folder_str.split('"')
-                    if len(parts) >= 3:
-                        folder_list.append(parts[-2])
-                return folder_list
-            return []
-        except Exception as e:
-            logger.error(f"Failed to list folders: {e}")
-            return []
+        with self._checkout():
+            try:
+                status, folders = self.connection.list()
+                if status == 'OK':
+                    folder_list = []
+                    for folder in folders:
+                        # Parse folder name from response
+                        folder_str = folder.decode() if isinstance(folder, bytes) else folder
+                        # Extract folder name (format: '(\\Flags) "/" "FolderName"')
+                        parts = folder_str.split('"')
+                        if len(parts) >= 3:
+                            folder_list.append(parts[-2])
+                    return folder_list
+                return []
+            except Exception as e:
+                self._note_failure(e)
+                logger.error(f"Failed to list folders: {e}")
+                return []
     
     def fetch_emails(
         self,
         folder: str = 'INBOX',
         limit: int = 50,
-        unread_only: bool = False
+        unread_only: bool = False,
+        filters: Optional[Dict] = None,
+        before_uid: Optional[str] = None,
+        after_uid: Optional[str] = None
     ) -> List[Dict]:
         """
         Fetch emails from specified folder.
         
+        The folder is first synchronized with the local message store, so
+        only messages that are new since the last refresh (and bodies that
+        were never downloaded) are transferred.
+        
         Args:
             folder: IMAP folder name (default: INBOX)
             limit: Maximum number of emails to fetch
             unread_only: If True, fetch only unread emails
+            filters: Search filters evaluated by the server (see _search_terms)
+            before_uid: Page cursor: only emails older than this one
+            after_uid: Page cursor: only emails newer than this one (the page right above it)
         
         Returns:
-            List of email dictionaries with metadata
+            List of email dictionaries with metadata, newest first; 'id' is the
+            UID and 'uidvalidity' the folder's UIDVALIDITY (see page_cursor)
+        
+        Raises:
+            StaleCursorError: If a cursor predates a UIDVALIDITY change
         """
-        if not self.connection:
-            if not self.connect():
-                raise Exception("Failed to connect to IMAP server")
+        with self._checkout():
+            try:
+                if filters:
+                    emails = self._search_messages(folder, limit, unread_only, filters, before_uid=before_uid, after_uid=after_uid)
+                else:
+                    exists = self._sync_folder(folder)
+                    emails = self._list_messages(folder, exists, limit, unread_only, before_uid=before_uid, after_uid=after_uid)
+                self._fill_bodies(folder, emails)
+                self._cache_emails(folder, self._local.pooled.selected_uidvalidity, emails)
+                
+                logger.info(f"Fetched {len(emails)} emails from {folder}")
+                return emails
+                
+            except Exception as e:
+                logger.error(f"Failed to fetch emails: {e}")
+                raise
+    
+    def fetch_email_summaries(
+        self,
+        folder: str = 'INBOX',
+        limit: int = 50,
+        unread_only: bool = False,
+        snippet_length: int = 0,
+        filters: Optional[Dict] = None,
+        before_uid: Optional[str] = None,
+        after_uid: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Fetch a listing of emails without downloading their bodies.
         
-        try:
-            # Select folder
-            status, messages = self.connection.select(folder)
-            if status != 'OK':
-                raise Exception(f"Failed to select folder: {folder}")
+        Only selected header fields, BODYSTRUCTURE, RFC822.SIZE and flags are
+        transferred (plus, optionally, the first bytes of the first part as a
+        snippet), and only for messages not already in the local message
+        store. The full body is fetched later, when a message is opened.
+        
+        Args:
+            folder: IMAP folder name (default: INBOX)
+            limit: Maximum number of emails to list
+            unread_only: If True, list only unread emails
+            snippet_length: Number of body bytes to fetch for a preview (0 disables)
+            filters: Search filters evaluated by the server (see _search_terms)
+            before_uid: Page cursor: only emails older than this one
+            after_uid: Page cursor: only emails newer than this one (the page right above it)
+        
+        Returns:
+            List of email summary dictionaries (no 'body' key), newest first,
+            with the folder's 'uidvalidity' (see page_cursor)
+        
+        Raises:
+            StaleCursorError: If a cursor predates a UIDVALIDITY change
+        """
+        with self._checkout():
+            try:
+                if filters:
+                    emails = self._search_messages(
+                        folder, limit, unread_only, filters, snippet_length,
+                        before_uid=before_uid, after_uid=after_uid
+                    )
+                else:
+                    exists = self._sync_folder(folder, snippet_length=snippet_length)
+                    emails = self._list_messages(
+                        folder, exists, limit, unread_only, snippet_length,
+                        before_uid=before_uid, after_uid=after_uid
+                    )
+                self._fill_snippets(folder, emails, snippet_length)
+                
+                for summary in emails:
+                    summary.pop('body', None)
+                    if not snippet_length:
+                        summary['snippet'] = None
+                    elif summary.get('snippet'):
+                        summary['snippet'] = summary['snippet'][:snippet_length]
+                
+                logger.info(f"Listed {len(emails)} emails from {folder}")
+                return emails
+                
+            except Exception as e:
+                logger.error(f"Failed to list emails: {e}")
+                raise
+    
+    def sync_folder(self, folder: str = 'INBOX', baseline: Optional[Dict] = None) -> Dict:
+        """
+        Synchronize a folder with the local message store and report the changes.
+        
+        By default the changes are those this sync made to the store. The
+        store is shared, though: background sync rounds, /fetch and paging
+        also bring mail in, and a caller that must see every change (the IDLE
+        watcher) passes the 'snapshot' of its previous call as baseline, so
+        the changes are relative to what it last saw, whoever stored them.
+        
+        Args:
+            folder: IMAP folder name (default: INBOX)
+            baseline: Snapshot returned by an earlier call to diff against
+                (default: the store's state before this sync)
+        
+        Returns:
+            Dictionary with 'new' (summaries of messages that arrived, newest
+            first), 'expunged' (UIDs), 'flags' (UID -> new flags) and
+            'snapshot' (the folder state after this sync). The changes are
+            empty when there is nothing to compare with (first sync of a
+            folder, or a UIDVALIDITY change).
+        """
+        with self._checkout():
+            account = self.username
+            if baseline is None:
+                state = message_store.get_folder_state(account, folder)
+                if state is not None:
+                    baseline = {
+                        'uidvalidity': state['uidvalidity'],
+                        'uidnext': state['uidnext'],
+                        'flags': message_store.flags(account, folder)
+                    }
             
-            # Search for emails
-            search_criteria = 'UNSEEN' if unread_only else 'ALL'
-            status, message_ids = self.connection.search(None, search_criteria)
+            self._sync_folder(folder)
             
-            if status != 'OK':
-                return []
+            state = message_store.get_folder_state(account, folder)
+            after = message_store.flags(account, folder)
+            snapshot = {'uidvalidity': state['uidvalidity'], 'uidnext': state['uidnext'], 'flags': after}
+            changes = {'new': [], 'expunged': [], 'flags': {}, 'snapshot': snapshot}
+            if baseline is None or baseline['uidvalidity'] != state['uidvalidity']:
+                return changes
             
-            # Get message IDs
-            msg_id_list = message_ids[0].split()
+            before = baseline['flags']
+            new_uids = sorted((uid for uid in after if uid not in before and uid >= baseline['uidnext']), reverse=True)
+            new_messages = message_store.get_messages(account, folder, new_uids)
+            for uid in new_uids:
+                if uid in new_messages:
+                    summary = new_messages[uid]
+                    summary.pop('body', None)
+                    summary['folder'] = folder
+                    changes['new'].append(summary)
             
-            # Limit results
-            msg_id_list = msg_id_list[-limit:] if len(msg_id_list) > limit else msg_id_list
+            changes['expunged'] = sorted(uid for uid in before if uid not in after)
+            changes['flags'] = {
+                uid: flags for uid, flags in after.items()
+                if uid in before and sorted(before[uid]) != sorted(flags)
+            }
+            return changes
+    
+    def idle(self, folder: str, timeout: float, stop: Optional[threading.Event] = None, poll_interval: float = 0.5) -> List[bytes]:
+        """
+        Wait in IMAP IDLE (RFC 2177) on a folder.
+        
+        imaplib (before Python 3.14) has no IDLE support, so the command is
+        driven by hand: IDLE is issued, the socket is watched until the
+        server sends an untagged update, the timeout elapses or stop is set,
+        and DONE then ends the command. Updates the server already sent with
+        an earlier command's response are returned without idling, since the
+        server will not announce them again.
+        
+        Args:
+            folder: IMAP folder name (selected first unless the pooled connection already has it)
+            timeout: Maximum seconds to stay in IDLE (servers drop it after ~30 minutes)
+            stop: Optional event that ends the wait early
+            poll_interval: Seconds between checks of the stop event
+        
+        Returns:
+            Untagged response lines received while idling, or left pending by
+            earlier commands (e.g. b'* 12 EXISTS')
+        """
+        with self._checkout() as pooled:
+            if 'IDLE' not in self.connection.capabilities:
+                raise Exception("IMAP server does not support IDLE")
+            if pooled.selected_folder != folder:
+                self._select(folder)
             
-            emails = []
-            for msg_id in reversed(msg_id_list):  # Newest first
-                try:
-                    email_data = self._fetch_email_by_id(msg_id)
-                    if email_data:
-                        emails.append(email_data)
-                except Exception as e:
-                    logger.error(f"Failed to fetch email {msg_id}: {e}")
-                    continue
+            connection = self.connection
+            updates = self._pending_updates()
+            if updates:
+                return updates
             
-            logger.info(f"Fetched {len(emails)} emails from {folder}")
-            return emails
+            tag = connection._new_tag()
+            try:
+                connection.send(tag + b' IDLE\r\n')
+                while True:
+                    line = connection._get_line()
+                    if line.startswith(b'+'):
+                        break
+                    if line.startswith(tag):
+                        raise Exception(f"IDLE rejected: {line.decode(errors='replace')}")
+                    updates.append(line)
+                
+                deadline = time.monotonic() + timeout
+                while not updates and time.monotonic() < deadline and not (stop and stop.is_set()):
+                    wait = min(poll_interval, max(0.0, deadline - time.monotonic()))
+                    if self._idle_readable(wait):
+                        updates.append(connection._get_line())
+                
+                connection.send(b'DONE\r\n')
+                while True:
+                    line = connection._get_line()
+                    if line.startswith(tag):
+                        if not line[len(tag):].strip().upper().startswith(b'OK'):
+                            raise Exception(f"IDLE failed: {line.decode(errors='replace')}")
+                        break
+                    updates.append(line)
+            finally:
+                connection.tagged_commands.pop(tag, None)
             
-        except Exception as e:
-            logger.error(f"Failed to fetch emails: {e}")
-            raise
+            return [line for line in updates if line.startswith(b'*')]
     
-    def _fetch_email_by_id(self, msg_id: bytes) -> Optional[Dict]:
+    def _pending_updates(self) -> List[bytes]:
         """
-        Fetch a single email by ID and parse it.
+        Pop mailbox updates imaplib stored while running earlier commands.
+        
+        Returns:
+            The updates as untagged response lines (e.g. b'* 12 EXISTS')
+        """
+        responses = self.connection.untagged_responses
+        updates = []
+        for name in MAILBOX_UPDATES:
+            for data in responses.pop(name, []):
+                if isinstance(data, tuple):
+                    # FETCH with a literal: (b'3 (UID 7 BODY[] {12}', b'...')
+                    data = data[0]
+                if name == 'VANISHED':
+                    updates.append(b'* VANISHED ' + data)
+                else:
+                    number, _, rest = (data or b'').partition(b' ')
+                    updates.append(b' '.join(item for item in (b'*', number, name.encode(), rest) if item))
+        return updates
+    
+    def _idle_readable(self, wait: float) -> bool:
+        """
+        Wait until the IDLE connection has a line to read.
+        
+        imaplib reads through a buffered file, and SSL decrypts whole
+        records, so a line can already be in the process while the socket
+        itself has nothing more to read; select() alone would miss it. The
+        buffer is therefore peeked first, with the socket made non-blocking
+        so the peek never waits.
         
         Args:
-            msg_id: Email message ID
+            wait: Maximum seconds to wait
         
         Returns:
-            Dictionary containing email data
+            True if data is available
         """
+        connection = self.connection
+        sock = connection.sock
+        if isinstance(sock, ssl.SSLSocket) and sock.pending():
+            return True
+        timeout = sock.gettimeout()
+        sock.settimeout(0.0)
         try:
-            # Fetch email
-            status, msg_data = self.connection.fetch(msg_id, '(RFC822)')
+            if connection.file.peek(1):
+                return True
+        except (BlockingIOError, ssl.SSLWantReadError):
+            pass
+        finally:
+            sock.settimeout(timeout)
+        readable, _, _ = select.select([sock], [], [], wait)
+        return bool(readable)
+    
+    def _select(self, folder: str, state: Optional[Dict] = None) -> Dict:
+        """
+        Select a folder and read its size and UID state from the response.
+        
+        With QRESYNC and a previous sync state, the SELECT also asks the
+        server for the UIDs expunged and the flags changed since then.
+        
+        Args:
+            folder: IMAP folder name
+            state: Stored sync state of the folder, if any
+        
+        Returns:
+            Dictionary with 'exists', 'uidvalidity', 'uidnext', 'highestmodseq'
+            (None if not reported), 'resynced' (True if the server answered a
+            QRESYNC request), 'vanished' (UID ranges) and 'changed' (UID -> flags)
+        """
+        modifier = None
+        if self.qresync and state and state['highestmodseq']:
+            modifier = f"(QRESYNC ({state['uidvalidity']} {state['highestmodseq']} {state['low_uid']}:*))"
+        elif self.condstore:
+            modifier = "(CONDSTORE)"
+        
+        pooled = self._local.pooled
+        pooled.selected_folder = None
+        if modifier is None:
+            status, data = self.connection.select(folder)
+        else:
+            status, data = self._select_with_modifier(folder, modifier)
+        if status != 'OK':
+            # Keep the response text: it carries codes such as [LIMIT] or [UNAVAILABLE]
+            reason = data[0].decode(errors='replace') if data and isinstance(data[0], bytes) else status
+            raise Exception(f"Failed to select folder: {folder} ({reason})")
+        
+        selected = {
+            'exists': int(data[0]),
+            'uidvalidity': self._response_int('UIDVALIDITY'),
+            'uidnext': self._response_int('UIDNEXT'),
+            'highestmodseq': self._response_int('HIGHESTMODSEQ') if self.condstore else None,
+            'resynced': False,
+            'vanished': [],
+            'changed': {}
+        }
+        pooled.selected_folder = folder
+        pooled.selected_uidvalidity = selected['uidvalidity']
+        
+        if modifier and modifier.startswith('(QRESYNC') and selected['uidvalidity'] == state['uidvalidity']:
+            selected['resynced'] = True
+            _, vanished = self.connection.response('VANISHED')
+            for line in vanished or []:
+                if isinstance(line, bytes):
+                    selected['vanished'].extend(self._parse_uid_set(line.replace(b'(EARLIER)', b'').strip()))
+            _, fetched = self.connection.response('FETCH')
+            for line in fetched or []:
+                if not isinstance(line, bytes):
+                    continue
+                for _, fetch_items in parse_fetch_response([line]):
+                    if fetch_items.get('UID') is not None and 'FLAGS' in fetch_items:
+                        selected['changed'][fetch_items['UID']] = [str(flag) for flag in fetch_items['FLAGS']]
+        
+        return selected
+    
+    def _select_with_modifier(self, folder: str, modifier: str):
+        """
+        SELECT with an RFC 7162 parameter, which imaplib.select() cannot send.
+        
+        Mirrors imaplib.IMAP4.select so the connection's state tracking stays valid.
+        
+        Returns:
+            (status, data) as returned by imaplib.IMAP4.select
+        """
+        connection = self.connection
+        connection.untagged_responses = {}
+        connection.is_readonly = False
+        status, data = connection._simple_command('SELECT', folder, modifier)
+        if status != 'OK':
+            connection.state = 'AUTH'
+            return status, data
+        connection.state = 'SELECTED'
+        return connection._untagged_response(status, data, 'EXISTS')
+    
+    @staticmethod
+    def _parse_uid_set(text: bytes) -> List[tuple]:
+        """
+        Parse an IMAP UID set such as b'1:3,7' into inclusive ranges.
+        
+        Returns:
+            List of (first, last) UID pairs
+        """
+        ranges = []
+        for part in text.decode().split(','):
+            if not part:
+                continue
+            first, _, last = part.partition(':')
+            first, last = int(first), int(last or first)
+            ranges.append((min(first, last), max(first, last)))
+        return ranges
+    
+    def _response_int(self, name: str) -> Optional[int]:
+        """Pop an untagged numeric response (e.g. UIDNEXT) left by the last command"""
+        _, data = self.connection.response(name)
+        if not data or data[-1] is None:
+            return None
+        return int(data[-1])
+    
+    def _sync_folder(self, folder: str, snippet_length: int = 0) -> int:
+        """
+        Bring the local message store up to date with a folder.
+        
+        Unchanged folders (same UIDVALIDITY, UIDNEXT, message count and, with
+        CONDSTORE, HIGHESTMODSEQ) cost only the SELECT. New UIDs are fetched
+        incrementally. Flag changes and expunges come from QRESYNC (in the
+        SELECT response itself) or CONDSTORE CHANGEDSINCE; without those
+        extensions, a UID/flags diff runs on a count mismatch and
+        periodically. A UIDVALIDITY change discards the cached folder.
+        
+        Args:
+            folder: IMAP folder name
+            snippet_length: Preview bytes to fetch for new messages
+        
+        Returns:
+            Number of messages in the folder (EXISTS)
+        """
+        account = self.username
+        state = message_store.get_folder_state(account, folder)
+        selected = self._select(folder, state)
+        exists = selected['exists']
+        
+        if state and state['uidvalidity'] != selected['uidvalidity']:
+            logger.info(f"UIDVALIDITY of {folder} changed, discarding cached messages")
+            message_store.reset_folder(account, folder)
+            state = None
+        
+        if state is None:
+            return self._initial_sync(folder, selected, snippet_length)
+        
+        uidnext = selected['uidnext']
+        new_count = 0
+        if uidnext is None or uidnext != state['uidnext']:
+            start = state['uidnext']
+            new_uids = [uid for uid in self._uid_search(f'UID {start}:*') if uid >= start]
             
-            if status != 'OK':
-                return None
+            if len(new_uids) > self.sync_window:
+                # Too far behind to catch up incrementally; start over
+                message_store.reset_folder(account, folder)
+                return self._initial_sync(folder, selected, snippet_length)
             
-            # Parse email
-            raw_email = msg_data[0][1]
-            email_message = email.message_from_bytes(raw_email)
+            for batch_start in range(0, len(new_uids), self.fetch_batch_size):
+                batch = new_uids[batch_start:batch_start + self.fetch_batch_size]
+                self._store_summaries(folder, self._fetch_summaries(
+                    self._message_set(batch), uid=True, snippet_length=snippet_length
+                ))
             
-            # Extract headers
-            subject = self._decode_header(email_message['Subject'])
+            new_count = len(new_uids)
+            if uidnext is None:
+                uidnext = max(new_uids, default=start - 1) + 1
+        
+        fields = {'uidnext': uidnext, 'exists_count': exists, 'highestmodseq': selected['highestmodseq']}
+        
+        if selected['highestmodseq'] is not None and state['highestmodseq'] is not None:
+            # Every flag change and expunge bumps HIGHESTMODSEQ
+            if selected['highestmodseq'] != state['highestmodseq']:
+                self._apply_changes(folder, state, selected, exists != state['exists_count'] + new_count)
+                fields['flags_synced_at'] = time.time()
+        else:
+            # A count mismatch means messages were expunged; flags are re-read periodically
+            flags_due = time.time() - (state['flags_synced_at'] or 0) >= self.flag_sync_interval
+            if exists != state['exists_count'] + new_count or flags_due:
+                self._diff_flags(folder, state['low_uid'])
+                fields['flags_synced_at'] = time.time()
+        
+        message_store.set_folder_state(account, folder, **fields)
+        
+        if new_count:
+            logger.info(f"Synced {new_count} new message(s) in {folder}")
+        return exists
+    
+    def _initial_sync(
+        self,
+        folder: str,
+        selected: Dict[str, Optional[int]],
+        snippet_length: int
+    ) -> int:
+        """
+        Populate the store with the newest sync_window messages of a folder.
+        
+        Args:
+            folder: IMAP folder name
+            selected: Result of _select for this folder
+            snippet_length: Preview bytes to fetch
+        
+        Returns:
+            Number of messages in the folder (EXISTS)
+        """
+        exists = selected['exists']
+        first = max(1, exists - self.sync_window + 1)
+        
+        uids = []
+        for batch_start in range(first, exists + 1, self.fetch_batch_size):
+            batch_end = min(exists, batch_start + self.fetch_batch_size - 1)
+            summaries = self._fetch_summaries(
+                f"{batch_start}:{batch_end}".encode(), uid=False,
+                snippet_length=snippet_length
+            )
+            self._store_summaries(folder, summaries)
+            uids.extend(summary['uid'] for summary in summaries)
+        
+        uidnext = selected['uidnext'] or max(uids, default=0) + 1
+        message_store.set_folder_state(
+            self.username, folder,
+            uidvalidity=selected['uidvalidity'],
+            uidnext=uidnext,
+            exists_count=exists,
+            low_uid=min(uids, default=uidnext),
+            highestmodseq=selected['highestmodseq'],
+            flags_synced_at=time.time()
+        )
+        
+        logger.info(f"Initial sync of {folder}: cached {len(uids)} of {exists} message(s)")
+        return exists
+    
+    def _apply_changes(self, folder: str, state: Dict, selected: Dict, count_mismatch: bool):
+        """
+        Apply flag changes and expunges since the last sync (CONDSTORE/QRESYNC).
+        
+        Args:
+            folder: IMAP folder name (must be selected)
+            state: Stored sync state from before this refresh
+            selected: Result of _select for this refresh
+            count_mismatch: Whether the message count shows expunges
+        """
+        account = self.username
+        cached_uids = message_store.uids(account, folder)
+        low_uid = state['low_uid']
+        
+        if selected['resynced']:
+            # QRESYNC: the SELECT response already carried VANISHED and FETCH data
+            changed = selected['changed']
+            vanished_ranges = selected['vanished']
+            expunged = [
+                uid for uid in cached_uids
+                if any(first <= uid <= last for first, last in vanished_ranges)
+            ]
+        else:
+            # CONDSTORE: fetch only the messages whose MODSEQ moved
+            changed = {}
+            for fetch_items in self._fetch_items(
+                f"{low_uid}:*".encode(), '(UID FLAGS)', uid=True,
+                modifier=f"(CHANGEDSINCE {state['highestmodseq']})"
+            ):
+                uid = fetch_items.get('UID')
+                if uid is not None and 'FLAGS' in fetch_items:
+                    changed[uid] = [str(flag) for flag in fetch_items['FLAGS']]
             
-            # Parse email addresses to extract name and email components
-            from_addr = self._parse_email_address(email_message['From'] or "")
-            to_addr = self._parse_email_address(email_message['To'] or "")
+            expunged = []
+            if count_mismatch:
+                present = set(self._uid_search(f'UID {low_uid}:*'))
+                expunged = [uid for uid in cached_uids if uid not in present]
+        
+        cached = set(cached_uids)
+        expunged_set = set(expunged)
+        changed = {uid: flags for uid, flags in changed.items() if uid in cached and uid not in expunged_set}
+        
+        if expunged:
+            message_store.delete_uids(account, folder, expunged)
+            message_cache.invalidate(account, folder, expunged)
+        if changed:
+            message_store.update_flags(account, folder, changed)
+        if expunged or changed:
+            logger.info(f"{folder}: {len(expunged)} expunged, {len(changed)} flag change(s) since MODSEQ {state['highestmodseq']}")
+    
+    def _diff_flags(self, folder: str, low_uid: int):
+        """
+        Compare cached UIDs and flags with the server and apply the differences.
+        
+        Args:
+            folder: IMAP folder name (must be selected)
+            low_uid: Lowest UID covered by the cache
+        """
+        account = self.username
+        server_flags = {}
+        for fetch_items in self._fetch_items(f"{low_uid}:*".encode(), '(UID FLAGS)', uid=True):
+            uid = fetch_items.get('UID')
+            if uid is not None and uid >= low_uid:
+                server_flags[uid] = [str(flag) for flag in fetch_items.get('FLAGS') or []]
+        
+        cached = message_store.flags(account, folder)
+        expunged = [uid for uid in cached if uid not in server_flags]
+        changed = {
+            uid: flags for uid, flags in server_flags.items()
+            if uid in cached and sorted(cached[uid]) != sorted(flags)
+        }
+        
+        if expunged:
+            message_store.delete_uids(account, folder, expunged)
+            message_cache.invalidate(account, folder, expunged)
+        if changed:
+            message_store.update_flags(account, folder, changed)
+        if expunged or changed:
+            logger.info(f"{folder}: {len(expunged)} expunged, {len(changed)} flag change(s)")
+    
+    def _list_messages(
+        self,
+        folder: str,
+        exists: int,
+        limit: int,
+        unread_only: bool,
+        snippet_length: int = 0,
+        before_uid: Optional[str] = None,
+        after_uid: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Return the newest messages of a synced folder (or one page of them),
+        from the store where possible.
+        
+        The store holds a contiguous window of the newest messages, so a
+        page is either served from it or extends it downwards with a single
+        FETCH of at most `limit` messages; the cost of a page does not grow
+        with the mailbox size.
+        
+        Args:
+            folder: IMAP folder name (must be selected and synced)
+            exists: Number of messages in the folder
+            limit: Maximum number of messages
+            unread_only: If True, list only unread messages
+            snippet_length: Preview bytes to fetch for messages not yet cached
+            before_uid: Page cursor: only messages older than this one
+            after_uid: Page cursor: only messages newer than this one
+        
+        Returns:
+            Message dictionaries, newest first
+        """
+        account = self.username
+        before, after = self._cursor_uid(before_uid), self._cursor_uid(after_uid)
+        
+        if unread_only:
+            # Unread messages may be older than the cached window
+            uids = self._page_uids(self._uid_search(f"UNSEEN {self._uid_range(before, after)}".strip()), limit, before, after)
+            messages = message_store.get_messages(account, folder, uids)
+            missing = [uid for uid in uids if uid not in messages]
+            for batch_start in range(0, len(missing), self.fetch_batch_size):
+                batch = missing[batch_start:batch_start + self.fetch_batch_size]
+                for summary in self._fetch_summaries(self._message_set(batch), uid=True, snippet_length=snippet_length):
+                    messages[summary['uid']] = summary
+            emails = [messages[uid] for uid in uids if uid in messages]
+        elif after is not None:
+            emails = message_store.list_messages(account, folder, limit, after_uid=after)
+            low_uid = message_store.get_folder_state(account, folder)['low_uid']
+            if after + 1 < low_uid:
+                # The cursor lies below the cached window (e.g. after a resync)
+                gap = self._page_uids(self._uid_search(f"UID {after + 1}:{low_uid - 1}"), limit, None, after)
+                gap = [uid for uid in gap if uid < low_uid]
+                fetched = []
+                for batch_start in range(0, len(gap), self.fetch_batch_size):
+                    batch = gap[batch_start:batch_start + self.fetch_batch_size]
+                    fetched.extend(self._fetch_summaries(self._message_set(batch), uid=True, snippet_length=snippet_length))
+                emails = sorted(fetched + emails, key=lambda email_data: email_data['uid'])[:limit]
+                emails.reverse()
+        else:
+            emails = message_store.list_messages(account, folder, limit, before_uid=before)
+            cached_count = message_store.count(account, folder)
             
-            # Parse date from RFC 2822 format to ISO format
-            # Email headers use RFC 2822 format (e.g., "Mon, 10 Feb 2026 14:35:22 +0530")
-            # We convert to ISO format for consistent frontend parsing
-            date_str = email_message['Date']
+            # Extend the cached window downwards (by sequence number) if needed
+            if len(emails) < limit and cached_count < exists:
+                last = exists - cached_count
+                first = max(1, last - (limit - len(emails)) + 1)
+                uids = []
+                for batch_start in range(first, last + 1, self.fetch_batch_size):
+                    batch_end = min(last, batch_start + self.fetch_batch_size - 1)
+                    summaries = self._fetch_summaries(
+                        f"{batch_start}:{batch_end}".encode(), uid=False, snippet_length=snippet_length
+                    )
+                    self._store_summaries(folder, summaries)
+                    uids.extend(summary['uid'] for summary in summaries)
+                if uids:
+                    message_store.set_folder_state(account, folder, low_uid=min(uids))
+                emails = message_store.list_messages(account, folder, limit, before_uid=before)
+        
+        uidvalidity = self._local.pooled.selected_uidvalidity
+        for email_data in emails:
+            email_data['folder'] = folder
+            email_data['uidvalidity'] = uidvalidity
+        return emails
+    
+    def _search_messages(
+        self,
+        folder: str,
+        limit: int,
+        unread_only: bool,
+        filters: Dict,
+        snippet_length: int = 0,
+        before_uid: Optional[str] = None,
+        after_uid: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Return the newest messages matching search filters, evaluated by the server.
+        
+        The folder is not synchronized: UID SEARCH picks the matches, the
+        flags of matches already in the local store are refreshed with one
+        UID FETCH (UID FLAGS), and only the remaining matches are fetched.
+        No other message is transferred.
+        
+        Args:
+            folder: IMAP folder name
+            limit: Maximum number of messages
+            unread_only: If True, list only unread messages
+            filters: Search filters (see _search_terms)
+            snippet_length: Preview bytes to fetch for messages not in the store
+            before_uid: Page cursor: only messages older than this one
+            after_uid: Page cursor: only messages newer than this one
+        
+        Returns:
+            Message dictionaries, newest first
+        """
+        account = self.username
+        selected = self._select(folder)
+        before, after = self._cursor_uid(before_uid), self._cursor_uid(after_uid)
+        criteria, utf8_terms = self._search_terms(filters, unread_only)
+        criteria = f"{criteria} {self._uid_range(before, after)}".strip()
+        uids = self._page_uids(self._filtered_uids(criteria, utf8_terms), limit, before, after)
+        if not uids:
+            return []
+        
+        messages = {}
+        state = message_store.get_folder_state(account, folder)
+        if state and state['uidvalidity'] == selected['uidvalidity']:
+            messages = message_store.get_messages(account, folder, uids)
+        if messages:
+            flags = {}
+            for fetch_items in self._fetch_items(self._message_set(list(messages)), '(UID FLAGS)', uid=True):
+                uid = fetch_items.get('UID')
+                if uid in messages and 'FLAGS' in fetch_items:
+                    flags[uid] = [str(flag) for flag in fetch_items['FLAGS']]
+            for uid, message_flags in flags.items():
+                messages[uid]['flags'] = message_flags
+            message_store.update_flags(account, folder, flags)
+        
+        missing = [uid for uid in uids if uid not in messages]
+        for batch_start in range(0, len(missing), self.fetch_batch_size):
+            batch = missing[batch_start:batch_start + self.fetch_batch_size]
+            for summary in self._fetch_summaries(self._message_set(batch), uid=True, snippet_length=snippet_length):
+                messages[summary['uid']] = summary
+        
+        emails = [messages[uid] for uid in uids if uid in messages]
+        for email_data in emails:
+            email_data['folder'] = folder
+            email_data['uidvalidity'] = selected['uidvalidity']
+        return emails
+    
+    @staticmethod
+    def page_cursor(uidvalidity: int, uid: int) -> str:
+        """
+        Build an opaque page cursor naming a message (for before_uid/after_uid).
+        
+        Args:
+            uidvalidity: UIDVALIDITY of the folder
+            uid: Message UID
+        
+        Returns:
+            URL-safe cursor string
+        """
+        return base64.urlsafe_b64encode(f"{uidvalidity}:{uid}".encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[int, int]:
+        """
+        Decode a page cursor built by page_cursor.
+        
+        Returns:
+            (uidvalidity, uid) tuple
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            decoded = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            uidvalidity, uid = (int(value) for value in decoded.split(':'))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValueError(f"Invalid page cursor: {cursor}")
+        if uid < 1:
+            raise ValueError(f"Invalid page cursor: {cursor}")
+        return uidvalidity, uid
+    
+    def _cursor_uid(self, cursor: Optional[str]) -> Optional[int]:
+        """
+        Decode a page cursor against the selected folder.
+        
+        Returns:
+            The cursor's UID, or None if no cursor was given
+        
+        Raises:
+            ValueError: If the cursor is malformed
+            StaleCursorError: If the folder's UIDVALIDITY changed since the cursor was issued
+        """
+        if cursor is None:
+            return None
+        uidvalidity, uid = self.decode_cursor(cursor)
+        if uidvalidity != self._local.pooled.selected_uidvalidity:
+            raise StaleCursorError("Folder was renumbered (UIDVALIDITY changed); reload the listing")
+        return uid
+    
+    @staticmethod
+    def _uid_range(before: Optional[int], after: Optional[int]) -> str:
+        """Build the UID search criterion for a page (empty without cursors)"""
+        if after is not None:
+            return f"UID {after + 1}:*"
+        if before is not None:
+            # UID 1 has nothing older; the range is clamped and filtered in _page_uids
+            return f"UID 1:{max(before - 1, 1)}"
+        return ""
+    
+    @staticmethod
+    def _page_uids(uids: Iterable[int], limit: int, before: Optional[int], after: Optional[int]) -> List[int]:
+        """
+        Pick one page from search results.
+        
+        Returns:
+            The `limit` UIDs right above `after`, or else the `limit` highest
+            UIDs below `before` (or overall), newest first
+        """
+        if after is not None:
+            # "n:*" always includes the highest UID, even when it is below n
+            return sorted((uid for uid in uids if uid > after))[:limit][::-1]
+        return sorted((uid for uid in uids if before is None or uid < before), reverse=True)[:limit]
+    
+    def _fill_bodies(self, folder: str, emails: List[Dict]):
+        """
+        Download and cache the bodies of listed messages that have none yet.
+        
+        Args:
+            folder: IMAP folder name (must be selected)
+            emails: Message dictionaries, updated in place
+        """
+        missing = [email_data for email_data in emails if 'body' not in email_data]
+        for batch_start in range(0, len(missing), self.fetch_batch_size):
+            batch = missing[batch_start:batch_start + self.fetch_batch_size]
             try:
-                date_obj = parsedate_to_datetime(date_str)
-                date = date_obj.isoformat()
+                fetched = self._fetch_emails_by_uids([email_data['uid'] for email_data in batch])
             except Exception as e:
-                logger.warning(f"Failed to parse date '{date_str}': {e}")
-                date = datetime.now().isoformat()
-            
-            message_id = email_message['Message-ID']
+                logger.error(f"Failed to fetch email bodies: {e}")
+                continue
             
-            # Check for quantum encryption headers
-            is_encrypted = email_message.get(config.EMAIL_ENCRYPTION_HEADER) == 'true'
-            key_id = email_message.get(config.EMAIL_KEY_ID_HEADER)
-            security_level = email_message.get(config.EMAIL_SECURITY_LEVEL_HEADER)
+            for email_data in batch:
+                full = fetched.get(email_data['id'])
+                if full:
+                    email_data['body'] = full['body']
+                    email_data['flags'] = full['flags']
             
-            # Extract body
-            body = self._extract_body(email_message)
-            
-            # Build email data
-            email_data = {
-                'id': msg_id.decode(),
-                'message_id': message_id,
-                'from': from_addr,
-                'to': to_addr,
-                'subject': subject,
-                'date': date,
-                'body': body,
-                'is_encrypted': is_encrypted,
-                'key_id': key_id,
-                'security_level': security_level,
-                'folder': 'inbox',  # Will be updated by caller
+            self._store_bodies(folder, [email_data for email_data in batch if 'body' in email_data])
+        
+        emails[:] = [email_data for email_data in emails if 'body' in email_data]
+    
+    def _fill_snippets(self, folder: str, emails: List[Dict], snippet_length: int):
+        """
+        Fetch previews for listed messages cached with a shorter (or no) snippet.
+        
+        Args:
+            folder: IMAP folder name (must be selected)
+            emails: Message dictionaries, updated in place
+            snippet_length: Requested preview bytes
+        """
+        if not snippet_length:
+            return
+        
+        missing = [email_data for email_data in emails if email_data.get('snippet_length', 0) < snippet_length]
+        for batch_start in range(0, len(missing), self.fetch_batch_size):
+            batch = missing[batch_start:batch_start + self.fetch_batch_size]
+            fetched = {
+                summary['uid']: summary
+                for summary in self._fetch_summaries(
+                    self._message_set([email_data['uid'] for email_data in batch]),
+                    uid=True, snippet_length=snippet_length
+                )
             }
+            for email_data in batch:
+                summary = fetched.get(email_data['uid'])
+                if summary:
+                    email_data['snippet'] = summary['snippet']
+                    email_data['snippet_length'] = snippet_length
             
-            return email_data
-            
-        except Exception as e:
-            logger.error(f"Error parsing email: {e}")
+            self._store_summaries(folder, [
+                {key: value for key, value in email_data.items() if key != 'body'}
+                for email_data in batch
+            ])
+    
+    def _store_summaries(self, folder: str, summaries: List[Dict]):
+        """Persist listing data (and any downloaded bodies) in the message store"""
+        if not summaries:
+            return
+        message_store.upsert_messages(
+            self.username, folder,
+            [{key: value for key, value in summary.items() if key != 'body'} for summary in summaries]
+        )
+        self._store_bodies(folder, [summary for summary in summaries if 'body' in summary])
+    
+    def _store_bodies(self, folder: str, emails: List[Dict]):
+        """Persist downloaded bodies (and the flags that came with them)"""
+        if not emails:
+            return
+        message_store.set_bodies(self.username, folder, {email_data['uid']: email_data['body'] for email_data in emails})
+        message_store.update_flags(self.username, folder, {email_data['uid']: email_data['flags'] for email_data in emails})
+    
+    def _uid_search(self, criteria: str, literal: Optional[bytes] = None) -> List[int]:
+        """
+        Run UID SEARCH in the selected folder.
+        
+        Args:
+            criteria: IMAP search criteria, e.g. 'UNSEEN'
+            literal: UTF-8 value sent as a literal after the criteria (which
+                     must then end with its search key, e.g. 'SUBJECT')
+        
+        Returns:
+            Matching UIDs in ascending order
+        """
+        if literal is None:
+            status, data = self.connection.uid('SEARCH', None, criteria)
+        else:
+            self.connection.literal = literal
+            status, data = self.connection.uid('SEARCH', 'CHARSET', 'UTF-8', criteria)
+        if status != 'OK' or not data or not data[0]:
+            return []
+        return sorted(int(uid) for uid in data[0].split())
+    
+    def _search_terms(self, filters: Optional[Dict], unread_only: bool = False) -> Tuple[str, List[Tuple[str, bytes]]]:
+        """
+        Compile search filters into IMAP SEARCH criteria (RFC 3501).
+        
+        Filters: 'from_addr', 'to', 'subject', 'text' (substring matches),
+        'since' and 'before' (dates, ISO strings allowed), 'security_level'
+        and 'encrypted' (quantum headers), 'larger' and 'smaller' (bytes).
+        All given filters must match.
+        
+        imaplib sends arguments as ASCII and supports a single literal per
+        command, so non-ASCII values are returned separately, each to be
+        sent as a UTF-8 literal in its own search (see _filtered_uids).
+        
+        Args:
+            filters: Filter values; None or missing keys are ignored
+            unread_only: Also require UNSEEN
+        
+        Returns:
+            (ASCII criteria, list of (search key, UTF-8 value) terms); both
+            empty when nothing is filtered
+        """
+        filters = {key: value for key, value in (filters or {}).items() if value is not None}
+        criteria = ['UNSEEN'] if unread_only else []
+        utf8_terms = []
+        
+        for key, search_key in (('from_addr', 'FROM'), ('to', 'TO'), ('subject', 'SUBJECT'), ('text', 'TEXT')):
+            if key not in filters:
+                continue
+            # CR/LF would end the command line
+            value = ' '.join(str(filters[key]).split())
+            if value.isascii():
+                criteria.append(f'{search_key} {self._quote(value)}')
+            else:
+                utf8_terms.append((search_key, value.encode('utf-8')))
+        
+        for key, search_key in (('since', 'SINCE'), ('before', 'BEFORE')):
+            if key in filters:
+                criteria.append(f'{search_key} {self._search_date(filters[key])}')
+        
+        if 'security_level' in filters:
+            level = getattr(filters['security_level'], 'value', filters['security_level'])
+            criteria.append(f'HEADER {config.EMAIL_SECURITY_LEVEL_HEADER} {self._quote(str(level))}')
+        if 'encrypted' in filters:
+            term = f'HEADER {config.EMAIL_ENCRYPTION_HEADER} "true"'
+            criteria.append(term if filters['encrypted'] else f'NOT {term}')
+        
+        for key, search_key in (('larger', 'LARGER'), ('smaller', 'SMALLER')):
+            if key in filters:
+                criteria.append(f'{search_key} {int(filters[key])}')
+        
+        return ' '.join(criteria), utf8_terms
+    
+    def _filtered_uids(self, criteria: str, utf8_terms: List[Tuple[str, bytes]]) -> List[int]:
+        """
+        Run the searches compiled by _search_terms and intersect the results.
+        
+        Args:
+            criteria: ASCII search criteria (may be empty)
+            utf8_terms: (search key, UTF-8 value) terms, one search each
+        
+        Returns:
+            UIDs matching every criterion, in ascending order
+        """
+        if not utf8_terms:
+            return self._uid_search(criteria)
+        
+        matches = None
+        for search_key, value in utf8_terms:
+            uids = set(self._uid_search(f'{criteria} {search_key}'.strip(), literal=value))
+            matches = uids if matches is None else matches & uids
+            if not matches:
+                break
+        return sorted(matches)
+    
+    @staticmethod
+    def _quote(value: str) -> str:
+        """Quote an ASCII value as an IMAP string"""
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    
+    @staticmethod
+    def _search_date(value) -> str:
+        """Format a date (or ISO date string) as an IMAP search date, e.g. 10-Feb-2026"""
+        if isinstance(value, datetime):
+            value = value.date()
+        elif not isinstance(value, date):
+            value = date.fromisoformat(str(value)[:10])
+        months = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+        return f'{value.day}-{months[value.month - 1]}-{value.year}'
+    
+    def _fetch_items(self, message_set: bytes, items: str, uid: bool, modifier: Optional[str] = None) -> List[Dict]:
+        """
+        Run FETCH (or UID FETCH) and parse the response.
+        
+        Unsolicited FETCH responses for the same message (e.g. a separate
+        FLAGS update) are merged into one item dictionary.
+        
+        Args:
+            message_set: Sequence or UID set
+            items: FETCH item list, e.g. '(UID FLAGS)'
+            uid: Whether message_set holds UIDs
+            modifier: Optional UID FETCH modifier, e.g. '(CHANGEDSINCE 123)'
+        
+        Returns:
+            Parsed FETCH item dictionaries, in response order
+        """
+        if uid:
+            args = (items, modifier) if modifier else (items,)
+            status, data = self.connection.uid('FETCH', message_set, *args)
+        else:
+            status, data = self.connection.fetch(message_set, items)
+        if status != 'OK':
+            return []
+        
+        merged: Dict[int, Dict] = {}
+        for seq, fetch_items in parse_fetch_response(data):
+            merged.setdefault(seq, {}).update(fetch_items)
+        return list(merged.values())
+    
+    def _fetch_emails_by_uids(self, uids: List[int]) -> Dict[str, Dict]:
+        """
+        Fetch several emails by UID: headers, structure, flags and text body.
+        
+        Only the part that becomes the body is downloaded; attachments stay
+        on the server and are listed as part references under 'attachments'.
+        
+        Args:
+            uids: Email UIDs
+        
+        Returns:
+            Dictionary mapping email ID (UID string) to parsed email data
+        """
+        if not uids:
+            return {}
+        
+        summaries = self._fetch_summaries(self._message_set(uids), uid=True, with_bodies=True)
+        return {summary['id']: summary for summary in summaries if 'body' in summary}
+    
+    def _fetch_summaries(
+        self,
+        message_set: bytes,
+        uid: bool,
+        snippet_length: int = 0,
+        with_bodies: bool = False
+    ) -> List[Dict]:
+        """
+        Fetch headers, structure, size and flags for several emails in one FETCH.
+        
+        Args:
+            message_set: Sequence or UID set
+            uid: Whether message_set holds UIDs
+            snippet_length: Number of bytes of the body part to fetch (0 disables,
+                see _fetch_snippets)
+            with_bodies: Also fetch the text body (see _fetch_bodies)
+        
+        Returns:
+            Email summary dictionaries, in response order
+        """
+        header_fields = ' '.join(self.summary_headers)
+        items = f'(UID FLAGS RFC822.SIZE BODYSTRUCTURE BODY.PEEK[HEADER.FIELDS ({header_fields})]'
+        if snippet_length > 0:
+            items += f' BODY.PEEK[1]<0.{snippet_length}>'
+        items += ')'
+        
+        summaries = []
+        structures = {}
+        for fetch_items in self._fetch_items(message_set, items, uid):
+            if fetch_items.get('UID') is None:
+                continue
+            try:
+                parts = walk_bodystructure(fetch_items.get('BODYSTRUCTURE'))
+                summary = self._parse_summary(fetch_items, parts)
+                summary['snippet_length'] = snippet_length
+                summaries.append(summary)
+                structures[summary['uid']] = parts
+            except Exception as e:
+                logger.error(f"Error parsing summary for email {fetch_items.get('UID')}: {e}")
+        
+        if snippet_length > 0:
+            self._fetch_snippets(summaries, structures, snippet_length)
+        if with_bodies:
+            self._fetch_bodies(summaries, structures)
+        
+        return summaries
+    
+    def _fetch_snippets(self, summaries: List[Dict], structures: Dict[int, List[Dict]], snippet_length: int):
+        """
+        Fetch previews of messages whose body part is not section 1.
+        
+        The summary FETCH asks for the first bytes of section 1, which is the
+        body part of single-part messages and of most multiparts. When the
+        text sits deeper (e.g. multipart/mixed around multipart/alternative,
+        where section 1 is itself a multipart), the prefix of the right
+        section is fetched here, one UID FETCH per distinct section.
+        
+        Args:
+            summaries: Email summaries, updated in place with 'snippet'
+            structures: Leaf parts of each message (walk_bodystructure), by UID
+            snippet_length: Preview bytes to fetch
+        """
+        body_parts: Dict[int, Dict] = {}
+        sections: Dict[str, List[int]] = {}
+        for uid, parts in structures.items():
+            part = self._body_part(parts)
+            if part is not None and part['section'] != '1' and part['content_type'].startswith('text/'):
+                body_parts[uid] = part
+                sections.setdefault(part['section'], []).append(uid)
+        if not sections:
+            return
+        
+        snippets: Dict[int, str] = {}
+        for section, uids in sections.items():
+            items = f'(UID BODY.PEEK[{section}]<0.{snippet_length}>)'
+            for fetch_items in self._fetch_items(self._message_set(uids), items, uid=True):
+                uid = fetch_items.get('UID')
+                data = find_item(fetch_items, f'BODY[{section}]')
+                if uid in body_parts and data:
+                    snippets[uid] = self._decode_snippet(data, body_parts[uid])
+        
+        for summary in summaries:
+            if summary['uid'] in snippets:
+                summary['snippet'] = snippets[summary['uid']]
+    
+    def _fetch_bodies(self, summaries: List[Dict], structures: Dict[int, List[Dict]]):
+        """
+        Download the text body of each message, and nothing else.
+        
+        The BODYSTRUCTURE already fetched identifies the part that becomes
+        the body (the first inline text/plain or text/html part), and only
+        that section is transferred, one UID FETCH per distinct section.
+        Large attachments therefore never reach this process when a message
+        is opened. Messages without a usable BODYSTRUCTURE fall back to a
+        full RFC822 download.
+        
+        Args:
+            summaries: Email summaries, updated in place with 'body'
+            structures: Leaf parts of each message (walk_bodystructure), by UID
+        """
+        bodies: Dict[int, str] = {}
+        body_parts: Dict[int, Dict] = {}
+        sections: Dict[str, List[int]] = {}
+        unstructured = []
+        for uid, parts in structures.items():
+            if not parts:
+                unstructured.append(uid)
+                continue
+            part = self._body_part(parts)
+            if part is None:
+                bodies[uid] = ""
+                continue
+            body_parts[uid] = part
+            sections.setdefault(part['section'], []).append(uid)
+        
+        for section, uids in sections.items():
+            for fetch_items in self._fetch_items(self._message_set(uids), f'(UID BODY.PEEK[{section}])', uid=True):
+                uid = fetch_items.get('UID')
+                data = find_item(fetch_items, f'BODY[{section}]')
+                if uid in body_parts and data is not None:
+                    bodies[uid] = self._decode_part(data, body_parts[uid])
+        
+        if unstructured:
+            for fetch_items in self._fetch_items(self._message_set(unstructured), '(UID RFC822)', uid=True):
+                uid = fetch_items.get('UID')
+                raw_email = fetch_items.get('RFC822')
+                if uid is not None and raw_email is not None:
+                    bodies[uid] = self._extract_body(email.message_from_bytes(raw_email))
+        
+        for summary in summaries:
+            if summary['uid'] in bodies:
+                summary['body'] = bodies[summary['uid']]
+    
+    @staticmethod
+    def _body_part(parts: List[Dict]) -> Optional[Dict]:
+        """
+        Pick the part shown as the message body (same rule as _extract_body).
+        
+        Args:
+            parts: Leaf parts from walk_bodystructure
+        
+        Returns:
+            The first inline text/plain or text/html part, the only part of a
+            single-part message, or None
+        """
+        for part in parts:
+            if part['disposition'] != 'attachment' and part['content_type'] in ('text/plain', 'text/html'):
+                return part
+        if len(parts) == 1 and parts[0]['disposition'] != 'attachment':
+            return parts[0]
+        return None
+    
+    def _parse_summary(self, fetch_items: Dict, parts: List[Dict]) -> Dict:
+        """
+        Build an email summary from parsed FETCH items.
+        
+        Args:
+            fetch_items: Parsed FETCH items for this message
+            parts: Leaf parts of its BODYSTRUCTURE (walk_bodystructure)
+        
+        Returns:
+            Dictionary of email summary data (without 'body')
+        """
+        header_bytes = find_item(fetch_items, 'BODY[HEADER') or b''
+        headers = BytesHeaderParser().parsebytes(header_bytes)
+        summary = self._header_fields(str(fetch_items['UID']), headers)
+        
+        attachments = [
+            {
+                'section': part['section'],
+                'filename': part['filename'],
+                'content_type': part['content_type'],
+                'size': part['size']
+            }
+            for part in parts
+            if part['disposition'] == 'attachment' or part['filename']
+        ]
+        
+        summary['uid'] = fetch_items['UID']
+        summary['size'] = fetch_items.get('RFC822.SIZE')
+        summary['flags'] = [str(flag) for flag in fetch_items.get('FLAGS') or []]
+        summary['attachments'] = attachments
+        summary['has_attachments'] = bool(attachments)
+        
+        # Section 1 is only the body part when it is a leaf (see _fetch_snippets)
+        snippet = find_item(fetch_items, 'BODY[1]')
+        part = self._body_part(parts)
+        if snippet and part is not None and part['section'] == '1':
+            summary['snippet'] = self._decode_snippet(snippet, part)
+        else:
+            summary['snippet'] = None
+        
+        return summary
+    
+    def _decode_snippet(self, data: bytes, part: Dict) -> Optional[str]:
+        """
+        Decode a (possibly truncated) prefix of a body part for display.
+        
+        Args:
+            data: First bytes of the part as transferred
+            part: Part description from walk_bodystructure
+        
+        Returns:
+            Whitespace-collapsed preview text, or None if the part is not text
+        """
+        if not part['content_type'].startswith('text/'):
             return None
+        
+        return ' '.join(self._decode_part(data, part, errors='ignore').split())
+    
+    @staticmethod
+    def _decode_part(data: bytes, part: Dict, errors: str = 'replace') -> str:
+        """
+        Undo a part's transfer encoding and decode it with its charset.
+        
+        Args:
+            data: Part content as transferred (a truncated prefix is allowed)
+            part: Part description from walk_bodystructure
+            errors: Error handler for the charset decode
+        
+        Returns:
+            Decoded text
+        """
+        if part['encoding'] == 'base64':
+            compact = b''.join(data.split())
+            data = base64.b64decode(compact[:len(compact) - len(compact) % 4])
+        elif part['encoding'] == 'quoted-printable':
+            data = quopri.decodestring(data)
+        
+        charset = part['params'].get('charset') or 'utf-8'
+        try:
+            return data.decode(charset, errors=errors)
+        except LookupError:
+            return data.decode('utf-8', errors=errors)
+    
+    @staticmethod
+    def _message_set(msg_ids: List) -> bytes:
+        """
+        Build a compact IMAP message set, collapsing consecutive IDs into ranges.
+        
+        Args:
+            msg_ids: Sequence numbers or UIDs as int, str or bytes (any order)
+        
+        Returns:
+            Message set such as b'1:50,75,80:82'
+        """
+        numbers = sorted({int(msg_id) for msg_id in msg_ids})
+        ranges = []
+        start = prev = numbers[0]
+        for number in numbers[1:]:
+            if number != prev + 1:
+                ranges.append((start, prev))
+                start = number
+            prev = number
+        ranges.append((start, prev))
+        
+        return b','.join(
+            str(first).encode() if first == last else f"{first}:{last}".encode()
+            for first, last in ranges
+        )
+    
+    def _header_fields(self, msg_id: str, email_message) -> Dict:
+        """
+        Extract the listing fields from a message's headers.
+        
+        Args:
+            msg_id: Email ID (UID)
+            email_message: Parsed message (full or headers only)
+        
+        Returns:
+            Dictionary of email data without the body
+        """
+        # Extract headers
+        subject = self._decode_header(email_message['Subject'])
+        
+        # Parse email addresses to extract name and email components
+        from_addr = self._parse_email_address(email_message['From'] or "")
+        to_addr = self._parse_email_address(email_message['To'] or "")
+        
+        # Parse date from RFC 2822 format to ISO format
+        # Email headers use RFC 2822 format (e.g., "Mon, 10 Feb 2026 14:35:22 +0530")
+        # We convert to ISO format for consistent frontend parsing
+        date_str = email_message['Date']
+        try:
+            date_obj = parsedate_to_datetime(date_str)
+            date = date_obj.isoformat()
+        except Exception as e:
+            logger.warning(f"Failed to parse date '{date_str}': {e}")
+            date = datetime.now().isoformat()
+        
+        message_id = email_message['Message-ID']
+        
+        # Check for quantum encryption headers
+        is_encrypted = email_message.get(config.EMAIL_ENCRYPTION_HEADER) == 'true'
+        key_id = email_message.get(config.EMAIL_KEY_ID_HEADER)
+        security_level = email_message.get(config.EMAIL_SECURITY_LEVEL_HEADER)
+        
+        return {
+            'id': msg_id,
+            'message_id': message_id,
+            'from': from_addr,
+            'to': to_addr,
+            'subject': subject,
+            'date': date,
+            'is_encrypted': is_encrypted,
+            'key_id': key_id,
+            'security_level': security_level,
+            'folder': 'inbox',  # Will be updated by caller
+        }
     
     def _decode_header(self, header_value: str) -> str:
         """Decode email header (handles encoded subjects)"""
@@ -311,35 +1665,263 @@ class EmailReceiver:
         
         return body
     
+    def get_emails_by_ids(self, folder: str, msg_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch several emails by ID, in at most one IMAP round trip.
+        
+        Messages in the message cache, or whose body is in the local message
+        store, are returned without contacting the server; only the rest are
+        fetched. Messages served from the message cache carry no 'flags'.
+        
+        Args:
+            folder: IMAP folder name
+            msg_ids: Email IDs (UIDs)
+        
+        Returns:
+            Dictionary mapping email ID to email data (missing and non-numeric
+            IDs are omitted; if the server cannot be reached, only the
+            messages available locally are returned)
+        """
+        uids = [int(msg_id) for msg_id in msg_ids if str(msg_id).isdigit()]
+        emails = self._cached_emails(folder, uids)
+        uids = [uid for uid in uids if str(uid) not in emails]
+        if not uids:
+            return emails
+        
+        try:
+            with self._checkout() as pooled:
+                try:
+                    # Select folder, unless this connection already has it selected
+                    if pooled.selected_folder == folder:
+                        uidvalidity = pooled.selected_uidvalidity
+                    else:
+                        uidvalidity = self._select(folder)['uidvalidity']
+                    
+                    # Fetch emails
+                    fetched = self._fetch_emails_by_uids(uids)
+                except Exception as e:
+                    self._note_failure(e)
+                    raise
+                
+                for email_data in fetched.values():
+                    email_data['folder'] = folder
+                self._cache_emails(folder, uidvalidity, fetched.values())
+                
+                # Keep the local store's copy of these bodies if it is still valid
+                state = message_store.get_folder_state(self.username, folder)
+                if state and state['uidvalidity'] == uidvalidity:
+                    self._store_bodies(folder, list(fetched.values()))
+                
+                emails.update(fetched)
+                return emails
+        
+        except Exception as e:
+            # Still hand out what was found locally (connection failures included)
+            logger.error(f"Failed to get emails: {e}")
+            return emails
+    
+    def _cached_emails(self, folder: str, uids: List[int]) -> Dict[str, Dict]:
+        """
+        Look messages up in the message cache, then in the local message store.
+        
+        Both are keyed by the folder's UIDVALIDITY as of the last sync, so
+        no IMAP command is needed.
+        
+        Args:
+            folder: IMAP folder name
+            uids: Message UIDs
+        
+        Returns:
+            Dictionary mapping email ID to email data for the messages found
+        """
+        state = message_store.get_folder_state(self.username, folder)
+        if not state:
+            return {}
+        
+        uidvalidity = state['uidvalidity']
+        emails = {}
+        if config.MESSAGE_CACHE_ENABLED:
+            for uid in uids:
+                email_data = message_cache.get(self.username, folder, uidvalidity, uid)
+                if email_data:
+                    emails[email_data['id']] = email_data
+        
+        missing = [uid for uid in uids if str(uid) not in emails]
+        stored = [
+            email_data for email_data in message_store.get_messages(self.username, folder, missing).values()
+            if email_data.get('body') is not None
+        ]
+        for email_data in stored:
+            email_data['folder'] = folder
+            emails[email_data['id']] = email_data
+        self._cache_emails(folder, uidvalidity, stored)
+        
+        return emails
+    
+    def _cache_emails(self, folder: str, uidvalidity: Optional[int], emails: Iterable[Dict]):
+        """Add downloaded messages (with bodies) to the message cache"""
+        if uidvalidity is None or not config.MESSAGE_CACHE_ENABLED:
+            return
+        for email_data in emails:
+            message_cache.put(self.username, folder, uidvalidity, email_data)
+    
     def get_email_by_id(self, folder: str, msg_id: str) -> Optional[Dict]:
         """
         Fetch a specific email by ID.
         
         Args:
             folder: IMAP folder name
-            msg_id: Email message ID
+            msg_id: Email ID (UID)
         
         Returns:
             Email dictionary or None
         """
-        if not self.connection:
-            if not self.connect():
-                raise Exception("Failed to connect to IMAP server")
+        return self.get_emails_by_ids(folder, [msg_id]).get(str(msg_id))
+    
+    def describe_part(self, folder: str, msg_id: str, section: str) -> Optional[Dict]:
+        """
+        Look up one MIME part of a message without downloading its content.
         
-        try:
-            # Select folder
-            self.connection.select(folder)
-            
-            # Fetch email
-            email_data = self._fetch_email_by_id(msg_id.encode())
-            if email_data:
-                email_data['folder'] = folder
-            
-            return email_data
+        Costs two small FETCHes: the BODYSTRUCTURE, then the part's MIME
+        header (for per-part encryption headers) together with its decoded
+        size when the server offers BINARY (RFC 3516).
+        
+        Args:
+            folder: IMAP folder name
+            msg_id: Email ID (UID)
+            section: MIME section number, e.g. '2' or '1.3'
+        
+        Returns:
+            Part dictionary ('uid', 'section', 'content_type', 'filename',
+            'encoding', 'size' (decoded octets, None if unknown), 'binary'
+            and 'encryption' (None, or 'key_id', 'security_level', 'nonce')),
+            or None if the message or section does not exist
+        """
+        if not str(msg_id).isdigit():
+            return None
+        uid = int(msg_id)
+        with self._checkout() as pooled:
+            try:
+                if pooled.selected_folder != folder:
+                    self._select(folder)
+                
+                fetched = self._fetch_items(str(uid).encode(), '(UID BODYSTRUCTURE)', uid=True)
+                structure = next((items.get('BODYSTRUCTURE') for items in fetched if items.get('UID') == uid), None)
+                part = next((p for p in walk_bodystructure(structure) if p['section'] == section), None)
+                if part is None:
+                    return None
+                
+                # A single-part message has no part header of its own
+                multipart = isinstance(structure[0], list)
+                header_item = f'{section}.MIME' if multipart else 'HEADER'
+                binary = part['encoding'] not in IDENTITY_ENCODINGS and 'BINARY' in self.connection.capabilities
+                items = f'(UID BODY.PEEK[{header_item}]'
+                if binary:
+                    items += f' BINARY.SIZE[{section}]'
+                items += ')'
+                
+                header_bytes = b''
+                size = part['size'] if part['encoding'] in IDENTITY_ENCODINGS else None
+                for fetch_items in self._fetch_items(str(uid).encode(), items, uid=True):
+                    if fetch_items.get('UID') != uid:
+                        continue
+                    header_bytes = find_item(fetch_items, f'BODY[{header_item}]') or header_bytes
+                    if binary and isinstance(find_item(fetch_items, f'BINARY.SIZE[{section}]'), int):
+                        size = find_item(fetch_items, f'BINARY.SIZE[{section}]')
             
+            except Exception as e:
+                self._note_failure(e)
+                logger.error(f"Failed to describe part {section} of email {msg_id}: {e}")
+                raise
+        
+        headers = BytesHeaderParser().parsebytes(header_bytes)
+        encryption = None
+        if headers.get(config.EMAIL_ENCRYPTION_HEADER) == 'true':
+            encryption = {
+                'key_id': headers.get(config.EMAIL_KEY_ID_HEADER),
+                'security_level': headers.get(config.EMAIL_SECURITY_LEVEL_HEADER),
+                'nonce': headers.get(config.EMAIL_NONCE_HEADER)
+            }
+        
+        return {
+            'uid': uid,
+            'section': section,
+            'content_type': part['content_type'],
+            'filename': part['filename'],
+            'encoding': part['encoding'],
+            'size': size,
+            'binary': binary,
+            'encryption': encryption
+        }
+    
+    def open_part(
+        self,
+        folder: str,
+        part: Dict,
+        start: int = 0,
+        end: Optional[int] = None,
+        cipher: Optional[CipherFactory] = None,
+        cipher_seekable: bool = True
+    ) -> PartStream:
+        """
+        Open a chunked stream over one MIME part (see describe_part).
+        
+        The content is fetched with BODY.PEEK[section]<offset.length> (or
+        BINARY.PEEK, already decoded by the server, when describe_part found
+        BINARY support), one chunk per PartStream.read(). The stream keeps a
+        pooled connection checked out until it is exhausted or closed, so
+        its reads may run on any thread.
+        
+        Args:
+            folder: IMAP folder name
+            part: Part dictionary returned by describe_part
+            start: First decoded byte to return
+            end: Last decoded byte to return (inclusive), or None for all
+            cipher: Optional decryption of the decoded content
+            cipher_seekable: Whether the cipher can start at a non-zero offset
+        
+        Returns:
+            PartStream owning a pooled connection
+        """
+        pooled = self.pool.acquire()
+        try:
+            if pooled.selected_folder != folder:
+                self._local.pooled = pooled
+                try:
+                    self._select(folder)
+                finally:
+                    self._local.pooled = None
         except Exception as e:
-            logger.error(f"Failed to get email: {e}")
-            return None
+            self.pool.release(pooled, discard=isinstance(e, CONNECTION_ERRORS))
+            raise
+        
+        uid = str(part['uid']).encode()
+        section = part['section']
+        name = 'BINARY' if part['binary'] else 'BODY'
+        
+        def fetch(offset: int, length: int) -> bytes:
+            status, data = pooled.imap.uid('FETCH', uid, f'({name}.PEEK[{section}]<{offset}.{length}>)')
+            if status != 'OK':
+                raise Exception(f"Failed to fetch part {section} of email {part['uid']}")
+            for _, fetch_items in parse_fetch_response(data):
+                value = find_item(fetch_items, f'{name}[{section}]')
+                if value is not None:
+                    return value.encode() if isinstance(value, str) else value
+            return b''
+        
+        def release(discard: bool):
+            self.pool.release(pooled, discard=discard)
+        
+        return PartStream(
+            fetch,
+            release,
+            encoding='binary' if part['binary'] else part['encoding'],
+            start=start,
+            end=end,
+            cipher=cipher,
+            cipher_seekable=cipher_seekable,
+            chunk_size=self.part_chunk_size
+        )
 
 
 # Singleton instance
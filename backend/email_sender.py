@@ -24,7 +24,8 @@ class EmailSender:
         smtp_port: Optional[int] = None,
         username: Optional[str] = None,
         password: Optional[str] = None,
-        use_tls: bool = True
+        use_tls: bool = True,
+        timeout: Optional[float] = None
     ):
         """
         Initialize the EmailSender with SMTP configuration.
@@ -35,12 +36,14 @@ class EmailSender:
             username: SMTP authentication username (defaults to config)
             password: SMTP authentication password (defaults to config)
             use_tls: Whether to use TLS encryption (defaults to True)
+            timeout: Socket timeout in seconds (defaults to config)
         """
         self.smtp_server = smtp_server or config.SMTP_SERVER
         self.smtp_port = smtp_port or config.SMTP_PORT
         self.username = username or config.SMTP_USERNAME
         self.password = password or config.SMTP_PASSWORD
         self.use_tls = use_tls
+        self.timeout = timeout or config.SMTP_TIMEOUT
         
         logger.info(f"EmailSender initialized with server: {self.smtp_server}:{self.smtp_port}")
     
@@ -87,7 +90,7 @@ class EmailSender:
             # Connect to SMTP server and send
             logger.info(f"Connecting to SMTP server {self.smtp_server}:{self.smtp_port}")
             
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+            with smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout) as server:
                 if self.use_tls:
                     logger.info("Starting TLS")
                     server.starttls()
@@ -5,11 +5,16 @@ This module contains actual encryption implementations for various security leve
 import base64
 import json
 import hashlib
-from typing import Tuple
+from typing import Callable, Optional, Tuple
 from Crypto.Cipher import AES
 from kyber_py.kyber import Kyber512
 
 from models import SecurityLevel, EncryptionMetadata
+from xor_engine import XorStream, xor_bytes
+
+# Pre-generated Kyber-512 material: (public_key, secret_key, encapsulation),
+# where encapsulation is an optional (shared_key, kyber_ciphertext) pair
+KyberMaterial = Tuple[bytes, bytes, Optional[Tuple[bytes, bytes]]]
 
 
 def encrypt_message(
@@ -18,7 +23,8 @@ def encrypt_message(
     key_id: str,
     security_level: SecurityLevel,
     sender_sae_id: str,
-    receiver_sae_id: str
+    receiver_sae_id: str,
+    kyber_material: Optional[KyberMaterial] = None
 ) -> Tuple[str, EncryptionMetadata]:
     """
     Encrypt a message using the specified security level.
@@ -30,6 +36,7 @@ def encrypt_message(
         security_level: The security level (L1, L2, L3, L4)
         sender_sae_id: Sender SAE identifier
         receiver_sae_id: Receiver SAE identifier
+        kyber_material: Optional pre-generated Kyber-512 material for L3
     
     Returns:
         Tuple of (encrypted_message, metadata)
@@ -55,7 +62,7 @@ def encrypt_message(
         
     elif security_level == SecurityLevel.L3:
         # L3: Post-Quantum Cryptography (Kyber-512 + QKD)
-        encrypted, nonce, kyber_c, kyber_sk = _encrypt_pqc(plaintext, key)
+        encrypted, nonce, kyber_c, kyber_sk = _encrypt_pqc(plaintext, key, kyber_material)
         metadata.algorithm_info = "Kyber-512 + QKD (Hybrid Post-Quantum)"
         metadata.nonce = nonce
         metadata.kyber_ciphertext = kyber_c
@@ -90,18 +97,13 @@ def _encrypt_otp(plaintext: str, key: str) -> str:
     """
     # Convert plaintext to bytes
     pt_bytes = plaintext.encode('utf-8')
-    pt_length = len(pt_bytes)
     
     # Decode the QKD key
     key_bytes = base64.b64decode(key)
     
-    # Ensure key is long enough (for true OTP, key must equal data length)
-    if len(key_bytes) < pt_length:
-        # Repeat key if necessary (note: this weakens OTP security)
-        key_bytes = (key_bytes * ((pt_length // len(key_bytes)) + 1))[:pt_length]
-    
-    # XOR operation
-    ciphertext_bytes = bytes([pt_bytes[i] ^ key_bytes[i] for i in range(pt_length)])
+    # XOR operation (for true OTP, key must equal data length; a shorter
+    # key is repeated by the XOR engine, which weakens OTP security)
+    ciphertext_bytes = xor_bytes(pt_bytes, key_bytes)
     
     # Return base64-encoded ciphertext
     return base64.b64encode(ciphertext_bytes).decode('utf-8')
@@ -135,7 +137,26 @@ def _encrypt_aes_cfb(plaintext: str, key: str) -> Tuple[str, str]:
     return ciphertext_b64, nonce_b64
 
 
-def _encrypt_pqc(plaintext: str, key: str) -> Tuple[str, str, str, str]:
+def generate_kyber_material(encapsulate: bool = True) -> KyberMaterial:
+    """
+    Generate a Kyber-512 keypair, and optionally a ready encapsulation, ahead of use.
+    
+    Args:
+        encapsulate: Whether to also run encaps against the new public key
+    
+    Returns:
+        Tuple of (public_key, secret_key, encapsulation or None)
+    """
+    pk, sk = Kyber512.keygen()
+    encapsulation = Kyber512.encaps(pk) if encapsulate else None
+    return pk, sk, encapsulation
+
+
+def _encrypt_pqc(
+    plaintext: str,
+    key: str,
+    kyber_material: Optional[KyberMaterial] = None
+) -> Tuple[str, str, str, str]:
     """
     Post-Quantum Cryptography encryption using Kyber-512 + QKD hybrid
     
@@ -144,13 +165,17 @@ def _encrypt_pqc(plaintext: str, key: str) -> Tuple[str, str, str, str]:
     Args:
         plaintext: The message to encrypt
         key: Base64-encoded QKD key (128 bits minimum)
+        kyber_material: Optional pre-generated Kyber material; generated inline if absent
     
     Returns:
         Tuple of (ciphertext_b64, nonce_b64, kyber_ciphertext_b64, kyber_secret_key_b64)
     """
-    # Generate Kyber-512 keys
-    pk, sk = Kyber512.keygen()
-    ck_key, c = Kyber512.encaps(pk)
+    # Generate Kyber-512 keys (unless pre-generated material was supplied)
+    if kyber_material is None:
+        kyber_material = generate_kyber_material(encapsulate=True)
+    
+    pk, sk, encapsulation = kyber_material
+    ck_key, c = encapsulation if encapsulation is not None else Kyber512.encaps(pk)
     
     # Decode QKD key
     qk_key_bytes = base64.b64decode(key)
@@ -237,14 +262,9 @@ def _decrypt_otp(ciphertext: str, key: str) -> str:
     # Decode ciphertext and key
     ct_bytes = base64.b64decode(ciphertext)
     key_bytes = base64.b64decode(key)
-    ct_length = len(ct_bytes)
-    
-    # Ensure key is long enough
-    if len(key_bytes) < ct_length:
-        key_bytes = (key_bytes * ((ct_length // len(key_bytes)) + 1))[:ct_length]
     
     # XOR operation (same as encryption)
-    plaintext_bytes = bytes([ct_bytes[i] ^ key_bytes[i] for i in range(ct_length)])
+    plaintext_bytes = xor_bytes(ct_bytes, key_bytes)
     
     return plaintext_bytes.decode('utf-8')
 
@@ -318,6 +338,55 @@ def _decrypt_pqc(
     return plaintext.decode('utf-8')
 
 
+# Levels whose part decryption can start at any byte offset (see part_decryptor)
+SEEKABLE_PART_LEVELS = (SecurityLevel.L1.value, SecurityLevel.L4.value)
+
+
+def part_decryptor(
+    security_level: str,
+    key: str,
+    nonce: Optional[str] = None,
+    offset: int = 0
+) -> Callable[[bytes], bytes]:
+    """
+    Incremental decryption of an encrypted attachment part.
+    
+    Part content is raw ciphertext (after transfer decoding), decrypted
+    piece by piece as it is downloaded. L1 (XOR) can start at any offset;
+    L2 (AES-256-CFB) must start at the beginning of the part. L3 parts
+    cannot be streamed (the Kyber parameters travel in the message body).
+    
+    Args:
+        security_level: Security level of the part (L1, L2, L4)
+        key: Base64-encoded QKD key
+        nonce: Base64-encoded IV (required for L2)
+        offset: Position in the part of the first byte that will be fed
+    
+    Returns:
+        Function decrypting the next piece of ciphertext
+    
+    Raises:
+        ValueError: If the level cannot be streamed or parameters are missing
+    """
+    security_level = SecurityLevel(security_level)
+    
+    if security_level == SecurityLevel.L1:
+        return XorStream(base64.b64decode(key), offset=offset).update
+    
+    if security_level == SecurityLevel.L2:
+        if not nonce:
+            raise ValueError("Nonce is required for AES-CFB decryption")
+        if offset:
+            raise ValueError("AES-CFB part decryption must start at offset 0")
+        cipher = AES.new(base64.b64decode(key), AES.MODE_CFB, base64.b64decode(nonce))
+        return cipher.decrypt
+    
+    if security_level == SecurityLevel.L4:
+        return bytes
+    
+    raise ValueError(f"Streaming decryption is not supported for security level {security_level.value}")
+
+
 def format_encrypted_email_body(encrypted_data: str, metadata: EncryptionMetadata) -> str:
     """
     Format the encrypted message and metadata into the email body.
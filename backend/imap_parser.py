@@ -0,0 +1,263 @@
+"""
+IMAP Response Parser Module
+Parses raw imaplib FETCH responses (including literals and nested lists)
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_LITERAL = re.compile(rb'\{(\d+)\+?\}\r\n')
+
+
+class _Reader:
+    """Cursor over the wire-format bytes of a response"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def skip_ws(self):
+        while self.pos < len(self.data) and self.data[self.pos:self.pos + 1] in (b' ', b'\r', b'\n'):
+            self.pos += 1
+
+    def peek(self) -> bytes:
+        return self.data[self.pos:self.pos + 1]
+
+    def at_end(self) -> bool:
+        return self.pos >= len(self.data)
+
+
+def _join(data: List[Any]) -> bytes:
+    """
+    Rebuild the wire format from imaplib's response list.
+
+    imaplib splits a response at every literal: the text up to and including
+    "{n}" and the n literal bytes come back as a tuple, and the remainder of
+    the line follows as the next list element.
+    """
+    parts = []
+    for item in data:
+        if isinstance(item, tuple):
+            parts.append(item[0])
+            parts.append(b'\r\n')
+            parts.append(item[1])
+        elif item is not None:
+            parts.append(item)
+    return b''.join(parts)
+
+
+def _read_atom(reader: _Reader) -> bytes:
+    start = reader.pos
+    while not reader.at_end() and reader.peek() not in (b' ', b'(', b')', b'\r', b'\n'):
+        reader.pos += 1
+    return reader.data[start:reader.pos]
+
+
+def _read_key(reader: _Reader) -> str:
+    """Read a FETCH item name such as BODY[HEADER.FIELDS (FROM TO)]<0>"""
+    start = reader.pos
+    depth = 0
+    while not reader.at_end():
+        char = reader.peek()
+        if char == b'[':
+            depth += 1
+        elif char == b']':
+            depth -= 1
+        elif depth == 0 and char in (b' ', b'(', b')'):
+            break
+        reader.pos += 1
+    return reader.data[start:reader.pos].decode('ascii', errors='replace').upper()
+
+
+def _read_value(reader: _Reader) -> Any:
+    """Read one value: list, quoted string, literal, NIL, number or atom"""
+    reader.skip_ws()
+    char = reader.peek()
+
+    if char == b'(':
+        reader.pos += 1
+        values = []
+        while True:
+            reader.skip_ws()
+            if reader.at_end():
+                raise ValueError("Unterminated list in IMAP response")
+            if reader.peek() == b')':
+                reader.pos += 1
+                return values
+            values.append(_read_value(reader))
+
+    if char == b'"':
+        reader.pos += 1
+        chunks = []
+        while True:
+            if reader.at_end():
+                raise ValueError("Unterminated string in IMAP response")
+            char = reader.peek()
+            if char == b'\\':
+                chunks.append(reader.data[reader.pos + 1:reader.pos + 2])
+                reader.pos += 2
+                continue
+            reader.pos += 1
+            if char == b'"':
+                break
+            chunks.append(char)
+        return b''.join(chunks).decode('utf-8', errors='replace')
+
+    if char == b'~' and reader.data[reader.pos + 1:reader.pos + 2] == b'{':
+        # literal8 (RFC 3516), returned for BINARY[...] items
+        reader.pos += 1
+        char = b'{'
+
+    if char == b'{':
+        match = _LITERAL.match(reader.data, reader.pos)
+        if not match:
+            raise ValueError("Malformed literal in IMAP response")
+        length = int(match.group(1))
+        reader.pos = match.end()
+        literal = reader.data[reader.pos:reader.pos + length]
+        reader.pos += length
+        return literal
+
+    atom = _read_atom(reader)
+    if atom.upper() == b'NIL':
+        return None
+    if atom.isdigit():
+        return int(atom)
+    return atom.decode('utf-8', errors='replace')
+
+
+def parse_fetch_response(data: List[Any]) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Parse the data list returned by imaplib for a FETCH (or UID FETCH) command.
+
+    Args:
+        data: Second element of the (status, data) pair returned by imaplib
+
+    Returns:
+        List of (sequence_number, items) pairs, where items maps upper-cased
+        item names (e.g. 'UID', 'FLAGS', 'BODY[HEADER.FIELDS (FROM)]') to
+        values: int, str, bytes (literals), None (NIL) or nested lists
+    """
+    reader = _Reader(_join(data))
+    messages = []
+
+    while True:
+        reader.skip_ws()
+        if reader.at_end():
+            break
+
+        seq = _read_atom(reader)
+        if not seq.isdigit():
+            raise ValueError(f"Unexpected token in FETCH response: {seq!r}")
+        reader.skip_ws()
+
+        # Tolerate responses that still carry the FETCH keyword
+        if reader.data[reader.pos:reader.pos + 5].upper() == b'FETCH':
+            reader.pos += 5
+            reader.skip_ws()
+
+        if reader.peek() != b'(':
+            raise ValueError("Expected '(' in FETCH response")
+        reader.pos += 1
+
+        items: Dict[str, Any] = {}
+        while True:
+            reader.skip_ws()
+            if reader.at_end():
+                raise ValueError("Unterminated FETCH response")
+            if reader.peek() == b')':
+                reader.pos += 1
+                break
+            key = _read_key(reader)
+            items[key] = _read_value(reader)
+
+        messages.append((int(seq), items))
+
+    return messages
+
+
+def find_item(items: Dict[str, Any], prefix: str) -> Optional[Any]:
+    """
+    Find a FETCH item by name prefix (servers echo section names back
+    without .PEEK and may normalise spacing).
+
+    Args:
+        items: Parsed FETCH items
+        prefix: Upper-case item name prefix, e.g. 'BODY[HEADER'
+
+    Returns:
+        The item value, or None if absent
+    """
+    for key, value in items.items():
+        if key.startswith(prefix):
+            return value
+    return None
+
+
+def _params(value: Any) -> Dict[str, str]:
+    """Convert a BODYSTRUCTURE parameter list ["NAME", "value", ...] to a dict"""
+    if not isinstance(value, list):
+        return {}
+    return {
+        str(value[i]).lower(): value[i + 1] if isinstance(value[i + 1], str) else str(value[i + 1])
+        for i in range(0, len(value) - 1, 2)
+    }
+
+
+def walk_bodystructure(structure: Any, section: str = "") -> List[Dict[str, Any]]:
+    """
+    Flatten a parsed BODYSTRUCTURE into its leaf parts.
+
+    Args:
+        structure: Parsed BODYSTRUCTURE value (nested lists)
+        section: Section prefix of this node (empty for the top level)
+
+    Returns:
+        List of part dictionaries with 'section', 'content_type', 'params',
+        'encoding', 'size', 'disposition' and 'filename' keys, in order
+    """
+    if not isinstance(structure, list) or not structure:
+        return []
+
+    # Multipart: child bodies first, then the subtype
+    if isinstance(structure[0], list):
+        parts = []
+        number = 0
+        for child in structure:
+            if not isinstance(child, list):
+                break
+            number += 1
+            child_section = f"{section}.{number}" if section else str(number)
+            parts.extend(walk_bodystructure(child, child_section))
+        return parts
+
+    main_type = str(structure[0]).lower()
+    sub_type = str(structure[1]).lower()
+    params = _params(structure[2])
+    encoding = str(structure[5]).lower() if len(structure) > 5 and structure[5] else "7bit"
+    size = structure[6] if len(structure) > 6 and isinstance(structure[6], int) else 0
+
+    # Position of the extension data differs per body type
+    if main_type == "text":
+        disposition_index = 9
+    elif main_type == "message" and sub_type == "rfc822":
+        disposition_index = 11
+    else:
+        disposition_index = 8
+
+    disposition = None
+    disposition_params: Dict[str, str] = {}
+    if len(structure) > disposition_index and isinstance(structure[disposition_index], list):
+        raw_disposition = structure[disposition_index]
+        disposition = str(raw_disposition[0]).lower() if raw_disposition else None
+        if len(raw_disposition) > 1:
+            disposition_params = _params(raw_disposition[1])
+
+    return [{
+        "section": section or "1",
+        "content_type": f"{main_type}/{sub_type}",
+        "params": params,
+        "encoding": encoding,
+        "size": size,
+        "disposition": disposition,
+        "filename": disposition_params.get("filename") or params.get("name")
+    }]
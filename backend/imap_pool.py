@@ -0,0 +1,258 @@
+"""
+IMAP Connection Pool Module
+Thread-safe pool of authenticated imaplib connections with per-connection
+folder state, NOOP health checks, reconnect on abort and idle eviction
+"""
+import imaplib
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional
+from config import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection cannot be trusted any more
+CONNECTION_ERRORS = (imaplib.IMAP4.abort, OSError)
+
+
+class IMAPPoolTimeout(Exception):
+    """Raised when no pooled IMAP connection becomes available in time"""
+
+
+class PooledConnection:
+    """An authenticated imaplib connection plus the state tied to it"""
+
+    def __init__(self, imap: imaplib.IMAP4, condstore: bool = False, qresync: bool = False):
+        self.imap = imap
+        # Extensions enabled on this session (RFC 7162)
+        self.condstore = condstore
+        self.qresync = qresync
+        # Folder currently selected on this session, and its UIDVALIDITY
+        self.selected_folder: Optional[str] = None
+        self.selected_uidvalidity: Optional[int] = None
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.broken = False
+
+    def close(self):
+        """Log out, ignoring errors (the connection may already be dead)"""
+        try:
+            self.imap.logout()
+        except Exception:
+            pass
+
+
+class IMAPConnectionPool:
+    """
+    Bounded pool of IMAP connections with checkout/return semantics.
+
+    A connection is used by one thread at a time, so parallel requests run
+    on separate sessions instead of being serialized on one. Connections
+    idle for longer than the health check interval are probed with NOOP
+    before reuse, connections that failed (abort/socket errors) are
+    discarded and replaced, and connections idle for longer than the idle
+    timeout are logged out by a background reaper.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], PooledConnection],
+        size: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        health_check_interval: Optional[float] = None,
+        checkout_timeout: Optional[float] = None
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            connect: Factory that opens and authenticates a new connection
+            size: Maximum number of open connections (defaults to config)
+            idle_timeout: Seconds after which an unused connection is closed (defaults to config)
+            health_check_interval: Idle seconds after which a NOOP precedes reuse (defaults to config)
+            checkout_timeout: Seconds to wait for a free connection (defaults to config)
+        """
+        self._connect = connect
+        self.size = size or config.IMAP_POOL_SIZE
+        self.idle_timeout = idle_timeout or config.IMAP_POOL_IDLE_TIMEOUT
+        self.health_check_interval = health_check_interval or config.IMAP_POOL_HEALTH_CHECK_INTERVAL
+        self.checkout_timeout = checkout_timeout or config.IMAP_POOL_CHECKOUT_TIMEOUT
+
+        self._idle: Deque[PooledConnection] = deque()
+        self._cond = threading.Condition()
+        self._open = 0
+        self._reaper: Optional[threading.Thread] = None
+
+        # Statistics
+        self.created = 0
+        self.reused = 0
+        self.health_checks = 0
+        self.discarded = 0
+        self.evicted = 0
+        self.waits = 0
+        self.timeouts = 0
+
+    def acquire(self) -> PooledConnection:
+        """
+        Check out a healthy connection, opening one if the pool has room.
+
+        Returns:
+            A connection owned by the caller until release()
+
+        Raises:
+            IMAPPoolTimeout: If no connection is free within the checkout timeout
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            connection = None
+            with self._cond:
+                while True:
+                    if self._idle:
+                        # Most recently used first: it is the least likely to have timed out
+                        connection = self._idle.pop()
+                        break
+                    if self._open < self.size:
+                        self._open += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise IMAPPoolTimeout(f"No IMAP connection available after {self.checkout_timeout}s")
+                    self.waits += 1
+                    self._cond.wait(remaining)
+
+            if connection is None:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+                self.created += 1
+                self._start_reaper()
+                return connection
+
+            if time.monotonic() - connection.last_used >= self.health_check_interval:
+                self.health_checks += 1
+                try:
+                    status, _ = connection.imap.noop()
+                    if status != 'OK':
+                        raise imaplib.IMAP4.abort(f"NOOP returned {status}")
+                except Exception as e:
+                    logger.info(f"Discarding stale IMAP connection: {e}")
+                    self.release(connection, discard=True)
+                    continue
+
+            self.reused += 1
+            return connection
+
+    def release(self, connection: PooledConnection, discard: bool = False):
+        """
+        Return a connection to the pool.
+
+        Args:
+            connection: Connection obtained from acquire()
+            discard: Close the connection instead of keeping it
+        """
+        if discard or connection.broken:
+            connection.close()
+            with self._cond:
+                self._open -= 1
+                self.discarded += 1
+                self._cond.notify()
+            return
+
+        connection.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(connection)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """
+        Context manager around acquire()/release().
+
+        Connection-level failures (abort, socket errors) mark the connection
+        broken so it is replaced instead of being returned to the pool.
+        """
+        connection = self.acquire()
+        try:
+            yield connection
+        except CONNECTION_ERRORS:
+            connection.broken = True
+            raise
+        finally:
+            self.release(connection)
+
+    def evict_idle(self):
+        """Close connections that have been idle for longer than the idle timeout"""
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            for connection in list(self._idle):
+                if now - connection.last_used >= self.idle_timeout:
+                    self._idle.remove(connection)
+                    self._open -= 1
+                    expired.append(connection)
+            if expired:
+                self._cond.notify(len(expired))
+
+        for connection in expired:
+            connection.close()
+        if expired:
+            self.evicted += len(expired)
+            logger.info(f"Evicted {len(expired)} idle IMAP connection(s)")
+
+    def _start_reaper(self):
+        """Start the idle-eviction thread on first use"""
+        with self._cond:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self._reap, name="imap-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap(self):
+        interval = max(1.0, self.idle_timeout / 2)
+        while True:
+            time.sleep(interval)
+            self.evict_idle()
+            with self._cond:
+                if self._open == 0:
+                    # Nothing left to watch; restarted by the next acquire()
+                    self._reaper = None
+                    return
+
+    def close(self):
+        """Close every idle connection; checked-out ones are closed when released"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for connection in idle:
+            connection.close()
+
+    def stats(self) -> Dict:
+        """Return pool statistics"""
+        with self._cond:
+            idle = len(self._idle)
+            open_connections = self._open
+        return {
+            "size": self.size,
+            "open": open_connections,
+            "idle": idle,
+            "in_use": open_connections - idle,
+            "created": self.created,
+            "reused": self.reused,
+            "health_checks": self.health_checks,
+            "discarded": self.discarded,
+            "evicted": self.evicted,
+            "waits": self.waits,
+            "timeouts": self.timeouts
+        }
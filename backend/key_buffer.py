@@ -0,0 +1,234 @@
+"""
+QKD Key Buffer Module
+Per-slave-SAE reservoir of prefetched encryption keys with background refill
+"""
+import asyncio
+import httpx
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from config import config
+from kme_client import KMEClient, kme_client
+from models import QKDKey
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class KeyReservoir:
+    """
+    Buffer of ready-to-use encryption keys for one (slave SAE, key size) pair.
+
+    Keys are fetched from the KME in bulk and handed out in O(1). Each key is
+    removed from the buffer when it is handed out, so no key is ever returned
+    twice. When the buffer drops below the low-water mark, a background task
+    refills it up to the high-water mark.
+    """
+
+    def __init__(
+        self,
+        client: KMEClient,
+        slave_sae_id: str,
+        key_size: int,
+        high_water: int,
+        low_water: int,
+        batch_size: int
+    ):
+        """
+        Initialize the reservoir.
+
+        Args:
+            client: KME client used for enc_keys calls
+            slave_sae_id: The receiver's SAE identifier
+            key_size: Key size in bits
+            high_water: Number of keys to refill up to (buffer capacity)
+            low_water: Refill is triggered when fewer keys than this remain
+            batch_size: Maximum number of keys requested per enc_keys call
+        """
+        self.client = client
+        self.slave_sae_id = slave_sae_id
+        self.key_size = key_size
+        self.high_water = max(1, high_water)
+        self.low_water = min(max(0, low_water), self.high_water)
+        self.batch_size = max(1, batch_size)
+
+        self._keys: Deque[QKDKey] = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_errors = 0
+        self.keys_fetched = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    async def get_key(self) -> QKDKey:
+        """
+        Hand out one key, falling back to a direct KME request when empty.
+
+        Returns:
+            A QKDKey that has not been handed out before
+
+        Raises:
+            httpx.HTTPError: If the buffer is empty and the direct request fails
+        """
+        if self._keys:
+            key = self._keys.popleft()
+            self.hits += 1
+        else:
+            self.misses += 1
+            logger.info(f"Key buffer miss for {self.slave_sae_id}, requesting key directly")
+            keys = await self.client.get_enc_keys(self.slave_sae_id, number=1, size=self.key_size)
+            if not keys:
+                raise ValueError("No keys returned from QKD KME")
+            key = keys[0]
+            self.keys_fetched += len(keys)
+            # Keep any surplus the KME returned
+            self._keys.extend(keys[1:])
+
+        self.schedule_refill()
+        return key
+
+    def schedule_refill(self):
+        """Start a background refill if below the low-water mark and none is running"""
+        if self._keys and len(self._keys) >= self.low_water:
+            return
+        if self._refill_task is not None and not self._refill_task.done():
+            return
+
+        self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self):
+        """Fetch keys in batches until the high-water mark is reached"""
+        self.refills += 1
+        try:
+            while len(self._keys) < self.high_water:
+                number = min(self.batch_size, self.high_water - len(self._keys))
+                keys = await self.client.get_enc_keys(self.slave_sae_id, number=number, size=self.key_size)
+                if not keys:
+                    break
+                self._keys.extend(keys)
+                self.keys_fetched += len(keys)
+
+            logger.info(f"Key buffer for {self.slave_sae_id} refilled to {len(self._keys)} key(s)")
+
+        except httpx.HTTPError as e:
+            self.refill_errors += 1
+            logger.error(f"Failed to refill key buffer for {self.slave_sae_id}: {e}")
+
+        except Exception as e:
+            self.refill_errors += 1
+            logger.error(f"Unexpected error refilling key buffer for {self.slave_sae_id}: {e}")
+
+    async def close(self):
+        """Cancel any running refill and drop buffered keys"""
+        if self._refill_task is not None and not self._refill_task.done():
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+        self._refill_task = None
+        self._keys.clear()
+
+    def stats(self) -> Dict:
+        """Return buffer statistics"""
+        total = self.hits + self.misses
+        return {
+            "slave_sae_id": self.slave_sae_id,
+            "key_size": self.key_size,
+            "available": len(self._keys),
+            "high_water": self.high_water,
+            "low_water": self.low_water,
+            "batch_size": self.batch_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "refills": self.refills,
+            "refill_errors": self.refill_errors,
+            "keys_fetched": self.keys_fetched,
+            "refilling": self._refill_task is not None and not self._refill_task.done()
+        }
+
+
+class KeyBuffer:
+    """Manages one KeyReservoir per (slave SAE, key size) pair"""
+
+    def __init__(
+        self,
+        client: Optional[KMEClient] = None,
+        high_water: Optional[int] = None,
+        low_water: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        """
+        Initialize the KeyBuffer.
+
+        Args:
+            client: KME client (defaults to the shared instance)
+            high_water: Buffer capacity per reservoir (defaults to config)
+            low_water: Refill threshold per reservoir (defaults to config)
+            batch_size: Keys per enc_keys call (defaults to config)
+        """
+        self.client = client or kme_client
+        self.high_water = high_water or config.QKD_KEY_BUFFER_SIZE
+        self.low_water = config.QKD_KEY_BUFFER_LOW_WATER if low_water is None else low_water
+        self.batch_size = batch_size or config.QKD_KEY_BUFFER_BATCH
+        self._reservoirs: Dict[Tuple[str, int], KeyReservoir] = {}
+
+    def _reservoir(self, slave_sae_id: str, key_size: int) -> KeyReservoir:
+        """Get or create the reservoir for a slave SAE and key size"""
+        reservoir = self._reservoirs.get((slave_sae_id, key_size))
+        if reservoir is None:
+            reservoir = KeyReservoir(
+                client=self.client,
+                slave_sae_id=slave_sae_id,
+                key_size=key_size,
+                high_water=self.high_water,
+                low_water=self.low_water,
+                batch_size=self.batch_size
+            )
+            self._reservoirs[(slave_sae_id, key_size)] = reservoir
+        return reservoir
+
+    def start(self, slave_sae_ids: List[str], key_size: int):
+        """
+        Begin prefilling reservoirs in the background.
+
+        Args:
+            slave_sae_ids: Slave SAEs to prefetch keys for
+            key_size: Key size in bits
+        """
+        for slave_sae_id in slave_sae_ids:
+            self._reservoir(slave_sae_id, key_size).schedule_refill()
+
+    async def get_key(self, slave_sae_id: str, key_size: int) -> Tuple[str, str]:
+        """
+        Take one encryption key for a slave SAE.
+
+        Args:
+            slave_sae_id: The receiver's SAE identifier
+            key_size: Key size in bits
+
+        Returns:
+            Tuple of (key_id, key)
+        """
+        key = await self._reservoir(slave_sae_id, key_size).get_key()
+        return key.key_ID, key.key
+
+    async def close(self):
+        """Stop all background refills"""
+        for reservoir in self._reservoirs.values():
+            await reservoir.close()
+
+    def stats(self) -> List[Dict]:
+        """Return statistics for every reservoir"""
+        return [reservoir.stats() for reservoir in self._reservoirs.values()]
+
+
+# Singleton instance
+key_buffer = KeyBuffer()
@@ -0,0 +1,220 @@
+"""
+Decryption Key Cache Module
+Bounded LRU cache of KME keys with TTL and zeroization of evicted material
+"""
+import base64
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from config import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _wipe(buffer: bytearray):
+    """Overwrite a key buffer with zeros in place"""
+    buffer[:] = bytes(len(buffer))
+
+
+class _CacheEntry:
+    """Key material held in a wipeable buffer together with its expiry time"""
+
+    __slots__ = ("material", "expires_at")
+
+    def __init__(self, material: bytearray, expires_at: float):
+        self.material = material
+        self.expires_at = expires_at
+
+
+class KeyCache:
+    """
+    In-process cache of decryption keys keyed by key_ID.
+
+    Bounded by both entry count and total key bytes, with least-recently-used
+    eviction and a per-entry TTL. Key material is stored in bytearrays that
+    are zeroed whenever an entry leaves the cache. Once started, a background
+    thread sweeps expired entries, so keys are wiped when their TTL runs out
+    rather than on their next lookup.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        purge_interval: Optional[float] = None
+    ):
+        """
+        Initialize the KeyCache.
+
+        Args:
+            max_entries: Maximum number of cached keys (defaults to config)
+            max_bytes: Maximum total key bytes (defaults to config)
+            ttl: Seconds a key stays valid after insertion (defaults to config)
+            purge_interval: Seconds between expiry sweeps (defaults to config)
+        """
+        self.max_entries = max_entries or config.DECRYPT_KEY_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or config.DECRYPT_KEY_CACHE_MAX_BYTES
+        self.ttl = ttl or config.DECRYPT_KEY_CACHE_TTL
+        self.purge_interval = purge_interval or config.DECRYPT_KEY_CACHE_PURGE_INTERVAL
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _remove(self, key_id: str):
+        """Remove an entry and wipe its key material (lock must be held)"""
+        entry = self._entries.pop(key_id)
+        self._bytes -= len(entry.material)
+        _wipe(entry.material)
+
+    def get(self, key_id: str) -> Optional[str]:
+        """
+        Look up a key.
+
+        Args:
+            key_id: The key identifier
+
+        Returns:
+            Base64-encoded key, or None if absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.expires_at <= time.monotonic():
+                self._remove(key_id)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key_id)
+            self.hits += 1
+            return base64.b64encode(entry.material).decode('utf-8')
+
+    def put(self, key_id: str, key: str):
+        """
+        Insert or refresh a key, evicting least-recently-used entries as needed.
+
+        Args:
+            key_id: The key identifier
+            key: Base64-encoded key material
+        """
+        material = bytearray(base64.b64decode(key))
+        if len(material) > self.max_bytes:
+            _wipe(material)
+            return
+
+        with self._lock:
+            if key_id in self._entries:
+                self._remove(key_id)
+
+            self._entries[key_id] = _CacheEntry(material, time.monotonic() + self.ttl)
+            self._bytes += len(material)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+                self.evictions += 1
+
+    def invalidate(self, key_ids: Iterable[str]) -> int:
+        """
+        Drop keys, e.g. because the KME reported them as revoked.
+
+        Args:
+            key_ids: Key identifiers to drop
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._lock:
+            for key_id in key_ids:
+                if key_id in self._entries:
+                    self._remove(key_id)
+                    removed += 1
+            self.invalidations += removed
+
+        if removed:
+            logger.info(f"Invalidated {removed} cached decryption key(s)")
+        return removed
+
+    def purge_expired(self) -> int:
+        """
+        Remove all expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [key_id for key_id, entry in self._entries.items() if entry.expires_at <= now]
+            for key_id in expired:
+                self._remove(key_id)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def start(self):
+        """Start sweeping expired entries every purge_interval in a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="key-cache-purge", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop the expiry sweeps"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        """Thread body: one sweep per interval"""
+        while not self._stop.wait(self.purge_interval):
+            removed = self.purge_expired()
+            if removed:
+                logger.info(f"Wiped {removed} expired decryption key(s)")
+
+    def clear(self):
+        """Remove and wipe every entry"""
+        with self._lock:
+            for key_id in list(self._entries):
+                self._remove(key_id)
+
+    def stats(self) -> Dict:
+        """Return cache statistics"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+
+# Singleton instance
+key_cache = KeyCache()
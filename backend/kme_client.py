@@ -0,0 +1,181 @@
+"""
+QKD KME Client Module
+Long-lived, connection-pooled HTTP client for the ETSI GS QKD 014 API
+"""
+import httpx
+import logging
+from typing import Any, Dict, List, Optional
+from config import config
+from models import QKDKey, QKDKeyRequest, QKDKeyResponse, QKDKeyID, QKDKeyIDsRequest
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class KMEClient:
+    """Handles all communication with the QKD Key Management Entity"""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        http2: Optional[bool] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None
+    ):
+        """
+        Initialize the KMEClient with pool configuration.
+
+        The underlying httpx.AsyncClient is created by start() (or lazily on
+        first use) and reused for every request until close() is called.
+
+        Args:
+            base_url: KME base URL (defaults to config)
+            http2: Whether to negotiate HTTP/2 (requires the 'h2' package)
+            max_connections: Maximum number of pooled connections
+            max_keepalive_connections: Maximum number of idle keep-alive connections
+            keepalive_expiry: Seconds an idle connection is kept open
+            timeout: Read/write/pool timeout in seconds
+            connect_timeout: Connection timeout in seconds
+        """
+        self.base_url = (base_url or config.QKD_KME_URL).rstrip('/')
+        self.http2 = config.QKD_KME_HTTP2 if http2 is None else http2
+        self.max_connections = max_connections or config.QKD_KME_MAX_CONNECTIONS
+        self.max_keepalive_connections = max_keepalive_connections or config.QKD_KME_MAX_KEEPALIVE
+        self.keepalive_expiry = keepalive_expiry or config.QKD_KME_KEEPALIVE_EXPIRY
+        self.timeout = timeout or config.QKD_KME_TIMEOUT
+        self.connect_timeout = connect_timeout or config.QKD_KME_CONNECT_TIMEOUT
+        self._client: Optional[httpx.AsyncClient] = None
+
+        logger.info(f"KMEClient initialized with KME: {self.base_url}")
+
+    def _http2_available(self) -> bool:
+        """Check whether HTTP/2 support (the 'h2' package) is installed"""
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    async def start(self):
+        """Create the shared connection pool (idempotent)"""
+        if self._client is not None:
+            return
+
+        http2 = self.http2
+        if http2 and not self._http2_available():
+            logger.warning("QKD_KME_HTTP2 is enabled but 'h2' is not installed, falling back to HTTP/1.1")
+            http2 = False
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout)
+        )
+        logger.info(
+            f"KME connection pool started (http2={http2}, "
+            f"max_connections={self.max_connections}, "
+            f"max_keepalive={self.max_keepalive_connections})"
+        )
+
+    async def close(self):
+        """Close the shared connection pool"""
+        if self._client is None:
+            return
+
+        try:
+            await self._client.aclose()
+            logger.info("KME connection pool closed")
+        except Exception as e:
+            logger.error(f"Error closing KME connection pool: {e}")
+        finally:
+            self._client = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, starting the pool if needed"""
+        if self._client is None:
+            await self.start()
+        return self._client
+
+    async def get_enc_keys(self, slave_sae_id: str, number: int = 1, size: int = 256) -> List[QKDKey]:
+        """
+        Request new encryption keys (ETSI 014 enc_keys).
+
+        Args:
+            slave_sae_id: The receiver's SAE identifier
+            number: Number of keys requested
+            size: Key size in bits
+
+        Returns:
+            List of QKDKey objects
+
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        client = await self._get_client()
+        request_data = QKDKeyRequest(number=number, size=size)
+
+        response = await client.post(
+            f"/api/v1/keys/{slave_sae_id}/enc_keys",
+            json=request_data.model_dump()
+        )
+        response.raise_for_status()
+
+        return QKDKeyResponse(**response.json()).keys
+
+    async def get_dec_keys(self, master_sae_id: str, key_ids: List[str]) -> List[QKDKey]:
+        """
+        Retrieve keys by their identifiers (ETSI 014 dec_keys).
+
+        Args:
+            master_sae_id: The sender's SAE identifier
+            key_ids: Key identifiers to retrieve
+
+        Returns:
+            List of QKDKey objects
+
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        client = await self._get_client()
+        request_data = QKDKeyIDsRequest(key_IDs=[QKDKeyID(key_ID=key_id) for key_id in key_ids])
+
+        response = await client.post(
+            f"/api/v1/keys/{master_sae_id}/dec_keys",
+            json=request_data.model_dump()
+        )
+        response.raise_for_status()
+
+        return QKDKeyResponse(**response.json()).keys
+
+    async def get_status(self, slave_sae_id: str) -> Dict[str, Any]:
+        """
+        Query key availability for an SAE (ETSI 014 status).
+
+        Args:
+            slave_sae_id: The receiver's SAE identifier
+
+        Returns:
+            Status dictionary as returned by the KME
+
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        client = await self._get_client()
+
+        response = await client.get(f"/api/v1/keys/{slave_sae_id}/status")
+        response.raise_for_status()
+
+        return response.json()
+
+
+# Singleton instance
+kme_client = KMEClient()
@@ -0,0 +1,137 @@
+"""
+Kyber Pool Module
+Bounded pool of pre-generated Kyber-512 keypairs/encapsulations for L3 sends
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Optional
+from config import config
+from crypto_pool import CryptoPool, crypto_pool
+from encryption import KyberMaterial, generate_kyber_material
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class KyberPool:
+    """
+    Keeps a bounded pool of ready Kyber-512 material.
+
+    A background producer generates keypairs (and, optionally, encapsulations
+    against them) on the crypto pool's L3 lane while that lane is idle, so
+    live L3 traffic always takes priority. Each entry is handed out exactly
+    once; when the pool is empty, callers fall back to inline generation.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[CryptoPool] = None,
+        size: Optional[int] = None,
+        encapsulate: Optional[bool] = None,
+        idle_delay: Optional[float] = None
+    ):
+        """
+        Initialize the KyberPool.
+
+        Args:
+            pool: Crypto worker pool used to generate material (defaults to the shared instance)
+            size: Maximum number of pre-generated entries (defaults to config)
+            encapsulate: Whether to pre-compute encapsulations too (defaults to config)
+            idle_delay: Seconds to back off while L3 requests are queued (defaults to config)
+        """
+        self.pool = pool or crypto_pool
+        self.size = size or config.KYBER_POOL_SIZE
+        self.encapsulate = config.KYBER_POOL_ENCAPSULATE if encapsulate is None else encapsulate
+        self.idle_delay = idle_delay or config.KYBER_POOL_IDLE_DELAY
+
+        self._material: Deque[KyberMaterial] = deque()
+        self._producer_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.producer_errors = 0
+
+    def start(self):
+        """Start the background producer"""
+        if self._producer_task is not None and not self._producer_task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._producer_task = asyncio.create_task(self._produce())
+        logger.info(f"Kyber pool producer started (size={self.size}, encapsulate={self.encapsulate})")
+
+    async def close(self):
+        """Stop the producer and discard pre-generated material"""
+        if self._producer_task is not None and not self._producer_task.done():
+            self._producer_task.cancel()
+            try:
+                await self._producer_task
+            except asyncio.CancelledError:
+                pass
+        self._producer_task = None
+        self._material.clear()
+
+    def take(self) -> Optional[KyberMaterial]:
+        """
+        Take one pre-generated entry.
+
+        Returns:
+            Kyber material, or None if the pool is empty (caller generates inline)
+        """
+        if self._material:
+            material = self._material.popleft()
+            self.hits += 1
+        else:
+            material = None
+            self.misses += 1
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return material
+
+    async def _produce(self):
+        """Refill the pool whenever it is below capacity and the L3 lane is idle"""
+        while True:
+            if len(self._material) >= self.size:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Yield to live L3 requests
+            if self.pool.queue_depth("pqc") > 0:
+                await asyncio.sleep(self.idle_delay)
+                continue
+
+            try:
+                material = await self.pool.run_pqc(generate_kyber_material, self.encapsulate)
+                self._material.append(material)
+                self.generated += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.producer_errors += 1
+                logger.error(f"Failed to pre-generate Kyber material: {e}")
+                await asyncio.sleep(self.idle_delay)
+
+    def stats(self) -> Dict:
+        """Return pool statistics"""
+        total = self.hits + self.misses
+        return {
+            "available": len(self._material),
+            "size": self.size,
+            "encapsulate": self.encapsulate,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "generated": self.generated,
+            "producer_errors": self.producer_errors,
+            "running": self._producer_task is not None and not self._producer_task.done()
+        }
+
+
+# Singleton instance
+kyber_pool = KyberPool()
@@ -0,0 +1,115 @@
+"""
+Mail I/O Module
+Runs the blocking smtplib/imaplib code off the asyncio event loop
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from config import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MailIOTimeout(Exception):
+    """Raised when a mail operation exceeds its per-operation timeout"""
+
+
+class MailIO:
+    """
+    Dedicated thread pools for SMTP and IMAP work.
+
+    SMTP and IMAP get separate, independently sized executors so that a slow
+    mailbox listing can never hold up outgoing mail (and vice versa). Every
+    operation is bounded by a per-operation timeout; the underlying sockets
+    carry their own timeout so abandoned worker threads also terminate.
+    """
+
+    def __init__(
+        self,
+        smtp_workers: Optional[int] = None,
+        imap_workers: Optional[int] = None,
+        smtp_timeout: Optional[float] = None,
+        imap_timeout: Optional[float] = None
+    ):
+        """
+        Initialize the MailIO executors.
+
+        Args:
+            smtp_workers: Number of SMTP worker threads (defaults to config)
+            imap_workers: Number of IMAP worker threads (defaults to config)
+            smtp_timeout: Per-operation SMTP timeout in seconds (defaults to config)
+            imap_timeout: Per-operation IMAP timeout in seconds (defaults to config)
+        """
+        self.smtp_workers = smtp_workers or config.SMTP_WORKERS
+        self.imap_workers = imap_workers or config.IMAP_WORKERS
+        self.smtp_timeout = smtp_timeout or config.SMTP_OPERATION_TIMEOUT
+        self.imap_timeout = imap_timeout or config.IMAP_OPERATION_TIMEOUT
+
+        self._smtp_executor = ThreadPoolExecutor(max_workers=self.smtp_workers, thread_name_prefix="smtp")
+        self._imap_executor = ThreadPoolExecutor(max_workers=self.imap_workers, thread_name_prefix="imap")
+
+        logger.info(f"MailIO initialized with {self.smtp_workers} SMTP and {self.imap_workers} IMAP worker(s)")
+
+    async def _run(
+        self,
+        executor: ThreadPoolExecutor,
+        timeout: float,
+        func: Callable[..., Any],
+        *args,
+        **kwargs
+    ) -> Any:
+        """Run a blocking callable in an executor, bounded by a timeout"""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            name = getattr(func, "__name__", repr(func))
+            logger.error(f"Mail operation {name} timed out after {timeout}s")
+            raise MailIOTimeout(f"{name} timed out after {timeout}s")
+
+    async def run_smtp(self, func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a blocking SMTP call on the SMTP executor.
+
+        Args:
+            func: Blocking callable (e.g. EmailSender.send_email)
+            timeout: Optional override of the per-operation timeout
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            MailIOTimeout: If the operation does not finish in time
+        """
+        return await self._run(self._smtp_executor, timeout or self.smtp_timeout, func, *args, **kwargs)
+
+    async def run_imap(self, func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a blocking IMAP call on the IMAP executor.
+
+        Args:
+            func: Blocking callable (e.g. EmailReceiver.fetch_emails)
+            timeout: Optional override of the per-operation timeout
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            MailIOTimeout: If the operation does not finish in time
+        """
+        return await self._run(self._imap_executor, timeout or self.imap_timeout, func, *args, **kwargs)
+
+    def shutdown(self):
+        """Stop accepting work and release the worker threads"""
+        self._smtp_executor.shutdown(wait=False, cancel_futures=True)
+        self._imap_executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("MailIO executors shut down")
+
+
+# Singleton instance
+mail_io = MailIO()
@@ -0,0 +1,182 @@
+"""
+Mail Watcher Module
+Holds IMAP IDLE sessions on watched folders and pushes mailbox changes to
+subscribers (the /events server-sent events stream)
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Set
+from config import config
+from email_receiver import EmailReceiver
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MailWatcher:
+    """
+    Push pipeline for new mail.
+
+    Each watched folder gets a dedicated thread with its own IMAP connection
+    that waits in IDLE. When the server reports EXISTS/EXPUNGE/FETCH updates
+    the folder is synced incrementally (through the message store) and the
+    resulting changes are published to every subscriber queue on the event
+    loop. Changes are diffed against the folder state the watcher last
+    published, not against the store alone, so mail stored first by a
+    background sync round or /fetch is still pushed. IDLE is re-issued periodically, and the connection is re-established
+    with exponential backoff when it drops.
+    """
+
+    def __init__(
+        self,
+        folders: Optional[List[str]] = None,
+        renew_interval: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        queue_size: Optional[int] = None
+    ):
+        """
+        Initialize the MailWatcher.
+
+        Args:
+            folders: Folders to watch (defaults to config)
+            renew_interval: Seconds before IDLE is re-issued (defaults to config)
+            poll_interval: Seconds between stop checks while idling (defaults to config)
+            queue_size: Maximum buffered events per subscriber (defaults to config)
+        """
+        self.folders = folders or config.IMAP_IDLE_FOLDERS
+        self.renew_interval = renew_interval or config.IMAP_IDLE_RENEW_INTERVAL
+        self.poll_interval = poll_interval or config.IMAP_IDLE_POLL_INTERVAL
+        self.queue_size = queue_size or config.SSE_QUEUE_SIZE
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._threads: Dict[str, threading.Thread] = {}
+        self._snapshots: Dict[str, Dict] = {}  # folder -> state last published (see sync_folder)
+        self._stop = threading.Event()
+
+        # Statistics
+        self.events_published = 0
+        self.events_dropped = 0
+        self.idle_wakeups = 0
+        self.reconnects = 0
+        self.last_event_at: Optional[float] = None
+
+    def start(self):
+        """Start one IDLE thread per watched folder (must be called from the event loop)"""
+        self._loop = asyncio.get_running_loop()
+        self._stop.clear()
+        for folder in self.folders:
+            thread = self._threads.get(folder)
+            if thread is not None and thread.is_alive():
+                continue
+            thread = threading.Thread(target=self._watch, args=(folder,), name=f"idle-{folder}", daemon=True)
+            self._threads[folder] = thread
+            thread.start()
+        logger.info(f"Mail watcher started for {', '.join(self.folders)}")
+
+    async def close(self):
+        """Stop the IDLE threads"""
+        self._stop.set()
+        loop = asyncio.get_running_loop()
+        for thread in self._threads.values():
+            await loop.run_in_executor(None, thread.join, self.poll_interval * 4 + 1)
+        self._threads.clear()
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Register a subscriber.
+
+        Returns:
+            Queue that receives event dictionaries
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Remove a subscriber"""
+        self._subscribers.discard(queue)
+
+    def _publish(self, event: Dict):
+        """Deliver an event to every subscriber (runs on the event loop)"""
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Slow consumer: drop its oldest event rather than block the watcher
+                queue.get_nowait()
+                self.events_dropped += 1
+            queue.put_nowait(event)
+        self.events_published += 1
+        self.last_event_at = time.time()
+
+    def _emit(self, folder: str, changes: Dict):
+        """Turn a sync result into events and hand them to the event loop"""
+        events = []
+        if changes['new']:
+            events.append({'type': 'new_messages', 'folder': folder, 'emails': changes['new']})
+        if changes['expunged']:
+            events.append({'type': 'expunged', 'folder': folder, 'uids': changes['expunged']})
+        if changes['flags']:
+            events.append({
+                'type': 'flags_changed',
+                'folder': folder,
+                'flags': {str(uid): flags for uid, flags in changes['flags'].items()}
+            })
+
+        for event in events:
+            self._loop.call_soon_threadsafe(self._publish, event)
+
+    def _sync(self, receiver: EmailReceiver, folder: str):
+        """Sync a folder and publish what changed since the last published state"""
+        changes = receiver.sync_folder(folder, self._snapshots.get(folder))
+        self._snapshots[folder] = changes['snapshot']
+        self._emit(folder, changes)
+
+    def _watch(self, folder: str):
+        """Thread body: IDLE on one folder, sync on every wakeup, reconnect on failure"""
+        backoff = 1.0
+        while not self._stop.is_set():
+            receiver = EmailReceiver(use_ssl=config.IMAP_USE_SSL, pool_size=1)
+            try:
+                if not receiver.connect():
+                    raise Exception("Failed to connect to IMAP server")
+
+                # Baseline (also catches up on anything missed while disconnected)
+                self._sync(receiver, folder)
+                backoff = 1.0
+
+                while not self._stop.is_set():
+                    updates = receiver.idle(folder, self.renew_interval, self._stop, self.poll_interval)
+                    if self._stop.is_set():
+                        break
+                    if updates:
+                        self.idle_wakeups += 1
+                    self._sync(receiver, folder)
+
+            except Exception as e:
+                self.reconnects += 1
+                logger.error(f"IDLE watcher for {folder} failed: {e}; retrying in {backoff:.0f}s")
+            finally:
+                receiver.disconnect()
+
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    def stats(self) -> Dict:
+        """Return watcher statistics"""
+        return {
+            "folders": self.folders,
+            "running": [folder for folder, thread in self._threads.items() if thread.is_alive()],
+            "subscribers": len(self._subscribers),
+            "events_published": self.events_published,
+            "events_dropped": self.events_dropped,
+            "idle_wakeups": self.idle_wakeups,
+            "reconnects": self.reconnects,
+            "last_event_at": self.last_event_at
+        }
+
+
+# Singleton instance
+mail_watcher = MailWatcher()
@@ -2,29 +2,55 @@
 Main FastAPI Backend for Quantum Secure Email Client
 Handles email sending with quantum-secure encryption
 """
+import asyncio
+import functools
 import httpx
+import json
 import logging
+import re
+from typing import Optional, Tuple
+from urllib.parse import quote
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from contextlib import asynccontextmanager
 
 from models import (
     SendEmailRequest,
     SendEmailResponse,
     SecurityLevel,
-    QKDKeyRequest,
-    QKDKeyResponse,
     FetchEmailsRequest,
     FetchEmailsResponse,
     EmailData,
+    EmailSummary,
     DecryptEmailRequest,
-    DecryptEmailResponse
+    DecryptEmailResponse,
+    DecryptBatchRequest,
+    DecryptBatchItem,
+    DecryptBatchResponse,
+    QKDKeyIDsRequest,
+    SyncRequest,
+    SyncResponse
+)
+from encryption import (
+    format_encrypted_email_body,
+    parse_encrypted_email_body,
+    part_decryptor,
+    SEEKABLE_PART_LEVELS
 )
-from encryption import encrypt_message, format_encrypted_email_body, parse_encrypted_email_body, decrypt_message
 from email_sender import email_sender
-from email_receiver import email_receiver
+from email_receiver import email_receiver, EmailReceiver, StaleCursorError
+from mail_watcher import mail_watcher
+from sync_scheduler import sync_scheduler
+from mail_io import mail_io, MailIOTimeout
+from crypto_pool import crypto_pool
+from kyber_pool import kyber_pool
+from kme_client import kme_client
+from key_buffer import key_buffer
+from key_cache import key_cache
+from message_cache import message_cache
 from config import config
 
 # Configure logging
@@ -47,10 +73,47 @@ async def lifespan(app: FastAPI):
     # Verify SMTP connection (optional, for debugging)
     # email_sender.verify_connection()
     
+    # Open the shared KME connection pool
+    await kme_client.start()
+    
+    # Start the crypto worker pool
+    crypto_pool.start()
+    
+    # Start pre-generating Kyber material for L3
+    if config.KYBER_POOL_ENABLED:
+        kyber_pool.start()
+    
+    # Wipe cached decryption keys as soon as their TTL runs out
+    if config.DECRYPT_KEY_CACHE_ENABLED:
+        key_cache.start()
+    
+    # Start prefetching encryption keys in the background
+    if config.QKD_KEY_BUFFER_ENABLED:
+        key_buffer.start([config.QKD_SLAVE_SAE_ID], config.DEFAULT_KEY_SIZE)
+    
+    # Watch mailboxes with IMAP IDLE and push changes to /events
+    if config.IMAP_IDLE_ENABLED and config.IMAP_USERNAME:
+        mail_watcher.start()
+    
+    # Sync the configured accounts' folders in the background
+    sync_scheduler.add_configured_accounts(email_receiver)
+    if config.SYNC_ENABLED:
+        sync_scheduler.start()
+    
     yield
     
     # Shutdown
     logger.info("Quantum Email Backend Shutting Down...")
+    await mail_watcher.close()
+    await asyncio.get_running_loop().run_in_executor(None, sync_scheduler.close)
+    await key_buffer.close()
+    await kyber_pool.close()
+    await kme_client.close()
+    key_cache.close()
+    key_cache.clear()
+    mail_io.shutdown()
+    email_receiver.disconnect()
+    crypto_pool.shutdown()
 
 
 # Initialize FastAPI app
@@ -91,6 +154,9 @@ async def fetch_qkd_key(slave_sae_id: str, key_size: int = 256) -> tuple[str, st
     """
     Fetch encryption key from QKD Key Management Entity (KME).
     
+    When the key buffer is enabled the key is taken from the local
+    prefetch buffer, which only contacts the KME on a miss.
+    
     Args:
         slave_sae_id: The receiver's SAE identifier
         key_size: Size of the key in bits (default: 256)
@@ -102,31 +168,28 @@ async def fetch_qkd_key(slave_sae_id: str, key_size: int = 256) -> tuple[str, st
         HTTPException: If key retrieval fails
     """
     try:
+        if config.QKD_KEY_BUFFER_ENABLED:
+            key_id, key = await key_buffer.get_key(slave_sae_id, key_size)
+            logger.info(f"Obtained QKD key from buffer: {key_id}")
+            return key_id, key
+        
         logger.info(f"Requesting QKD key from {config.QKD_KME_URL}")
         
-        async with httpx.AsyncClient() as client:
-            request_data = QKDKeyRequest(number=1, size=key_size)
-            
-            response = await client.post(
-                f"{config.QKD_KME_URL}/api/v1/keys/{slave_sae_id}/enc_keys",
-                json=request_data.model_dump(),
-                timeout=10.0
+        keys = await kme_client.get_enc_keys(slave_sae_id, number=1, size=key_size)
+        
+        if not keys:
+            raise HTTPException(
+                status_code=500,
+                detail="No keys returned from QKD KME"
             )
-            
-            response.raise_for_status()
-            
-            qkd_response = QKDKeyResponse(**response.json())
-            
-            if not qkd_response.keys:
-                raise HTTPException(
-                    status_code=500,
-                    detail="No keys returned from QKD KME"
-                )
-            
-            key_data = qkd_response.keys[0]
-            logger.info(f"Successfully obtained QKD key: {key_data.key_ID}")
-            
-            return key_data.key_ID, key_data.key
+        
+        key_data = keys[0]
+        logger.info(f"Successfully obtained QKD key: {key_data.key_ID}")
+        
+        return key_data.key_ID, key_data.key
+    
+    except HTTPException:
+        raise
     
     except httpx.HTTPError as e:
         logger.error(f"Failed to fetch QKD key: {e}")
@@ -152,7 +215,15 @@ async def root():
         "status": "running",
         "endpoints": {
             "send": "/send - POST: Send quantum-encrypted email",
-            "health": "/health - GET: Health check"
+            "health": "/health - GET: Health check",
+            "decrypt_batch": "/decrypt/batch - POST: Decrypt many emails in one round trip",
+            "part": "/emails/{email_id}/parts/{section} - GET: Stream one attachment (supports Range)",
+            "kme_status": "/kme/status - GET: QKD KME key availability",
+            "key_buffer": "/kme/buffer - GET: Key prefetch buffer statistics",
+            "key_cache": "/kme/cache - GET: Decryption key cache statistics",
+            "key_cache_invalidate": "/kme/cache/invalidate - POST: Drop revoked keys from the cache",
+            "sync": "/sync - POST: Sync all accounts and folders concurrently",
+            "crypto_stats": "/crypto/stats - GET: Crypto worker pool and Kyber pool metrics"
         }
     }
 
@@ -167,6 +238,96 @@ async def health_check():
     }
 
 
+@app.get("/kme/status")
+async def kme_status():
+    """Query the QKD KME for key availability towards the configured slave SAE"""
+    try:
+        return await kme_client.get_status(config.QKD_SLAVE_SAE_ID)
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to query KME status: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"QKD KME service unavailable: {str(e)}"
+        )
+
+
+@app.get("/kme/buffer")
+async def key_buffer_stats():
+    """Key prefetch buffer statistics (available keys, hits, misses)"""
+    return {
+        "enabled": config.QKD_KEY_BUFFER_ENABLED,
+        "reservoirs": key_buffer.stats()
+    }
+
+
+@app.get("/kme/cache")
+async def key_cache_stats():
+    """Decryption key cache statistics"""
+    return {
+        "enabled": config.DECRYPT_KEY_CACHE_ENABLED,
+        **key_cache.stats()
+    }
+
+
+@app.post("/kme/cache/invalidate")
+async def invalidate_cached_keys(request: QKDKeyIDsRequest):
+    """Drop keys the KME reported as revoked from the decryption key cache"""
+    removed = key_cache.invalidate(k.key_ID for k in request.key_IDs)
+    return {
+        "success": True,
+        "invalidated": removed
+    }
+
+
+@app.get("/crypto/stats")
+async def crypto_stats():
+    """Crypto worker pool queue depth and service time metrics"""
+    return {
+        **crypto_pool.stats(),
+        "kyber_pool": {
+            "enabled": config.KYBER_POOL_ENABLED,
+            **kyber_pool.stats()
+        }
+    }
+
+
+async def fetch_decryption_key(master_sae_id: str, key_id: str) -> str:
+    """
+    Get a decryption key, from the local cache if possible, else from the KME.
+    
+    Args:
+        master_sae_id: The sender's SAE identifier
+        key_id: The key identifier
+    
+    Returns:
+        Base64-encoded key
+    
+    Raises:
+        HTTPException: If the KME does not return the key
+    """
+    if config.DECRYPT_KEY_CACHE_ENABLED:
+        key = key_cache.get(key_id)
+        if key is not None:
+            logger.info(f"Decryption key {key_id} served from cache")
+            return key
+    
+    logger.info("Retrieving decryption key from KME...")
+    keys = await kme_client.get_dec_keys(master_sae_id, [key_id])
+    
+    if not keys:
+        raise HTTPException(
+            status_code=404,
+            detail="Decryption key not found in KME"
+        )
+    
+    key = keys[0].key
+    if config.DECRYPT_KEY_CACHE_ENABLED:
+        key_cache.put(key_id, key)
+    
+    logger.info(f"Successfully retrieved decryption key")
+    return key
+
+
 @app.post("/send", response_model=SendEmailResponse)
 async def send_email(request: SendEmailRequest):
     """
@@ -216,15 +377,21 @@ async def send_email(request: SendEmailRequest):
                 key_size=config.DEFAULT_KEY_SIZE
             )
             
+            # Use pre-generated Kyber material for L3 when available
+            kyber_material = None
+            if request.security_level == SecurityLevel.L3 and config.KYBER_POOL_ENABLED:
+                kyber_material = kyber_pool.take()
+            
             # Step 2: Encrypt the email body
             logger.info(f"Encrypting message with security level {request.security_level.value}")
-            encrypted_data, metadata = encrypt_message(
+            encrypted_data, metadata = await crypto_pool.encrypt(
                 plaintext=request.body,
                 key=key,
                 key_id=key_id,
                 security_level=request.security_level,
                 sender_sae_id=config.QKD_MASTER_SAE_ID,
-                receiver_sae_id=config.QKD_SLAVE_SAE_ID
+                receiver_sae_id=config.QKD_SLAVE_SAE_ID,
+                kyber_material=kyber_material
             )
             
             # Format the encrypted email body with metadata
@@ -233,7 +400,8 @@ async def send_email(request: SendEmailRequest):
         
         # Step 3: Send email via SMTP
         logger.info("Sending email via SMTP...")
-        success = email_sender.send_email(
+        success = await mail_io.run_smtp(
+            email_sender.send_email,
             from_email=from_email,
             to_email=request.to,
             subject=request.subject,
@@ -262,6 +430,13 @@ async def send_email(request: SendEmailRequest):
         # Re-raise HTTP exceptions
         raise
     
+    except MailIOTimeout as e:
+        logger.error(f"Timed out sending email: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail=f"SMTP server timed out: {str(e)}"
+        )
+    
     except Exception as e:
         logger.error(f"Failed to send email: {e}")
         raise HTTPException(
@@ -270,6 +445,27 @@ async def send_email(request: SendEmailRequest):
         )
 
 
+def page_cursors(emails: list, request: FetchEmailsRequest) -> dict:
+    """
+    Build the cursors of a /fetch page.
+    
+    Args:
+        emails: Emails returned by the receiver, newest first
+        request: The request that produced the page
+    
+    Returns:
+        Dict with 'before_uid' (next older page, only when the page is full)
+        and 'after_uid' (newer emails; echoes the request cursor for an empty page)
+    """
+    if not emails:
+        return {"before_uid": None, "after_uid": request.after_uid}
+    uidvalidity = emails[0]['uidvalidity']
+    return {
+        "before_uid": EmailReceiver.page_cursor(uidvalidity, emails[-1]['uid']) if len(emails) >= request.limit else None,
+        "after_uid": EmailReceiver.page_cursor(uidvalidity, emails[0]['uid'])
+    }
+
+
 @app.post("/fetch", response_model=FetchEmailsResponse)
 async def fetch_emails(request: FetchEmailsRequest):
     """
@@ -283,15 +479,66 @@ async def fetch_emails(request: FetchEmailsRequest):
     """
     logger.info("=" * 60)
     logger.info(f"Fetching emails from {request.folder}")
-    logger.info(f"Limit: {request.limit}, Unread only: {request.unread_only}")
+    logger.info(f"Limit: {request.limit}, Unread only: {request.unread_only}, Headers only: {request.headers_only}")
+    filters = request.filters.model_dump(mode="json", exclude_none=True) if request.filters else None
+    if filters:
+        logger.info(f"Filters: {filters}")
+    if request.before_uid or request.after_uid:
+        logger.info(f"Cursor: before={request.before_uid}, after={request.after_uid}")
     logger.info("=" * 60)
     
+    # The folder being browsed goes first in background sync rounds
+    sync_scheduler.set_active(request.folder)
+    
+    if request.before_uid and request.after_uid:
+        raise HTTPException(status_code=400, detail="Use either before_uid or after_uid, not both")
+    page = {"before_uid": request.before_uid, "after_uid": request.after_uid}
+    for cursor in page.values():
+        if cursor:
+            try:
+                EmailReceiver.decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    
     try:
+        if request.headers_only:
+            # Listing mode: headers, structure, size and flags only
+            summaries = await mail_io.run_imap(
+                email_receiver.fetch_email_summaries,
+                folder=request.folder,
+                limit=request.limit,
+                unread_only=request.unread_only,
+                snippet_length=request.snippet_length,
+                filters=filters,
+                **page
+            )
+            
+            summary_list = []
+            for summary in summaries:
+                try:
+                    summary_list.append(EmailSummary(**summary))
+                except Exception as e:
+                    logger.error(f"Failed to parse email summary: {e}")
+                    continue
+            
+            logger.info(f"Successfully listed {len(summary_list)} emails")
+            logger.info("=" * 60)
+            
+            return FetchEmailsResponse(
+                success=True,
+                emails=summary_list,
+                count=len(summary_list),
+                **page_cursors(summaries, request)
+            )
+        
         # Fetch emails from IMAP
-        emails = email_receiver.fetch_emails(
+        emails = await mail_io.run_imap(
+            email_receiver.fetch_emails,
             folder=request.folder,
             limit=request.limit,
-            unread_only=request.unread_only
+            unread_only=request.unread_only,
+            filters=filters,
+            **page
         )
         
         # Convert to EmailData models
@@ -322,9 +569,20 @@ async def fetch_emails(request: FetchEmailsRequest):
         return FetchEmailsResponse(
             success=True,
             emails=email_list,
-            count=len(email_list)
+            count=len(email_list),
+            **page_cursors(emails, request)
         )
+    
+    except StaleCursorError as e:
+        raise HTTPException(status_code=409, detail=str(e))
         
+    except MailIOTimeout as e:
+        logger.error(f"Timed out fetching emails: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail=f"IMAP server timed out: {str(e)}"
+        )
+    
     except Exception as e:
         logger.error(f"Failed to fetch emails: {e}")
         raise HTTPException(
@@ -333,6 +591,260 @@ async def fetch_emails(request: FetchEmailsRequest):
         )
 
 
+@app.get("/events")
+async def mail_events(request: Request, folder: Optional[str] = None):
+    """
+    Server-sent events stream of mailbox changes pushed by the IDLE watcher.
+    
+    Event types: new_messages (email summaries), expunged (UIDs) and
+    flags_changed (UID -> flags). Comment lines are sent as keepalives.
+    
+    Args:
+        folder: Only stream events for this folder (default: all watched folders)
+    
+    Returns:
+        text/event-stream response
+    """
+    queue = mail_watcher.subscribe()
+    
+    async def event_stream():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=config.SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if folder and event['folder'].upper() != folder.upper():
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            mail_watcher.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/events/status")
+async def mail_events_status():
+    """IDLE watcher and event stream statistics"""
+    return {
+        "enabled": config.IMAP_IDLE_ENABLED,
+        **mail_watcher.stats()
+    }
+
+
+@app.get("/imap/pool")
+async def imap_pool_stats():
+    """IMAP connection pool statistics (open, idle and in-use connections)"""
+    return email_receiver.pool.stats()
+
+
+@app.post("/sync", response_model=SyncResponse)
+async def sync_mailboxes(request: SyncRequest):
+    """
+    Run one sync round over the configured accounts and folders.
+    
+    Folders are synced concurrently (INBOX and the active folder first), so
+    the round takes about as long as the slowest folder.
+    
+    Args:
+        request: SyncRequest with optional account names and active folder
+    
+    Returns:
+        SyncResponse with the result of every folder
+    """
+    if request.active_folder:
+        sync_scheduler.set_active(request.active_folder)
+    
+    unknown = [name for name in request.accounts or [] if name not in sync_scheduler.accounts]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown account(s): {', '.join(unknown)}")
+    
+    # A round waits on many IMAP sessions: run it outside the IMAP worker pool
+    report = await asyncio.get_running_loop().run_in_executor(None, sync_scheduler.sync_all, request.accounts)
+    return SyncResponse(
+        success=all(result['status'] == 'ok' for folders in report.values() for result in folders.values()),
+        seconds=sync_scheduler.last_round_seconds,
+        results=report
+    )
+
+
+@app.get("/sync/status")
+async def sync_status():
+    """Sync scheduler statistics (accounts, budgets, throttling and last round)"""
+    return {
+        "enabled": config.SYNC_ENABLED,
+        **sync_scheduler.stats()
+    }
+
+
+@app.get("/imap/cache")
+async def message_cache_stats():
+    """Parsed-message cache statistics (hits avoid an IMAP fetch on /decrypt)"""
+    return {
+        "enabled": config.MESSAGE_CACHE_ENABLED,
+        **message_cache.stats()
+    }
+
+
+_SECTION = re.compile(r'^[1-9][0-9]*(\.[1-9][0-9]*)*$')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range_header(value: Optional[str], size: Optional[int]) -> Optional[Tuple[int, Optional[int]]]:
+    """
+    Parse a single-range HTTP Range header (RFC 7233).
+    
+    Args:
+        value: Range header value, e.g. 'bytes=100-199', 'bytes=100-', 'bytes=-500'
+        size: Total size of the representation, or None if unknown
+    
+    Returns:
+        (start, end) with end inclusive (None for an open range of unknown
+        size), or None when the header is absent or is to be ignored
+        (malformed, multiple ranges, or a suffix range of unknown size)
+    
+    Raises:
+        HTTPException: 416 if the range lies beyond the end of the part
+    """
+    match = _RANGE.match(value.strip()) if value else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    
+    if match.group(1) == '':
+        # Suffix range: the last N bytes
+        if size is None:
+            return None
+        length = int(match.group(2))
+        if length == 0:
+            raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+        return max(0, size - length), size - 1
+    
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else None
+    if end is not None and end < start:
+        return None
+    if size is not None:
+        if start >= size:
+            raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+        end = size - 1 if end is None else min(end, size - 1)
+    elif end is None:
+        # The end of the part cannot be named in Content-Range; send it all
+        return None
+    return start, end
+
+
+@app.get("/emails/{email_id}/parts/{section}")
+async def download_part(request: Request, email_id: str, section: str, folder: str = "INBOX"):
+    """
+    Stream a single MIME part (attachment) of an email.
+    
+    Only the requested part is transferred, in partial FETCH chunks relayed
+    to the client as they arrive, so memory use does not grow with the
+    attachment size. Parts carrying the quantum encryption headers are
+    decrypted on the fly (L1 and L2). Single byte ranges are supported.
+    
+    Args:
+        email_id: Email ID (UID)
+        section: MIME section number, as listed under 'attachments'
+        folder: IMAP folder name
+    
+    Returns:
+        Streaming response with the decoded (and decrypted) part content
+    """
+    if not email_id.isdigit() or not _SECTION.match(section):
+        raise HTTPException(status_code=400, detail="Invalid email ID or section")
+    
+    try:
+        part = await mail_io.run_imap(email_receiver.describe_part, folder, email_id, section)
+        if part is None:
+            raise HTTPException(status_code=404, detail="Part not found")
+        
+        cipher = None
+        cipher_seekable = True
+        encryption = part['encryption']
+        # L4 means no encryption: stream the part as is, without using up a key
+        if encryption and encryption['security_level'] != 'L4':
+            level = encryption['security_level']
+            if not encryption['key_id'] or level not in ('L1', 'L2'):
+                raise HTTPException(
+                    status_code=415,
+                    detail=f"Cannot stream-decrypt a part with security level {level}"
+                )
+            key = await fetch_decryption_key(config.QKD_MASTER_SAE_ID, encryption['key_id'])
+            cipher = functools.partial(part_decryptor, level, key, encryption['nonce'])
+            cipher_seekable = level in SEEKABLE_PART_LEVELS
+            try:
+                # Fail before the response starts (e.g. a missing nonce)
+                cipher(0)
+            except ValueError as e:
+                raise HTTPException(status_code=415, detail=str(e))
+        
+        size = part['size']
+        byte_range = parse_range_header(request.headers.get("range"), size)
+        start, end = byte_range or (0, None)
+        
+        stream = await mail_io.run_imap(
+            email_receiver.open_part, folder, part,
+            start=start, end=end, cipher=cipher, cipher_seekable=cipher_seekable
+        )
+    
+    except HTTPException:
+        raise
+    
+    except MailIOTimeout as e:
+        logger.error(f"Timed out opening part: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail=f"IMAP server timed out: {str(e)}"
+        )
+    
+    except Exception as e:
+        logger.error(f"Failed to open part {section} of email {email_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to download attachment: {str(e)}"
+        )
+    
+    async def part_chunks():
+        try:
+            while True:
+                chunk = await mail_io.run_imap(stream.read)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            stream.close()
+    
+    filename = part['filename'] or f"part-{section}"
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"
+    }
+    status_code = 200
+    if byte_range:
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size if size is not None else '*'}"
+        if size is not None:
+            headers["Content-Length"] = str(end - start + 1)
+    elif size is not None:
+        headers["Content-Length"] = str(size)
+    
+    return StreamingResponse(
+        part_chunks(),
+        status_code=status_code,
+        media_type=part['content_type'],
+        headers=headers,
+        # Returns the connection even if the body is never iterated
+        background=BackgroundTask(stream.close)
+    )
+
+
 @app.post("/decrypt", response_model=DecryptEmailResponse)
 async def decrypt_email(request: DecryptEmailRequest):
     """
@@ -354,9 +866,12 @@ async def decrypt_email(request: DecryptEmailRequest):
     logger.info(f"Decrypting email: {request.email_id}")
     logger.info("=" * 60)
     
+    if not request.email_id.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid email ID")
+    
     try:
         # Fetch email by ID
-        email_data = email_receiver.get_email_by_id(request.folder, request.email_id)
+        email_data = await mail_io.run_imap(email_receiver.get_email_by_id, request.folder, request.email_id)
         
         if not email_data:
             raise HTTPException(
@@ -390,32 +905,12 @@ async def decrypt_email(request: DecryptEmailRequest):
         logger.info(f"Security level: {metadata.security_level}")
         logger.info(f"Key ID: {metadata.key_id}")
         
-        # Retrieve decryption key from QKD KME
-        logger.info("Retrieving decryption key from KME...")
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{config.QKD_KME_URL}/api/v1/keys/{config.QKD_MASTER_SAE_ID}/dec_keys",
-                json={
-                    "key_IDs": [{"key_ID": metadata.key_id}]
-                },
-                timeout=10.0
-            )
-            
-            response.raise_for_status()
-            qkd_response = QKDKeyResponse(**response.json())
-            
-            if not qkd_response.keys:
-                raise HTTPException(
-                    status_code=404,
-                    detail="Decryption key not found in KME"
-                )
-            
-            key = qkd_response.keys[0].key
-            logger.info(f"Successfully retrieved decryption key")
+        # Retrieve decryption key (cache first, then QKD KME)
+        key = await fetch_decryption_key(config.QKD_MASTER_SAE_ID, metadata.key_id)
         
         # Decrypt the message
         logger.info("Decrypting message...")
-        decrypted_body = decrypt_message(encrypted_data, key, metadata)
+        decrypted_body = await crypto_pool.decrypt(encrypted_data, key, metadata)
         logger.info("Message decrypted successfully")
         logger.info("=" * 60)
         
@@ -440,6 +935,13 @@ async def decrypt_email(request: DecryptEmailRequest):
     except HTTPException:
         raise
     
+    except MailIOTimeout as e:
+        logger.error(f"Timed out fetching email: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail=f"IMAP server timed out: {str(e)}"
+        )
+    
     except Exception as e:
         logger.error(f"Failed to decrypt email: {e}")
         raise HTTPException(
@@ -448,6 +950,151 @@ async def decrypt_email(request: DecryptEmailRequest):
         )
 
 
+@app.post("/decrypt/batch", response_model=DecryptBatchResponse)
+async def decrypt_email_batch(request: DecryptBatchRequest):
+    """
+    Decrypt several emails at once.
+    
+    This endpoint:
+    1. Fetches all requested emails from IMAP with a single FETCH
+    2. Extracts encryption metadata from every encrypted body
+    3. Retrieves all uncached decryption keys in one dec_keys call
+    4. Decrypts the messages concurrently
+    
+    Failures are reported per message rather than failing the whole batch.
+    
+    Args:
+        request: DecryptBatchRequest with email IDs and folder
+    
+    Returns:
+        DecryptBatchResponse with one result per requested email
+    """
+    logger.info("=" * 60)
+    logger.info(f"Batch decrypting {len(request.email_ids)} email(s) from {request.folder}")
+    logger.info("=" * 60)
+    
+    try:
+        emails = await mail_io.run_imap(email_receiver.get_emails_by_ids, request.folder, request.email_ids)
+        
+        # Parse encrypted bodies and work out which keys are needed
+        parsed = {}
+        errors = {}
+        for email_id, email_data in emails.items():
+            if not email_data.get('is_encrypted'):
+                continue
+            try:
+                parsed[email_id] = parse_encrypted_email_body(email_data['body'])
+            except Exception as e:
+                errors[email_id] = f"Failed to parse encrypted body: {str(e)}"
+        
+        keys = {}
+        missing_key_ids = []
+        for encrypted_data, metadata in parsed.values():
+            key = key_cache.get(metadata.key_id) if config.DECRYPT_KEY_CACHE_ENABLED else None
+            if key is not None:
+                keys[metadata.key_id] = key
+            elif metadata.key_id not in missing_key_ids:
+                missing_key_ids.append(metadata.key_id)
+        
+        # Retrieve every missing key with a single dec_keys call
+        if missing_key_ids:
+            logger.info(f"Retrieving {len(missing_key_ids)} decryption key(s) from KME...")
+            try:
+                for qkd_key in await kme_client.get_dec_keys(config.QKD_MASTER_SAE_ID, missing_key_ids):
+                    keys[qkd_key.key_ID] = qkd_key.key
+                    if config.DECRYPT_KEY_CACHE_ENABLED:
+                        key_cache.put(qkd_key.key_ID, qkd_key.key)
+            except httpx.HTTPStatusError as e:
+                # The KME answers 404 when none of the keys are known
+                if e.response.status_code != 404:
+                    raise
+        
+        async def decrypt_one(email_id: str) -> DecryptBatchItem:
+            if not email_id.isdigit():
+                return DecryptBatchItem(email_id=email_id, success=False, error="Invalid email ID")
+            
+            email_data = emails.get(email_id)
+            if not email_data:
+                return DecryptBatchItem(email_id=email_id, success=False, error="Email not found")
+            
+            if email_id in errors:
+                return DecryptBatchItem(email_id=email_id, success=False, error=errors[email_id])
+            
+            if email_id not in parsed:
+                # Not encrypted, return as-is
+                return DecryptBatchItem(
+                    email_id=email_id,
+                    success=True,
+                    email=EmailData(**{
+                        'id': email_data['id'],
+                        'message_id': email_data.get('message_id'),
+                        'from': email_data['from'],
+                        'to': email_data['to'],
+                        'subject': email_data['subject'],
+                        'date': email_data['date'],
+                        'body': email_data['body'],
+                        'is_encrypted': False,
+                        'folder': email_data['folder']
+                    }),
+                    decrypted_body=email_data['body']
+                )
+            
+            encrypted_data, metadata = parsed[email_id]
+            key = keys.get(metadata.key_id)
+            if key is None:
+                return DecryptBatchItem(email_id=email_id, success=False, error="Decryption key not found in KME")
+            
+            try:
+                decrypted_body = await crypto_pool.decrypt(encrypted_data, key, metadata)
+            except Exception as e:
+                return DecryptBatchItem(email_id=email_id, success=False, error=f"Failed to decrypt email: {str(e)}")
+            
+            return DecryptBatchItem(
+                email_id=email_id,
+                success=True,
+                email=EmailData(
+                    id=email_data['id'],
+                    message_id=email_data.get('message_id'),
+                    from_addr=email_data['from'],
+                    to=email_data['to'],
+                    subject=email_data['subject'],
+                    date=email_data['date'],
+                    body=email_data['body'],
+                    is_encrypted=True,
+                    key_id=metadata.key_id,
+                    security_level=metadata.security_level,
+                    folder=email_data['folder']
+                ),
+                decrypted_body=decrypted_body
+            )
+        
+        results = await asyncio.gather(*(decrypt_one(email_id) for email_id in request.email_ids))
+        
+        succeeded = sum(1 for result in results if result.success)
+        logger.info(f"Batch decrypted {succeeded}/{len(results)} email(s)")
+        logger.info("=" * 60)
+        
+        return DecryptBatchResponse(
+            success=True,
+            results=list(results),
+            count=len(results)
+        )
+    
+    except MailIOTimeout as e:
+        logger.error(f"Timed out fetching emails: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail=f"IMAP server timed out: {str(e)}"
+        )
+    
+    except Exception as e:
+        logger.error(f"Failed to batch decrypt emails: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to batch decrypt emails: {str(e)}"
+        )
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -0,0 +1,169 @@
+"""
+Message Cache Module
+Bounded in-memory LRU of parsed messages (headers and armored body), keyed by
+(account, folder, UIDVALIDITY, UID) so opening a message needs no IMAP fetch
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from config import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (account, folder, uidvalidity, uid)
+CacheKey = Tuple[str, str, int, int]
+
+# Per-message fields that change on the server without a new UID
+_VOLATILE_FIELDS = ('flags',)
+
+
+def _entry_size(email_data: Dict) -> int:
+    """Approximate the memory held by a cached message (its string fields)"""
+    size = 0
+    for value in email_data.values():
+        if isinstance(value, str):
+            size += len(value)
+        elif isinstance(value, dict):
+            size += sum(len(v) for v in value.values() if isinstance(v, str))
+    return size
+
+
+class MessageCache:
+    """
+    In-process cache of opened and listed messages.
+
+    A (folder, UIDVALIDITY, UID) triple names an immutable message (RFC 3501),
+    so entries never go stale: a UIDVALIDITY change simply stops them from
+    being looked up, and expunged UIDs are dropped explicitly. Flags are
+    mutable and therefore not cached. Bounded by entry count and by the total
+    size of the cached text, with least-recently-used eviction.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize the MessageCache.
+
+        Args:
+            max_entries: Maximum number of cached messages (defaults to config)
+            max_bytes: Maximum total size of cached headers and bodies (defaults to config)
+        """
+        self.max_entries = max_entries or config.MESSAGE_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or config.MESSAGE_CACHE_MAX_BYTES
+
+        self._entries: "OrderedDict[CacheKey, Tuple[Dict, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _remove(self, key: CacheKey):
+        """Remove an entry (lock must be held)"""
+        _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, account: str, folder: str, uidvalidity: int, uid: int) -> Optional[Dict]:
+        """
+        Look up a message.
+
+        Args:
+            account: Account identifier
+            folder: IMAP folder name
+            uidvalidity: UIDVALIDITY of the folder
+            uid: Message UID
+
+        Returns:
+            Copy of the cached email data (without flags), or None
+        """
+        key = (account, folder, uidvalidity, uid)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[0])
+
+    def put(self, account: str, folder: str, uidvalidity: int, email_data: Dict):
+        """
+        Insert a message with its body, evicting least-recently-used entries as needed.
+
+        Args:
+            account: Account identifier
+            folder: IMAP folder name
+            uidvalidity: UIDVALIDITY of the folder
+            email_data: Parsed email data including 'uid' and 'body'
+        """
+        if email_data.get('body') is None:
+            return
+
+        cached = {name: value for name, value in email_data.items() if name not in _VOLATILE_FIELDS}
+        size = _entry_size(cached)
+        if size > self.max_bytes:
+            return
+
+        key = (account, folder, uidvalidity, email_data['uid'])
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (cached, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, account: str, folder: str, uids: Iterable[int]) -> int:
+        """
+        Drop expunged messages.
+
+        Args:
+            account: Account identifier
+            folder: IMAP folder name
+            uids: UIDs removed from the folder
+
+        Returns:
+            Number of entries removed
+        """
+        uids = set(uids)
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == account and key[1] == folder and key[3] in uids]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Return cache statistics"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+# Singleton instance
+message_cache = MessageCache()
@@ -0,0 +1,260 @@
+"""
+Message Store Module
+Local on-disk (SQLite) cache of parsed messages and per-folder sync state
+"""
+import json
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+from config import config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-folder sync state columns
+_STATE_FIELDS = ("uidvalidity", "uidnext", "exists_count", "low_uid", "highestmodseq", "flags_synced_at")
+
+
+class MessageStore:
+    """
+    Persistent cache of already-parsed messages, keyed by
+    (account, folder, UID), plus the UIDVALIDITY/UIDNEXT sync state of each
+    folder. Bodies are stored separately from the listing data so that
+    header-only syncs can fill the cache and bodies can be added lazily.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the MessageStore.
+
+        Args:
+            path: SQLite database path, or ':memory:' (defaults to config)
+        """
+        self.path = path or config.MESSAGE_STORE_PATH
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+
+        with self._db:
+            if self.path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS folders (
+                    account TEXT NOT NULL,
+                    folder TEXT NOT NULL,
+                    uidvalidity INTEGER,
+                    uidnext INTEGER,
+                    exists_count INTEGER,
+                    low_uid INTEGER,
+                    highestmodseq INTEGER,
+                    flags_synced_at REAL,
+                    PRIMARY KEY (account, folder)
+                )
+                """
+            )
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    account TEXT NOT NULL,
+                    folder TEXT NOT NULL,
+                    uid INTEGER NOT NULL,
+                    flags TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    body TEXT,
+                    PRIMARY KEY (account, folder, uid)
+                )
+                """
+            )
+
+        logger.info(f"MessageStore opened at {self.path}")
+
+    def get_folder_state(self, account: str, folder: str) -> Optional[Dict]:
+        """
+        Get the stored sync state of a folder.
+
+        Returns:
+            Dictionary of state fields, or None if the folder was never synced
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM folders WHERE account = ? AND folder = ?", (account, folder)
+            ).fetchone()
+        return {field: row[field] for field in _STATE_FIELDS} if row else None
+
+    def set_folder_state(self, account: str, folder: str, **fields):
+        """
+        Create or update the sync state of a folder.
+
+        Args:
+            account: Account identifier (IMAP username)
+            folder: Folder name
+            **fields: Any of uidvalidity, uidnext, exists_count, low_uid,
+                      highestmodseq, flags_synced_at
+        """
+        unknown = set(fields) - set(_STATE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown folder state fields: {unknown}")
+
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO folders (account, folder) VALUES (?, ?)", (account, folder)
+            )
+            if fields:
+                assignments = ", ".join(f"{field} = ?" for field in fields)
+                self._db.execute(
+                    f"UPDATE folders SET {assignments} WHERE account = ? AND folder = ?",
+                    (*fields.values(), account, folder)
+                )
+
+    def reset_folder(self, account: str, folder: str):
+        """Drop every cached message and the sync state of a folder (e.g. on UIDVALIDITY change)"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM messages WHERE account = ? AND folder = ?", (account, folder))
+            self._db.execute("DELETE FROM folders WHERE account = ? AND folder = ?", (account, folder))
+
+    def upsert_messages(self, account: str, folder: str, messages: Iterable[Dict]):
+        """
+        Insert or replace listing data for messages (keeps any stored body).
+
+        Args:
+            account: Account identifier
+            folder: Folder name
+            messages: Message dictionaries with at least 'uid' and 'flags'
+        """
+        rows = [
+            (account, folder, message['uid'], json.dumps(message.get('flags') or []), json.dumps(message))
+            for message in messages
+        ]
+        with self._lock, self._db:
+            self._db.executemany(
+                """
+                INSERT INTO messages (account, folder, uid, flags, data) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (account, folder, uid) DO UPDATE SET flags = excluded.flags, data = excluded.data
+                """,
+                rows
+            )
+
+    def set_bodies(self, account: str, folder: str, bodies: Dict[int, str]):
+        """Store message bodies by UID"""
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE messages SET body = ? WHERE account = ? AND folder = ? AND uid = ?",
+                [(body, account, folder, uid) for uid, body in bodies.items()]
+            )
+
+    def update_flags(self, account: str, folder: str, flags_by_uid: Dict[int, List[str]]):
+        """Replace the flags of cached messages"""
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE messages SET flags = ? WHERE account = ? AND folder = ? AND uid = ?",
+                [(json.dumps(flags), account, folder, uid) for uid, flags in flags_by_uid.items()]
+            )
+
+    def delete_uids(self, account: str, folder: str, uids: Iterable[int]):
+        """Remove expunged messages"""
+        with self._lock, self._db:
+            self._db.executemany(
+                "DELETE FROM messages WHERE account = ? AND folder = ? AND uid = ?",
+                [(account, folder, uid) for uid in uids]
+            )
+
+    def uids(self, account: str, folder: str) -> List[int]:
+        """Return all cached UIDs of a folder in ascending order"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT uid FROM messages WHERE account = ? AND folder = ? ORDER BY uid", (account, folder)
+            ).fetchall()
+        return [row['uid'] for row in rows]
+
+    def flags(self, account: str, folder: str) -> Dict[int, List[str]]:
+        """Return the cached flags of every message in a folder, by UID"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT uid, flags FROM messages WHERE account = ? AND folder = ?", (account, folder)
+            ).fetchall()
+        return {row['uid']: json.loads(row['flags']) for row in rows}
+
+    def count(self, account: str, folder: str) -> int:
+        """Return the number of cached messages in a folder"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COUNT(*) AS n FROM messages WHERE account = ? AND folder = ?", (account, folder)
+            ).fetchone()
+        return row['n']
+
+    def _row_to_message(self, row: sqlite3.Row) -> Dict:
+        message = json.loads(row['data'])
+        message['flags'] = json.loads(row['flags'])
+        if row['body'] is not None:
+            message['body'] = row['body']
+        return message
+
+    def list_messages(
+        self,
+        account: str,
+        folder: str,
+        limit: int,
+        unread_only: bool = False,
+        before_uid: Optional[int] = None,
+        after_uid: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Return the newest cached messages of a folder, or one page of them.
+
+        Args:
+            account: Account identifier
+            folder: Folder name
+            limit: Maximum number of messages
+            unread_only: If True, skip messages flagged \\Seen
+            before_uid: Only messages with a lower UID (the page below)
+            after_uid: Only messages with a higher UID, the oldest first (the page above)
+
+        Returns:
+            Message dictionaries, newest (highest UID) first
+        """
+        query = "SELECT * FROM messages WHERE account = ? AND folder = ?"
+        params: list = [account, folder]
+        if unread_only:
+            query += " AND flags NOT LIKE '%\\\\Seen%'"
+        if before_uid is not None:
+            query += " AND uid < ?"
+            params.append(before_uid)
+        if after_uid is not None:
+            query += " AND uid > ?"
+            params.append(after_uid)
+        query += " ORDER BY uid ASC LIMIT ?" if after_uid is not None else " ORDER BY uid DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        messages = [self._row_to_message(row) for row in rows]
+        if after_uid is not None:
+            messages.reverse()
+        return messages
+
+    def get_messages(self, account: str, folder: str, uids: Iterable[int]) -> Dict[int, Dict]:
+        """Return cached messages by UID (missing UIDs are omitted)"""
+        uids = list(uids)
+        if not uids:
+            return {}
+
+        placeholders = ", ".join("?" for _ in uids)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM messages WHERE account = ? AND folder = ? AND uid IN ({placeholders})",
+                (account, folder, *uids)
+            ).fetchall()
+        return {row['uid']: self._row_to_message(row) for row in rows}
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._db.close()
+
+
+# Singleton instance
+message_store = MessageStore()
@@ -3,6 +3,7 @@ Pydantic models for API requests and responses
 """
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from typing import Optional, List, Dict, Any, Union
+from datetime import date
 from enum import Enum
 
 
@@ -62,6 +63,16 @@ class QKDKeyResponse(BaseModel):
     keys: List[QKDKey]
 
 
+class QKDKeyID(BaseModel):
+    """Model for a single key identifier in a dec_keys request"""
+    key_ID: str
+
+
+class QKDKeyIDsRequest(BaseModel):
+    """Request model for QKD key retrieval by key ID"""
+    key_IDs: List[QKDKeyID]
+
+
 class EncryptionMetadata(BaseModel):
     """Metadata to be embedded in encrypted email"""
     key_id: str
@@ -74,11 +85,32 @@ class EncryptionMetadata(BaseModel):
     kyber_secret_key: Optional[str] = None  # For PQC, base64-encoded
 
 
+class EmailFilter(BaseModel):
+    """Filters evaluated by the IMAP server (SEARCH); all given filters must match"""
+    from_addr: Optional[str] = Field(None, alias="from", description="Sender contains this text")
+    to: Optional[str] = Field(None, description="Recipient contains this text")
+    subject: Optional[str] = Field(None, description="Subject contains this text")
+    text: Optional[str] = Field(None, description="Headers or body contain this text")
+    since: Optional[date] = Field(None, description="Received on or after this date")
+    before: Optional[date] = Field(None, description="Received before this date")
+    security_level: Optional[SecurityLevel] = Field(None, description="Quantum security level header")
+    encrypted: Optional[bool] = Field(None, description="Only quantum-encrypted (true) or plain (false) emails")
+    larger: Optional[int] = Field(None, ge=0, description="Larger than this many bytes")
+    smaller: Optional[int] = Field(None, ge=1, description="Smaller than this many bytes")
+    
+    model_config = ConfigDict(populate_by_name=True)
+
+
 class FetchEmailsRequest(BaseModel):
     """Request model for fetching emails"""
     folder: str = Field(default="INBOX", description="IMAP folder to fetch from")
     limit: int = Field(default=50, description="Maximum number of emails to fetch")
     unread_only: bool = Field(default=False, description="Fetch only unread emails")
+    filters: Optional[EmailFilter] = Field(None, description="Server-side search filters")
+    headers_only: bool = Field(default=False, description="List headers and structure only, without bodies")
+    snippet_length: int = Field(default=0, ge=0, le=1024, description="Bytes of body preview per email in headers-only mode")
+    before_uid: Optional[str] = Field(None, description="Page cursor: fetch the page of emails older than this one")
+    after_uid: Optional[str] = Field(None, description="Page cursor: fetch the page of emails newer than this one")
 
 
 class EmailData(BaseModel):
@@ -98,11 +130,43 @@ class EmailData(BaseModel):
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
 
+class AttachmentInfo(BaseModel):
+    """Model for an attachment reference (fetched lazily by MIME section)"""
+    section: str
+    filename: Optional[str] = None
+    content_type: str
+    size: int
+
+
+class EmailSummary(BaseModel):
+    """Model for an email list entry (headers and structure only, no body)"""
+    id: str
+    uid: Optional[int] = None
+    message_id: Optional[str] = None
+    from_addr: Union[EmailAddress, Dict[str, str]] = Field(..., alias="from")
+    to: Union[EmailAddress, Dict[str, str]]
+    subject: str
+    date: str
+    is_encrypted: bool
+    key_id: Optional[str] = None
+    security_level: Optional[str] = None
+    folder: str
+    size: Optional[int] = None
+    flags: List[str] = Field(default_factory=list)
+    has_attachments: bool = False
+    attachments: List[AttachmentInfo] = Field(default_factory=list)
+    snippet: Optional[str] = None
+    
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
 class FetchEmailsResponse(BaseModel):
     """Response model for fetching emails"""
     success: bool
-    emails: List[EmailData]
+    emails: List[Union[EmailData, EmailSummary]]
     count: int
+    before_uid: Optional[str] = Field(None, description="Cursor of the next (older) page, if there may be one")
+    after_uid: Optional[str] = Field(None, description="Cursor for polling emails newer than this page")
 
 
 class DecryptEmailRequest(BaseModel):
@@ -117,3 +181,38 @@ class DecryptEmailResponse(BaseModel):
     email: Optional[EmailData] = None
     decrypted_body: Optional[str] = None
     error: Optional[str] = None
+
+
+class DecryptBatchRequest(BaseModel):
+    """Request model for decrypting several emails at once"""
+    email_ids: List[str] = Field(..., description="Email IDs from IMAP")
+    folder: str = Field(default="INBOX", description="IMAP folder")
+
+
+class DecryptBatchItem(BaseModel):
+    """Per-message result of a batch decryption"""
+    email_id: str
+    success: bool
+    email: Optional[EmailData] = None
+    decrypted_body: Optional[str] = None
+    error: Optional[str] = None
+
+
+class DecryptBatchResponse(BaseModel):
+    """Response model for batch decryption"""
+    success: bool
+    results: List[DecryptBatchItem]
+    count: int
+
+
+class SyncRequest(BaseModel):
+    """Request model for an on-demand sync round"""
+    accounts: Optional[List[str]] = Field(None, description="Accounts to sync (default: all)")
+    active_folder: Optional[str] = Field(None, description="Folder the user is looking at, synced first")
+
+
+class SyncResponse(BaseModel):
+    """Response model for a sync round"""
+    success: bool
+    seconds: float
+    results: Dict[str, Dict[str, Dict[str, Any]]] = Field(..., description="Account -> folder -> sync result")
@@ -0,0 +1,224 @@
+"""
+Part Stream Module
+Chunked download of a single MIME part (attachment) with incremental
+transfer decoding, on-the-fly decryption and byte-range support
+"""
+import binascii
+import logging
+import threading
+from typing import Callable, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Encoded bytes requested per partial FETCH
+CHUNK_SIZE: int = 256 * 1024
+
+# Transfer encodings whose octets are the part content itself
+IDENTITY_ENCODINGS = ('7bit', '8bit', 'binary')
+
+# Incremental decryption of a part: called with the decoded offset of the
+# first byte it will see, returns a function mapping ciphertext to plaintext
+CipherFactory = Callable[[int], Callable[[bytes], bytes]]
+
+_WHITESPACE = b' \t\r\n'
+
+
+class Base64Decoder:
+    """Decode base64 fed in arbitrary pieces (line breaks anywhere)"""
+
+    def __init__(self):
+        self._pending = b''
+
+    def update(self, data: bytes) -> bytes:
+        data = self._pending + data.translate(None, _WHITESPACE)
+        usable = len(data) - len(data) % 4
+        self._pending = data[usable:]
+        return binascii.a2b_base64(data[:usable]) if usable else b''
+
+    def flush(self) -> bytes:
+        # Tolerate missing padding at the very end
+        data, self._pending = self._pending, b''
+        data = data.rstrip(b'=')
+        if len(data) % 4 == 1:
+            data = data[:-1]
+        if not data:
+            return b''
+        return binascii.a2b_base64(data + b'=' * (-len(data) % 4))
+
+
+class QuotedPrintableDecoder:
+    """Decode quoted-printable fed in arbitrary pieces (whole lines at a time)"""
+
+    def __init__(self):
+        self._pending = b''
+
+    def update(self, data: bytes) -> bytes:
+        data = self._pending + data
+        # A soft line break or =XX escape may straddle the piece boundary
+        end = data.rfind(b'\n') + 1
+        self._pending = data[end:]
+        return binascii.a2b_qp(data[:end]) if end else b''
+
+    def flush(self) -> bytes:
+        data, self._pending = self._pending, b''
+        return binascii.a2b_qp(data) if data else b''
+
+
+def make_decoder(encoding: str):
+    """
+    Return an incremental decoder for a transfer encoding.
+
+    Args:
+        encoding: Content-Transfer-Encoding of the part (lower-case)
+
+    Returns:
+        Decoder with update()/flush(), or None if the octets need no decoding
+
+    Raises:
+        ValueError: For an unknown transfer encoding
+    """
+    if encoding in IDENTITY_ENCODINGS:
+        return None
+    if encoding == 'base64':
+        return Base64Decoder()
+    if encoding == 'quoted-printable':
+        return QuotedPrintableDecoder()
+    raise ValueError(f"Unsupported transfer encoding: {encoding}")
+
+
+class PartStream:
+    """
+    Pull-based stream of one MIME part, read chunk by chunk.
+
+    Each read() issues one partial FETCH of at most chunk_size octets, so
+    memory stays bounded by the chunk size whatever the part size. When the
+    fetched octets are the content itself (identity encoding, or decoded by
+    the server with IMAP BINARY) and the cipher can start mid-stream, a range
+    request starts fetching at the requested offset. Otherwise the part is
+    read from its start and the bytes before the range are decoded,
+    decrypted and dropped.
+
+    The stream owns a checked-out IMAP connection and returns it through
+    release() at the end of the part, on close(), or (discarded) on error.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[int, int], bytes],
+        release: Callable[[bool], None],
+        encoding: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        cipher: Optional[CipherFactory] = None,
+        cipher_seekable: bool = True,
+        chunk_size: Optional[int] = None
+    ):
+        """
+        Initialize the stream.
+
+        Args:
+            fetch: Returns up to `length` octets of the part as transferred, from `offset`
+            release: Returns the connection; called once with discard=True after an error
+            encoding: Transfer encoding of the fetched octets ('binary' if decoded by the server)
+            start: First decoded byte to return
+            end: Last decoded byte to return (inclusive), or None for the end of the part
+            cipher: Optional decryption applied to the decoded content
+            cipher_seekable: Whether the cipher can start at a non-zero offset
+            chunk_size: Octets per partial FETCH (defaults to CHUNK_SIZE)
+        """
+        self._fetch = fetch
+        self._release = release
+        self.chunk_size = chunk_size or CHUNK_SIZE
+        self._decoder = make_decoder(encoding)
+
+        seekable = self._decoder is None and (cipher is None or cipher_seekable)
+        origin = start if seekable else 0
+        self._offset = origin
+        self._skip = start - origin
+        self._remaining = None if end is None else end - start + 1
+        self._decrypt = cipher(origin) if cipher else None
+
+        self._lock = threading.Lock()
+        self._done = False
+        self._closed = False
+        self._released = False
+
+        # Statistics
+        self.fetches = 0
+        self.octets_fetched = 0
+        self.bytes_returned = 0
+
+    def read(self) -> bytes:
+        """
+        Return the next chunk of the requested range.
+
+        Returns:
+            Decoded (and decrypted) bytes, or b'' once the range is complete
+        """
+        with self._lock:
+            if self._done or self._released:
+                return b''
+            try:
+                chunk = self._read()
+            except Exception:
+                self._done = True
+                self._release_connection(discard=True)
+                raise
+            finally:
+                if self._done or self._closed:
+                    self._release_connection(discard=False)
+            self.bytes_returned += len(chunk)
+            return chunk
+
+    def _read(self) -> bytes:
+        while not self._done:
+            data = self._fetch(self._offset, self.chunk_size)
+            self.fetches += 1
+            self.octets_fetched += len(data)
+            self._offset += len(data)
+            final = len(data) < self.chunk_size
+
+            if self._decoder is not None:
+                data = self._decoder.update(data) + (self._decoder.flush() if final else b'')
+            if self._decrypt is not None:
+                data = self._decrypt(data)
+            if self._skip:
+                dropped = min(self._skip, len(data))
+                data = data[dropped:]
+                self._skip -= dropped
+            if self._remaining is not None:
+                data = data[:self._remaining]
+                self._remaining -= len(data)
+                final = final or self._remaining == 0
+
+            if final:
+                self._done = True
+            if data:
+                return data
+        return b''
+
+    def close(self):
+        """
+        Stop the stream and return its connection.
+
+        Safe to call while a read() is still running on another thread (e.g.
+        after a timeout): the connection is then returned when that read ends.
+        """
+        self._closed = True
+        if self._lock.acquire(blocking=False):
+            try:
+                self._release_connection(discard=False)
+            finally:
+                self._lock.release()
+
+    def _release_connection(self, discard: bool):
+        """Return the connection exactly once (lock must be held)"""
+        if self._released:
+            return
+        self._released = True
+        try:
+            self._release(discard)
+        except Exception as e:
+            logger.warning(f"Failed to release IMAP connection of part stream: {e}")
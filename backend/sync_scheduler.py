@@ -0,0 +1,361 @@
+"""
+Sync Scheduler Module
+Synchronizes the folders of several IMAP accounts concurrently, with a
+connection budget per account, priorities and backoff when throttled
+"""
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+from config import config
+from email_receiver import EmailReceiver
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Scheduling priorities (lower runs first)
+PRIORITY_ACTIVE = 0   # folder the user is looking at
+PRIORITY_INBOX = 1
+PRIORITY_DEFAULT = 2
+
+# Response text of servers that refuse work because of rate limits
+# (RFC 5530 codes, plus the wording of common providers)
+THROTTLE_MARKERS = ('[LIMIT]', '[UNAVAILABLE]', '[INUSE]', '[THROTTLED]', 'TOO MANY', 'RATE LIMIT')
+
+
+class SyncAccount:
+    """One IMAP account known to the scheduler"""
+
+    def __init__(self, name: str, receiver: EmailReceiver, folders: List[str], connections: int):
+        """
+        Initialize the account.
+
+        Args:
+            name: Account name (the IMAP username)
+            receiver: Receiver bound to the account
+            folders: Folders to sync
+            connections: Maximum folder syncs of this account in flight
+        """
+        self.name = name
+        self.receiver = receiver
+        self.folders = list(folders)
+        self.connections = max(1, connections)
+        self.running = 0
+        self.backoff = 0.0
+        self.backoff_until = 0.0
+        self.throttled = 0
+
+
+class SyncScheduler:
+    """
+    Runs folder syncs of all configured accounts as one round of jobs.
+
+    A round queues one job per (account, folder) and hands them to at most
+    max_concurrency worker threads, so the round takes about as long as the
+    slowest folder rather than the sum of all folders. Jobs run in priority
+    order (the active folder, then INBOX, then the rest), but an account
+    never has more jobs in flight than its connection budget. When a server
+    answers with a throttling response the whole account pauses with
+    exponential backoff and the folder is queued again.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        interval: Optional[float] = None,
+        backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+        retries: Optional[int] = None
+    ):
+        """
+        Initialize the SyncScheduler.
+
+        Args:
+            max_concurrency: Folder syncs in flight across all accounts (defaults to config)
+            interval: Seconds between background rounds (defaults to config)
+            backoff: First pause of a throttled account in seconds (defaults to config)
+            max_backoff: Longest pause of a throttled account in seconds (defaults to config)
+            retries: Requeues of a throttled folder per round (defaults to config)
+        """
+        self.max_concurrency = max_concurrency or config.SYNC_MAX_CONCURRENCY
+        self.interval = interval or config.SYNC_INTERVAL
+        self.backoff = backoff or config.SYNC_THROTTLE_BACKOFF
+        self.max_backoff = max_backoff or config.SYNC_THROTTLE_MAX_BACKOFF
+        self.retries = config.SYNC_THROTTLE_RETRIES if retries is None else retries
+
+        self.accounts: Dict[str, SyncAccount] = {}
+        self._active: Dict[str, str] = {}
+        self._cond = threading.Condition()
+        self._round_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistics
+        self.rounds = 0
+        self.syncs = 0
+        self.failures = 0
+        self.throttled = 0
+        self.last_round_seconds: Optional[float] = None
+        self.last_round_at: Optional[float] = None
+        self.last_report: Dict[str, Dict] = {}
+
+    def add_account(
+        self,
+        receiver: EmailReceiver,
+        folders: Optional[List[str]] = None,
+        connections: Optional[int] = None
+    ) -> SyncAccount:
+        """
+        Register an account (replacing one with the same username).
+
+        Args:
+            receiver: Receiver bound to the account
+            folders: Folders to sync (defaults to config)
+            connections: Connection budget of the account (defaults to config,
+                capped by the receiver's pool size)
+
+        Returns:
+            The registered account
+        """
+        connections = min(connections or config.SYNC_ACCOUNT_CONNECTIONS, receiver.pool.size)
+        account = SyncAccount(receiver.username, receiver, folders or config.SYNC_FOLDERS, connections)
+        with self._cond:
+            self.accounts[account.name] = account
+        logger.info(f"Sync account {account.name}: {', '.join(account.folders)} ({account.connections} connection(s))")
+        return account
+
+    def add_configured_accounts(self, default_receiver: EmailReceiver):
+        """
+        Register the IMAP_* account (through the shared receiver) and the
+        accounts listed in IMAP_ACCOUNTS.
+
+        Args:
+            default_receiver: Receiver of the IMAP_* account
+        """
+        if default_receiver.username:
+            self.add_account(default_receiver)
+        for entry in config.IMAP_ACCOUNTS:
+            connections = entry.get('connections') or config.SYNC_ACCOUNT_CONNECTIONS
+            receiver = EmailReceiver(
+                imap_server=entry.get('server'),
+                imap_port=entry.get('port'),
+                username=entry['username'],
+                password=entry.get('password'),
+                use_ssl=entry.get('use_ssl', config.IMAP_USE_SSL),
+                pool_size=connections
+            )
+            self.add_account(receiver, entry.get('folders'), connections)
+
+    def set_active(self, folder: str, account: Optional[str] = None):
+        """
+        Mark the folder the user is looking at, so it is synced first.
+
+        Args:
+            folder: IMAP folder name
+            account: Account name (defaults to the IMAP_* account)
+        """
+        with self._cond:
+            self._active[account or config.IMAP_USERNAME] = folder
+
+    def priority(self, account: str, folder: str) -> int:
+        """Scheduling priority of a folder (lower runs first)"""
+        if self._active.get(account) == folder:
+            return PRIORITY_ACTIVE
+        if folder.upper() == 'INBOX':
+            return PRIORITY_INBOX
+        return PRIORITY_DEFAULT
+
+    def sync_all(self, accounts: Optional[List[str]] = None) -> Dict[str, Dict[str, Dict]]:
+        """
+        Run one sync round over all folders of the given accounts (blocking).
+
+        Args:
+            accounts: Account names (default: all registered accounts)
+
+        Returns:
+            Account -> folder -> result, where a result has 'status' ('ok',
+            'throttled' or 'error'), 'seconds', 'attempts' and either the
+            'new'/'expunged'/'flags' change counts or an 'error' message
+        """
+        with self._round_lock:
+            with self._cond:
+                selected = [
+                    account for name, account in self.accounts.items()
+                    if accounts is None or name in accounts
+                ]
+                counter = itertools.count()
+                queue = [
+                    (self.priority(account.name, folder), next(counter), account, folder, 1)
+                    for account in selected
+                    for folder in account.folders
+                ]
+            jobs = len(queue)
+            report: Dict[str, Dict[str, Dict]] = {account.name: {} for account in selected}
+            round_state = {'queue': queue, 'running': 0, 'counter': counter}
+
+            started = time.monotonic()
+            workers = [
+                threading.Thread(target=self._work, args=(round_state, report), name=f"sync-{number}", daemon=True)
+                for number in range(min(self.max_concurrency, jobs))
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+            self.rounds += 1
+            self.last_round_seconds = time.monotonic() - started
+            self.last_round_at = time.time()
+            self.last_report = report
+            logger.info(f"Sync round of {jobs} folder(s) took {self.last_round_seconds:.2f}s")
+            return report
+
+    def _next_job(self, round_state: Dict):
+        """
+        Take the most urgent job whose account has a free connection and is
+        not backing off (lock must be held).
+
+        Returns:
+            (job, wait) where job is None if nothing can run now, and wait is
+            the number of seconds until a backoff ends (None: wait for a job)
+        """
+        now = time.monotonic()
+        wait = None
+        for job in sorted(round_state['queue'], key=lambda job: job[:2]):
+            account = job[2]
+            if account.backoff_until > now:
+                remaining = account.backoff_until - now
+                wait = remaining if wait is None else min(wait, remaining)
+            elif account.running < account.connections:
+                round_state['queue'].remove(job)
+                return job, None
+        return None, wait
+
+    def _work(self, round_state: Dict, report: Dict[str, Dict[str, Dict]]):
+        """Worker thread body: run jobs until the round's queue is drained"""
+        while True:
+            with self._cond:
+                while True:
+                    if self._stop.is_set() or not (round_state['queue'] or round_state['running']):
+                        return
+                    job, wait = self._next_job(round_state)
+                    if job is not None:
+                        break
+                    self._cond.wait(wait)
+                _, _, account, folder, attempts = job
+                account.running += 1
+                round_state['running'] += 1
+
+            result = self._sync(account, folder)
+            result['attempts'] = attempts
+
+            with self._cond:
+                account.running -= 1
+                round_state['running'] -= 1
+                if result['status'] == 'throttled' and attempts <= self.retries and not self._stop.is_set():
+                    # Keep the folder's place in the priority order for the retry
+                    round_state['queue'].append(
+                        (self.priority(account.name, folder), next(round_state['counter']), account, folder, attempts + 1)
+                    )
+                else:
+                    report[account.name][folder] = result
+                self._cond.notify_all()
+
+    def _sync(self, account: SyncAccount, folder: str) -> Dict:
+        """Sync one folder and record throttling on its account"""
+        started = time.monotonic()
+        try:
+            changes = account.receiver.sync_folder(folder)
+            result = {
+                'status': 'ok',
+                'new': len(changes['new']),
+                'expunged': len(changes['expunged']),
+                'flags': len(changes['flags'])
+            }
+            with self._cond:
+                account.backoff = 0.0
+                self.syncs += 1
+        except Exception as e:
+            if self._is_throttled(e):
+                with self._cond:
+                    account.backoff = min(max(account.backoff * 2, self.backoff), self.max_backoff)
+                    account.backoff_until = time.monotonic() + account.backoff
+                    account.throttled += 1
+                    self.throttled += 1
+                logger.warning(f"Server throttled {account.name}; pausing its syncs for {account.backoff:.1f}s")
+                result = {'status': 'throttled', 'error': str(e)}
+            else:
+                with self._cond:
+                    self.failures += 1
+                logger.error(f"Failed to sync {account.name}/{folder}: {e}")
+                result = {'status': 'error', 'error': str(e)}
+        result['seconds'] = round(time.monotonic() - started, 3)
+        return result
+
+    @staticmethod
+    def _is_throttled(error: Exception) -> bool:
+        """Whether an error is the server asking the client to slow down"""
+        text = str(error).upper()
+        return any(marker in text for marker in THROTTLE_MARKERS)
+
+    def start(self):
+        """Start syncing all accounts every interval in a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sync-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Sync scheduler started for {len(self.accounts)} account(s), every {self.interval:.0f}s")
+
+    def close(self):
+        """Stop the background rounds (a running round ends after its current jobs)"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=config.IMAP_OPERATION_TIMEOUT)
+            self._thread = None
+
+    def _run(self):
+        """Thread body: one round per interval"""
+        while not self._stop.is_set():
+            try:
+                self.sync_all()
+            except Exception as e:
+                logger.error(f"Sync round failed: {e}")
+            self._stop.wait(self.interval)
+
+    def stats(self) -> Dict:
+        """Return scheduler statistics"""
+        now = time.monotonic()
+        with self._cond:
+            accounts = {
+                name: {
+                    "folders": account.folders,
+                    "connections": account.connections,
+                    "running": account.running,
+                    "throttled": account.throttled,
+                    "backoff_remaining": round(max(0.0, account.backoff_until - now), 1)
+                }
+                for name, account in self.accounts.items()
+            }
+            active = dict(self._active)
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "max_concurrency": self.max_concurrency,
+            "interval": self.interval,
+            "accounts": accounts,
+            "active": active,
+            "rounds": self.rounds,
+            "syncs": self.syncs,
+            "failures": self.failures,
+            "throttled": self.throttled,
+            "last_round_seconds": self.last_round_seconds,
+            "last_round_at": self.last_round_at
+        }
+
+
+# Singleton instance
+sync_scheduler = SyncScheduler()
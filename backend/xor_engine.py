@@ -0,0 +1,136 @@
+"""
+XOR Engine Module
+Bulk, chunked XOR used by the L1 One-Time Pad implementation
+"""
+from typing import List, Optional, Union
+
+# NumPy is optional: when available it is used for the per-chunk XOR,
+# otherwise we fall back to arbitrary-precision integer XOR (also done in C)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Default chunk size (bytes) processed per XOR operation
+CHUNK_SIZE: int = 64 * 1024
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+def _xor_block(data: BytesLike, keystream: BytesLike) -> bytes:
+    """
+    XOR two equally sized buffers in a single bulk operation.
+
+    Args:
+        data: Input buffer
+        keystream: Key material of the same length as data
+
+    Returns:
+        XOR of both buffers
+    """
+    length = len(data)
+    if length == 0:
+        return b""
+
+    if np is not None:
+        return np.bitwise_xor(
+            np.frombuffer(data, dtype=np.uint8),
+            np.frombuffer(keystream, dtype=np.uint8)
+        ).tobytes()
+
+    return (
+        int.from_bytes(data, 'little') ^ int.from_bytes(keystream, 'little')
+    ).to_bytes(length, 'little')
+
+
+class XorStream:
+    """
+    Incremental XOR of a byte stream against a (repeating) key.
+
+    Data may be fed in arbitrarily sized pieces through update(); the key
+    position is carried across calls so that feeding a buffer in several
+    pieces gives the same result as feeding it in one go. Internally the
+    input is processed in fixed-size chunks to bound temporary memory.
+    """
+
+    def __init__(self, key: BytesLike, chunk_size: int = CHUNK_SIZE, offset: int = 0):
+        """
+        Initialize the stream.
+
+        Args:
+            key: Key bytes. If shorter than the data it is repeated
+                 (note: this weakens OTP security)
+            chunk_size: Number of bytes XORed per bulk operation
+            offset: Position in the stream of the first byte fed to update()
+        """
+        if not key:
+            raise ValueError("XOR key must not be empty")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+
+        self._key = bytes(key)
+        self._chunk_size = chunk_size
+        self._offset = offset
+
+    @property
+    def offset(self) -> int:
+        """Number of bytes processed so far"""
+        return self._offset
+
+    def _keystream(self, length: int) -> bytes:
+        """Return the next `length` key bytes, starting at the current offset"""
+        key = self._key
+        key_length = len(key)
+        start = self._offset % key_length
+
+        # Fast path: the key covers the requested range without wrapping
+        if start + length <= key_length:
+            return key[start:start + length]
+
+        rotated = key[start:] + key[:start]
+        repeats = length // key_length + 1
+        return (rotated * repeats)[:length]
+
+    def update(self, data: BytesLike) -> bytes:
+        """
+        XOR the next piece of the stream.
+
+        Args:
+            data: Next input bytes
+
+        Returns:
+            XORed output of the same length as data
+        """
+        view = memoryview(data).cast('B')
+        chunks: List[bytes] = []
+
+        for start in range(0, len(view), self._chunk_size):
+            block = view[start:start + self._chunk_size]
+            chunks.append(_xor_block(block, self._keystream(len(block))))
+            self._offset += len(block)
+
+        if len(chunks) == 1:
+            return chunks[0]
+        return b"".join(chunks)
+
+
+def xor_bytes(
+    data: BytesLike,
+    key: BytesLike,
+    chunk_size: Optional[int] = None
+) -> bytes:
+    """
+    XOR a whole buffer against a key in one call.
+
+    Args:
+        data: Input bytes
+        key: Key bytes (repeated if shorter than data)
+        chunk_size: Optional override of the chunk size
+
+    Returns:
+        XORed bytes
+    """
+    return XorStream(key, chunk_size or CHUNK_SIZE).update(data)
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from store_keys import generate_keys
+
+logger = logging.getLogger(__name__)
+
+# Key sizes (bits) kept pre-generated, and keys kept ready per size
+POOL_KEY_SIZES = [int(size) for size in os.getenv("QKD_POOL_KEY_SIZES", "256,512").split(",") if size.strip()]
+POOL_CAPACITY = int(os.getenv("QKD_POOL_CAPACITY", "2000"))
+
+# Keys generated per random read while refilling (the producer yields to
+# requests between batches)
+POOL_REFILL_BATCH = int(os.getenv("QKD_POOL_REFILL_BATCH", "256"))
+
+
+class KeyPool:
+    """
+    Bounded pools of pre-generated (key_ID, key) pairs, one per common size.
+
+    A background task tops the pools up in batches drawn from a single
+    random read each, so enc_keys only pops ready entries. Each entry is
+    handed out once; sizes without a pool, and requests larger than what is
+    left, are generated inline in one batch.
+    """
+
+    def __init__(self, sizes: Optional[List[int]] = None, capacity: Optional[int] = None, refill_batch: Optional[int] = None):
+        self.sizes = sizes or POOL_KEY_SIZES
+        self.capacity = capacity or POOL_CAPACITY
+        self.refill_batch = refill_batch or POOL_REFILL_BATCH
+
+        self._pools: Dict[int, Deque[Tuple[str, str]]] = {size: deque() for size in self.sizes}
+        self._producer_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        # Statistics (in keys)
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+
+    def start(self):
+        """Start the background producer (must be called from the event loop)"""
+        if self._producer_task is not None and not self._producer_task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._producer_task = asyncio.create_task(self._produce())
+        logger.info(f"Key pool producer started (sizes={self.sizes}, capacity={self.capacity})")
+
+    async def close(self):
+        """Stop the producer and discard pre-generated keys"""
+        if self._producer_task is not None and not self._producer_task.done():
+            self._producer_task.cancel()
+            try:
+                await self._producer_task
+            except asyncio.CancelledError:
+                pass
+        self._producer_task = None
+        for pool in self._pools.values():
+            pool.clear()
+
+    def fill(self):
+        """Fill every pool to capacity right away (blocking)"""
+        for size, pool in self._pools.items():
+            while len(pool) < self.capacity:
+                self._refill(size, pool)
+
+    def take(self, size_bits: int, count: int) -> List[Tuple[str, str]]:
+        """
+        Take `count` keys of a size.
+
+        Returns:
+            List of (key_ID, key) pairs, from the pool where possible
+        """
+        pool = self._pools.get(size_bits)
+        keys = []
+        if pool is not None:
+            keys = [pool.popleft() for _ in range(min(count, len(pool)))]
+            if self._wakeup is not None:
+                self._wakeup.set()
+        self.hits += len(keys)
+
+        missing = count - len(keys)
+        if missing:
+            self.misses += missing
+            keys.extend(generate_keys(size_bits, missing))
+        return keys
+
+    def _refill(self, size: int, pool: Deque[Tuple[str, str]]):
+        batch = min(self.refill_batch, self.capacity - len(pool))
+        pool.extend(generate_keys(size, batch))
+        self.generated += batch
+
+    async def _produce(self):
+        """Top the pools up whenever one is below capacity"""
+        while True:
+            short = [(size, pool) for size, pool in self._pools.items() if len(pool) < self.capacity]
+            if not short:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            for size, pool in short:
+                self._refill(size, pool)
+            # Let requests run between batches
+            await asyncio.sleep(0)
+
+    def stats(self) -> Dict:
+        """Return pool statistics"""
+        total = self.hits + self.misses
+        return {
+            "available": {str(size): len(pool) for size, pool in self._pools.items()},
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "generated": self.generated,
+            "running": self._producer_task is not None and not self._producer_task.done()
+        }
+
+
+key_pool = KeyPool()
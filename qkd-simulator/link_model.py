@@ -0,0 +1,246 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default link of every SAE pair: secret-key rate in bits/s (0 = unlimited
+# keys, no link model), buffer capacity in bits, and a repeating schedule of
+# "seconds:rate_factor" segments (e.g. "300:1,60:0.3,30:0" = nominal, noisy,
+# down)
+LINK_RATE = float(os.getenv("QKD_LINK_RATE", "0"))
+LINK_CAPACITY = int(os.getenv("QKD_LINK_CAPACITY", str(1024 * 1024)))
+LINK_SCHEDULE = os.getenv("QKD_LINK_SCHEDULE", "")
+
+# What enc_keys does when the buffer runs dry: "block" (wait up to
+# LINK_MAX_WAIT seconds), "partial" (return the keys available) or "reject"
+LINK_MODE = os.getenv("QKD_LINK_MODE", "block")
+LINK_MAX_WAIT = float(os.getenv("QKD_LINK_MAX_WAIT", "5.0"))
+
+# Per slave SAE overrides, as JSON: {"RECEIVER_SAE": {"rate": 10000,
+# "capacity": 100000, "schedule": "60:1,10:0", "mode": "partial", "max_wait": 2}}
+LINKS = json.loads(os.getenv("QKD_LINKS", "{}"))
+
+LINK_MODES = ("block", "partial", "reject")
+
+
+class LinkExhausted(Exception):
+    """Raised when a link cannot supply the requested key material"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_schedule(text: str) -> List[Tuple[float, float]]:
+    """Parse "seconds:factor,..." into (duration, rate_factor) segments"""
+    segments = []
+    for part in text.split(","):
+        if part.strip():
+            duration, factor = part.split(":")
+            segments.append((float(duration), float(factor)))
+    if segments and sum(duration for duration, _ in segments) <= 0:
+        raise ValueError(f"Link schedule has no duration: {text}")
+    return segments
+
+
+class LinkModel:
+    """
+    Secret-key buffer of one QKD link.
+
+    The link distils key at `rate` bits/s, scaled by the factor of the
+    current schedule segment (1 = nominal, between 0 and 1 = noisy, 0 =
+    down), into a buffer of `capacity` bits that starts full. Issued keys
+    consume their size from the buffer. The level is brought up to date
+    lazily, on access.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        schedule: Optional[List[Tuple[float, float]]] = None,
+        mode: str = "block",
+        max_wait: float = 5.0,
+        clock=time.monotonic
+    ):
+        if mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode: {mode}")
+        self.rate = rate
+        self.capacity = capacity
+        self.schedule = schedule or []
+        self.mode = mode
+        self.max_wait = max_wait
+        self._clock = clock
+        self._started = clock()
+        self._updated = self._started
+        self._level = float(capacity)
+        self._cycle = sum(duration for duration, _ in self.schedule)
+        self._lock = asyncio.Lock()
+
+        # Statistics
+        self.granted_bits = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.partials = 0
+        self.rejections = 0
+
+    def _segment(self, now: float) -> Tuple[float, float]:
+        """Rate factor at `now` and seconds until it changes (inf without a schedule)"""
+        if not self.schedule:
+            return 1.0, math.inf
+        position = (now - self._started) % self._cycle
+        for duration, factor in self.schedule:
+            if position < duration:
+                return factor, duration - position
+            position -= duration
+        return self.schedule[-1][1], 0.0
+
+    def _produced(self, start: float, end: float) -> float:
+        """Key bits distilled between two instants"""
+        if not self.schedule:
+            return self.rate * (end - start)
+        produced = 0.0
+        # Whole cycles at once, then the remaining segments one by one
+        cycles = math.floor((end - start) / self._cycle)
+        produced += cycles * self.rate * sum(duration * factor for duration, factor in self.schedule)
+        now = start + cycles * self._cycle
+        while now < end:
+            factor, remaining = self._segment(now)
+            step = max(min(remaining, end - now), 1e-9)
+            produced += self.rate * factor * step
+            now += step
+        return produced
+
+    def level(self) -> float:
+        """Current buffer level in bits"""
+        now = self._clock()
+        if now > self._updated:
+            self._level = min(float(self.capacity), self._level + self._produced(self._updated, now))
+            self._updated = now
+        return self._level
+
+    def eta(self, bits: float) -> Optional[float]:
+        """Seconds until `bits` are in the buffer (None if never, e.g. beyond capacity)"""
+        missing = bits - self.level()
+        if missing <= 0:
+            return 0.0
+        if bits > self.capacity or self.rate <= 0:
+            return None
+        if self.schedule and not any(factor > 0 for _, factor in self.schedule):
+            return None
+        now = self._clock()
+        waited = 0.0
+        while missing > 0:
+            factor, remaining = self._segment(now + waited)
+            step = min(remaining, missing / (self.rate * factor)) if factor > 0 else remaining
+            step = max(step, 1e-9)
+            missing -= self.rate * factor * step
+            waited += step
+        return waited
+
+    def _take(self, bits: float):
+        self._level -= bits
+        self.granted_bits += int(bits)
+
+    async def acquire_keys(self, count: int, key_bits: int) -> int:
+        """
+        Take key material for `count` keys of `key_bits` bits.
+
+        Returns:
+            Number of keys granted (fewer than count only in "partial" mode)
+
+        Raises:
+            LinkExhausted: If the buffer cannot supply the keys in time
+        """
+        bits = count * key_bits
+        if self.mode == "partial":
+            granted = min(count, int(self.level() // key_bits))
+            if granted == 0:
+                self.rejections += 1
+                raise LinkExhausted("QKD link buffer is empty", self.eta(key_bits))
+            if granted < count:
+                self.partials += 1
+            self._take(granted * key_bits)
+            return granted
+
+        if self.mode == "reject" or bits > self.capacity:
+            if self.level() >= bits:
+                self._take(bits)
+                return count
+            self.rejections += 1
+            raise LinkExhausted(
+                f"QKD link buffer holds {int(self.level())} of {bits} requested bits", self.eta(bits)
+            )
+
+        # "block": wait in line (FIFO) for the buffer to fill up
+        async with self._lock:
+            deadline = self._clock() + self.max_wait
+            started = self._clock()
+            if self.level() < bits:
+                self.waits += 1
+            while self.level() < bits:
+                eta = self.eta(bits)
+                remaining = deadline - self._clock()
+                if eta is None or eta > remaining:
+                    self.rejections += 1
+                    self.wait_seconds += self._clock() - started
+                    raise LinkExhausted(f"QKD link could not supply {bits} bits within {self.max_wait}s", eta)
+                await asyncio.sleep(max(eta, 0.001))
+            self.wait_seconds += self._clock() - started
+            self._take(bits)
+            return count
+
+    def stats(self, key_bits: int = 256) -> Dict:
+        """Buffer level, link state and counters"""
+        level = self.level()
+        factor, _ = self._segment(self._clock())
+        return {
+            "state": "down" if factor <= 0 else "degraded" if factor < 1 else "up",
+            "mode": self.mode,
+            "rate_bps": self.rate,
+            "effective_rate_bps": self.rate * factor,
+            "buffer_bits": int(level),
+            "capacity_bits": self.capacity,
+            "buffer_keys": int(level // key_bits),
+            "granted_bits": self.granted_bits,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "partials": self.partials,
+            "rejections": self.rejections
+        }
+
+
+class LinkRegistry:
+    """Link models per slave SAE (None where key supply is unlimited)"""
+
+    def __init__(self, links: Optional[Dict[str, Dict]] = None):
+        self._config = LINKS if links is None else links
+        self._links: Dict[str, Optional[LinkModel]] = {}
+
+    def get(self, slave_sae: str) -> Optional[LinkModel]:
+        if slave_sae not in self._links:
+            self._links[slave_sae] = self._create(slave_sae)
+        return self._links[slave_sae]
+
+    def _create(self, slave_sae: str) -> Optional[LinkModel]:
+        settings = self._config.get(slave_sae, {})
+        rate = float(settings.get("rate", LINK_RATE))
+        if rate <= 0:
+            return None
+        link = LinkModel(
+            rate=rate,
+            capacity=int(settings.get("capacity", LINK_CAPACITY)),
+            schedule=parse_schedule(settings.get("schedule", LINK_SCHEDULE)),
+            mode=settings.get("mode", LINK_MODE),
+            max_wait=float(settings.get("max_wait", LINK_MAX_WAIT))
+        )
+        logger.info(f"QKD link to {slave_sae}: {rate:.0f} bit/s, buffer {link.capacity} bits, mode {link.mode}")
+        return link
+
+
+qkd_links = LinkRegistry()
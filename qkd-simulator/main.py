@@ -1,28 +1,40 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from models import StatusResponse, KeyResponse, KeyRequest, KeyIDsRequest
-from store_keys import key_store, generate_key, load_keys, save_keys
+from store_keys import key_store
+from key_pool import key_pool
+from metrics import kme_metrics
+from link_model import qkd_links, LinkExhausted
 import logging
+import math
+import os
+import time
 from contextlib import asynccontextmanager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Key capacity advertised per slave SAE in status responses
+MAX_KEY_COUNT = int(os.getenv("QKD_MAX_KEY_COUNT", "10000"))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load keys on startup, save on shutdown"""
+    """Open the key store on startup, flush and close it on shutdown"""
     # Startup
     logger.info("="*60)
     logger.info("QKD KME Simulator Starting...")
-    logger.info("Loading persistent key storage...")
-    load_keys()
+    logger.info("Opening persistent key storage...")
+    key_store.open()
+    # Keep key material pre-generated for the common key sizes
+    key_pool.start()
     logger.info("="*60)
     yield
     # Shutdown
-    logger.info("Saving keys before shutdown...")
-    save_keys()
+    await key_pool.close()
+    logger.info("Closing key storage...")
+    key_store.close()
     logger.info("QKD KME Simulator Shutting Down...")
 
 
@@ -43,46 +55,69 @@ app.add_middleware(
 # Get Status
 @app.get("/api/v1/keys/{slave_SAE_ID}/status", response_model=StatusResponse)
 async def getStatus(slave_SAE_ID: str):
+    # Live counters, maintained incrementally by the key store and the endpoints
+    stored = key_store.sae_stats(slave_SAE_ID)
+    # With a link model, the keys that can be issued are those in its buffer
+    link = qkd_links.get(slave_SAE_ID)
+    link_stats = link.stats(256) if link is not None else None
     return {
         "source_KME_ID": "KME_SIMULATOR_001",
         "target_KME_ID": "KME_SIMULATOR_002",
         "master_SAE_ID": "MASTER_SAE",
         "slave_SAE_ID": slave_SAE_ID,
         "key_size": 256,
-        "stored_key_count": 1000,
-        "max_key_count": 10000,
+        "stored_key_count": link_stats["buffer_keys"] if link_stats else stored["keys"],
+        "max_key_count": link.capacity // 256 if link_stats else MAX_KEY_COUNT,
         "max_key_per_request": 10,
         "max_key_size": 512,
         "min_key_size": 128,
-        "max_SAE_ID_count": 0
+        "max_SAE_ID_count": 0,
+        "status_extension": {
+            "stored_key_bytes": stored["bytes"],
+            "total_key_count": len(key_store),
+            "issued_key_count": stored["keys"],
+            "link": link_stats,
+            **kme_metrics.snapshot(slave_SAE_ID)
+        }
     }
 
+# Key store size, lifetimes and eviction counters (simulator-specific)
+@app.get("/api/v1/store/stats")
+async def getStoreStats():
+    return {**key_store.stats(), "key_pool": key_pool.stats()}
+
 # Get Key for Master SAE
 @app.post("/api/v1/keys/{slave_SAE_ID}/enc_keys", response_model=KeyResponse)
 async def get_key(slave_SAE_ID: str, request: KeyRequest):
+    start = time.perf_counter()
+    try:
+        return await issue_keys(slave_SAE_ID, request)
+    finally:
+        kme_metrics.record_latency("enc_keys", time.perf_counter() - start)
+
+async def issue_keys(slave_SAE_ID: str, request: KeyRequest):
     num_keys = request.number if request.number else 1
     key_size = request.size if request.size else 256
 
-    logger.info(f"Generating {num_keys} key(s) of size {key_size} for slave SAE: {slave_SAE_ID}")
-    response_keys = []
-
-    for _ in range(num_keys):
-        key_id, key = generate_key(key_size)
-        keyRequest = {
-            "key_ID": key_id,
-            "key": key
-        }
-
-        key_store[key_id] = {
-            "key": key,
-            "slave_sae": slave_SAE_ID
-        }
+    # Draw the key material from the link buffer first; it blocks, shrinks
+    # the request or refuses it (503) when the buffer runs dry
+    link = qkd_links.get(slave_SAE_ID)
+    if link is not None:
+        try:
+            num_keys = await link.acquire_keys(num_keys, key_size)
+        except LinkExhausted as e:
+            logger.warning(f"QKD link to {slave_SAE_ID} exhausted: {e}")
+            headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after is not None else None
+            raise HTTPException(status_code=503, detail=str(e), headers=headers)
 
-        response_keys.append(keyRequest)
-        logger.info(f"Generated and stored key: {key_id}")
+    logger.info(f"Generating {num_keys} key(s) of size {key_size} for slave SAE: {slave_SAE_ID}")
+    new_keys = key_pool.take(key_size, num_keys)
+    response_keys = [{"key_ID": key_id, "key": key} for key_id, key in new_keys]
 
-    # Save keys to persistent storage
-    save_keys()
+    # Persist before handing the keys out (committed together with concurrent requests)
+    await key_store.add(slave_SAE_ID, new_keys)
+    kme_metrics.record_issued(slave_SAE_ID, len(new_keys))
+    logger.info(f"Generated and stored keys: {[key_id for key_id, _ in new_keys]}")
     logger.info(f"Total keys in store: {len(key_store)}")
     return {
         "keys": response_keys
@@ -91,39 +126,40 @@ async def get_key(slave_SAE_ID: str, request: KeyRequest):
 # Retrieve Key with key ID for slave SAE
 @app.post("/api/v1/keys/{master_SAE_ID}/dec_keys", response_model=KeyResponse)
 async def get_key_with_ids(master_SAE_ID: str, request: KeyIDsRequest):
+    start = time.perf_counter()
+    try:
+        return await retrieve_keys(master_SAE_ID, request)
+    finally:
+        kme_metrics.record_latency("dec_keys", time.perf_counter() - start)
+
+async def retrieve_keys(master_SAE_ID: str, request: KeyIDsRequest):
     logger.info(f"Decryption key request from master SAE: {master_SAE_ID}")
     logger.info(f"Requested key IDs: {[k.key_ID for k in request.key_IDs]}")
-    logger.info(f"Available keys in store: {list(key_store.keys())}")
     
+    # Retrieve but DON'T remove - allow re-decryption of same message;
+    # the retrieval is counted in the same commit
+    found = await key_store.retrieve([k.key_ID for k in request.key_IDs])
     response_keys = []
 
     for key_object in request.key_IDs:
         k_id = key_object.key_ID
 
-        if k_id in key_store:
-            # Retrieve but DON'T remove - allow re-decryption of same message
-            key_data = key_store[k_id]
+        if k_id in found:
+            key_data = found[k_id]
             keyRequest = {
                 "key_ID": k_id,
                 "key": key_data["key"]
             }
             response_keys.append(keyRequest)
-            
-            # Mark as used for tracking (optional)
-            if "used_count" not in key_data:
-                key_data["used_count"] = 0
-            key_data["used_count"] += 1
-            
+            kme_metrics.record_retrieved(key_data["slave_sae"], 1)
             logger.info(f"Retrieved key: {k_id} (used {key_data['used_count']} time(s))")
         else:
             logger.warning(f"Key not found: {k_id}")
     
     if not response_keys:
-        logger.error(f"No matching keys found. Requested: {[k.key_ID for k in request.key_IDs]}, Available: {list(key_store.keys())}")
+        logger.error(f"No matching keys found. Requested: {[k.key_ID for k in request.key_IDs]}")
         raise HTTPException(status_code=404, detail="No matching keys found")
     
-    # Save updated key store after marking usage
-    save_keys()
     logger.info(f"Returning {len(response_keys)} key(s)")
     logger.info(f"Total keys in store: {len(key_store)}")
     return {
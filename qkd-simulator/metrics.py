@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+# Sliding windows (seconds) over which issue/retrieve rates are reported
+RATE_WINDOWS = (10, 60, 300)
+
+# Latency samples kept per endpoint for the percentiles
+LATENCY_SAMPLES = 1024
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+class RateWindow:
+    """
+    Event counts in one-second buckets over the last `span` seconds.
+
+    add() touches one bucket; rate() sums at most `span` buckets, whatever
+    the number of events.
+    """
+
+    def __init__(self, span: int = max(RATE_WINDOWS)):
+        self.span = span
+        self._counts = [0] * span
+        self._seconds = [0] * span  # second each bucket currently holds
+        self._lock = threading.Lock()
+
+    def add(self, count: int = 1, now: Optional[float] = None):
+        second = int(now if now is not None else time.time())
+        index = second % self.span
+        with self._lock:
+            if self._seconds[index] != second:
+                self._seconds[index] = second
+                self._counts[index] = 0
+            self._counts[index] += count
+
+    def rate(self, window: int, now: Optional[float] = None) -> float:
+        """Events per second over the last `window` seconds (at most span)"""
+        second = int(now if now is not None else time.time())
+        window = min(window, self.span)
+        with self._lock:
+            total = sum(
+                count for count, bucket in zip(self._counts, self._seconds)
+                if second - window < bucket <= second
+            )
+        return total / window
+
+
+class LatencyRecorder:
+    """Latencies of the most recent calls, for percentiles"""
+
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        self._samples: Deque[float] = deque(maxlen=samples)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+            self.calls += 1
+
+    def percentiles(self, percentiles: Iterable[int] = LATENCY_PERCENTILES) -> Dict[str, Optional[float]]:
+        """Nearest-rank percentiles in milliseconds (None before the first call)"""
+        with self._lock:
+            samples: List[float] = sorted(self._samples)
+        result = {}
+        for percentile in percentiles:
+            if samples:
+                rank = max(0, -(-percentile * len(samples) // 100) - 1)
+                result[f"p{percentile}"] = round(samples[rank] * 1000, 3)
+            else:
+                result[f"p{percentile}"] = None
+        return result
+
+
+class KMEMetrics:
+    """Live request metrics of the simulator, per slave SAE and per endpoint"""
+
+    def __init__(self):
+        self._issued: Dict[str, RateWindow] = {}
+        self._retrieved: Dict[str, RateWindow] = {}
+        self._latency: Dict[str, LatencyRecorder] = {}
+        self._lock = threading.Lock()
+
+    def _window(self, windows: Dict[str, RateWindow], slave_sae: str) -> RateWindow:
+        window = windows.get(slave_sae)
+        if window is None:
+            with self._lock:
+                window = windows.setdefault(slave_sae, RateWindow())
+        return window
+
+    def record_issued(self, slave_sae: str, keys: int):
+        self._window(self._issued, slave_sae).add(keys)
+
+    def record_retrieved(self, slave_sae: str, keys: int):
+        self._window(self._retrieved, slave_sae).add(keys)
+
+    def record_latency(self, endpoint: str, seconds: float):
+        recorder = self._latency.get(endpoint)
+        if recorder is None:
+            with self._lock:
+                recorder = self._latency.setdefault(endpoint, LatencyRecorder())
+        recorder.record(seconds)
+
+    def snapshot(self, slave_sae: str) -> Dict:
+        """Key rates (keys/s) of a slave SAE and latency percentiles of all endpoints"""
+        now = time.time()
+        issued = self._issued.get(slave_sae)
+        retrieved = self._retrieved.get(slave_sae)
+        return {
+            "issue_rate": {f"{window}s": round(issued.rate(window, now), 3) if issued else 0.0 for window in RATE_WINDOWS},
+            "retrieve_rate": {f"{window}s": round(retrieved.rate(window, now), 3) if retrieved else 0.0 for window in RATE_WINDOWS},
+            "latency_ms": {
+                endpoint: {"calls": recorder.calls, **recorder.percentiles()}
+                for endpoint, recorder in list(self._latency.items())
+            }
+        }
+
+
+kme_metrics = KMEMetrics()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 class StatusResponse(BaseModel):
     source_KME_ID: str
@@ -13,6 +13,7 @@ class StatusResponse(BaseModel):
     max_key_size: int
     min_key_size: int
     max_SAE_ID_count: int
+    status_extension: Optional[Dict[str, Any]] = None
 
 class KeyRequest(BaseModel):
     number: Optional[int] = 1
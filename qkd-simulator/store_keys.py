@@ -1,48 +1,402 @@
+import asyncio
+import concurrent.futures
+import os
+import queue
+import sqlite3
+import threading
+import time
 import uuid
 import secrets
 import base64
 import json
 from pathlib import Path
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Path to persistent key storage
+# Path to persistent key storage (SQLite database in WAL mode)
+KEY_STORE_DB = Path(os.getenv("QKD_KEY_STORE_DB", str(Path(__file__).parent / "keys.db")))
+
+# Legacy JSON key storage, imported once into a new database
 KEY_STORE_FILE = Path(__file__).parent / "qkd_keys.json"
 
-key_store = {}
+# Group commit: requests queued while a commit is in flight go into the next
+# one. The writer can also wait a little for more requests before committing
+# (seconds), and puts at most COMMIT_MAX_BATCH operations into one transaction
+COMMIT_DELAY = float(os.getenv("QKD_COMMIT_DELAY", "0.0"))
+COMMIT_MAX_BATCH = int(os.getenv("QKD_COMMIT_MAX_BATCH", "256"))
+
+# Key lifetime: seconds since issue (0 = forever), number of dec_keys
+# retrievals (0 = unlimited), or deletion on the first retrieval
+KEY_TTL = float(os.getenv("QKD_KEY_TTL", "0"))
+KEY_MAX_RETRIEVALS = int(os.getenv("QKD_KEY_MAX_RETRIEVALS", "0"))
+KEY_DELETE_ON_RETRIEVE = os.getenv("QKD_KEY_DELETE_ON_RETRIEVE", "false").lower() == "true"
+
+# Reaper: seconds between passes, and keys deleted per transaction (small
+# batches interleave with request commits instead of stalling them)
+REAPER_INTERVAL = float(os.getenv("QKD_REAPER_INTERVAL", "10.0"))
+REAPER_BATCH = int(os.getenv("QKD_REAPER_BATCH", "500"))
+
+
+class KeyStore:
+    """
+    Durable store of issued keys, one SQLite row per key.
+
+    Issuing or retrieving keys writes only the affected rows, so the cost of
+    a request does not grow with the number of keys ever issued. All writes
+    go through one writer thread that runs every operation queued up at that
+    point in a single transaction (group commit): concurrent requests share
+    one fsync instead of paying for one each. Startup only opens the
+    database; SQLite recovers from its write-ahead log without reading the
+    keys.
+
+    Keys expire KEY_TTL seconds after issue and are deleted once retrieved
+    KEY_MAX_RETRIEVALS times (once with KEY_DELETE_ON_RETRIEVE). Retrieval
+    enforces both limits; a reaper thread deletes expired keys that are
+    never asked for, a small batch per transaction.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        commit_delay: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        ttl: Optional[float] = None,
+        max_retrievals: Optional[int] = None,
+        delete_on_retrieve: Optional[bool] = None,
+        reaper_interval: Optional[float] = None,
+        reaper_batch: Optional[int] = None
+    ):
+        self.path = Path(path or KEY_STORE_DB)
+        self.commit_delay = COMMIT_DELAY if commit_delay is None else commit_delay
+        self.max_batch = max_batch or COMMIT_MAX_BATCH
+        self.ttl = KEY_TTL if ttl is None else ttl
+        self.max_retrievals = KEY_MAX_RETRIEVALS if max_retrievals is None else max_retrievals
+        if KEY_DELETE_ON_RETRIEVE if delete_on_retrieve is None else delete_on_retrieve:
+            self.max_retrievals = 1
+        self.reaper_interval = reaper_interval or REAPER_INTERVAL
+        self.reaper_batch = reaper_batch or REAPER_BATCH
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._changes = Counter()  # changes made by the running operation
+
+        # Statistics (applied once the changes are committed): keys, bytes,
+        # issued, retrieved, evicted_expired, evicted_retrieved, plus
+        # ("keys", slave_SAE_ID) and ("bytes", slave_SAE_ID) per SAE
+        self.counters = Counter()
+        self.commits = 0
+        self.operations = 0
+        self.reaper_runs = 0
 
-def load_keys():
-    """Load keys from JSON file on startup"""
-    global key_store
-    try:
-        if KEY_STORE_FILE.exists():
+    def open(self):
+        """Open (or create) the database and start the writer thread"""
+        if self._db is not None:
+            return
+        # Autocommit mode: transactions are opened explicitly by the writer
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL + FULL: every commit is durable; group commit keeps fsyncs few
+        self._db.execute("PRAGMA synchronous=FULL")
+        created = self._db.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'keys'"
+        ).fetchone()[0] == 0
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS keys (
+                key_id TEXT PRIMARY KEY,
+                key TEXT NOT NULL,
+                slave_sae TEXT NOT NULL,
+                used_count INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS keys_created_at ON keys (created_at)")
+        if created:
+            self._import_json()
+        # One scan at startup; afterwards every write keeps the counters current
+        self.counters.clear()
+        for slave_sae, keys, size in self._db.execute(
+            "SELECT slave_sae, COUNT(*), "
+            "SUM(length(key) * 3 / 4 - (key LIKE '%=') - (key LIKE '%==')) "
+            "FROM keys GROUP BY slave_sae"
+        ):
+            self._count(self.counters, slave_sae, keys, size)
+
+        self._stop.clear()
+        self._writer = threading.Thread(target=self._write_loop, name="key-store-writer", daemon=True)
+        self._writer.start()
+        if self.ttl:
+            self._reaper = threading.Thread(target=self._reap_loop, name="key-store-reaper", daemon=True)
+            self._reaper.start()
+        logger.info(f"Key store opened at {self.path} with {len(self)} keys")
+
+    def close(self):
+        """Commit pending writes, stop the writer and close the database"""
+        if self._db is None:
+            return
+        self._stop.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+        self._db.close()
+        self._db = None
+        logger.info("Key store closed")
+
+    def _import_json(self):
+        """Import keys from the legacy JSON file into a new database"""
+        if not KEY_STORE_FILE.exists():
+            return
+        try:
             with open(KEY_STORE_FILE, 'r') as f:
                 loaded_data = json.load(f)
-                key_store.clear()  # Clear existing dict
-                key_store.update(loaded_data)  # Update with loaded data
-                logger.info(f"Loaded {len(key_store)} keys from persistent storage")
-                logger.info(f"Available key IDs: {list(key_store.keys())}")
-        else:
-            key_store.clear()
-            logger.info("No existing key storage found, starting fresh")
-    except Exception as e:
-        logger.error(f"Failed to load keys: {e}")
-        key_store.clear()
-
-def save_keys():
-    """Save keys to JSON file for persistence"""
-    try:
-        logger.info(f"Saving {len(key_store)} keys to {KEY_STORE_FILE}")
-        logger.debug(f"Key IDs being saved: {list(key_store.keys())}")
-        with open(KEY_STORE_FILE, 'w') as f:
-            json.dump(key_store, f, indent=2)
-        logger.info(f"Successfully saved keys to persistent storage")
-    except Exception as e:
-        logger.error(f"Failed to save keys: {e}")
+            now = time.time()
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "INSERT OR IGNORE INTO keys (key_id, key, slave_sae, used_count, created_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (key_id, data["key"], data["slave_sae"], data.get("used_count", 0), now)
+                    for key_id, data in loaded_data.items()
+                ]
+            )
+            self._db.execute("COMMIT")
+            logger.info(f"Imported {len(loaded_data)} keys from {KEY_STORE_FILE}")
+        except Exception as e:
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            logger.error(f"Failed to import keys from {KEY_STORE_FILE}: {e}")
+
+    def __len__(self) -> int:
+        return self.counters["keys"]
+
+    def sae_stats(self, slave_sae: str) -> Dict[str, int]:
+        """Keys stored for a slave SAE and their size in bytes"""
+        return {"keys": self.counters[("keys", slave_sae)], "bytes": self.counters[("bytes", slave_sae)]}
+
+    @staticmethod
+    def _count(counter: Counter, slave_sae: str, keys: int, size: int):
+        """Add (or, with negative numbers, remove) stored keys to a counter"""
+        counter.update({"keys": keys, "bytes": size, ("keys", slave_sae): keys, ("bytes", slave_sae): size})
+
+    async def add(self, slave_sae: str, keys: Iterable[Tuple[str, str]]):
+        """Store newly issued (key_ID, key) pairs; returns once they are durable"""
+        rows = [(key_id, key, slave_sae, 0, time.time()) for key_id, key in keys]
+
+        def insert(db: sqlite3.Connection):
+            db.executemany(
+                "INSERT INTO keys (key_id, key, slave_sae, used_count, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._count(self._changes, slave_sae, len(rows), sum(_key_bytes(key) for _, key, _, _, _ in rows))
+            self._changes.update(issued=len(rows))
+
+        await asyncio.wrap_future(self._submit(insert))
+
+    async def retrieve(self, key_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Look up keys by ID and count the retrieval.
+
+        Expired keys are deleted instead of returned; keys on their last
+        allowed retrieval are returned and deleted.
+
+        Returns:
+            key_ID -> {"key", "slave_sae", "used_count"} for the keys found
+        """
+        def lookup(db: sqlite3.Connection) -> Dict[str, Dict]:
+            placeholders = ",".join("?" * len(key_ids))
+            rows = db.execute(
+                f"SELECT key_id, key, slave_sae, used_count, created_at FROM keys WHERE key_id IN ({placeholders})",
+                key_ids
+            ).fetchall()
+
+            expires_before = time.time() - self.ttl if self.ttl else None
+            found, expired, consumed, used = {}, [], [], []
+            for key_id, key, slave_sae, used_count, created_at in rows:
+                if expires_before is not None and created_at < expires_before:
+                    expired.append(key_id)
+                    self._count(self._changes, slave_sae, -1, -_key_bytes(key))
+                    continue
+                if self.max_retrievals and used_count >= self.max_retrievals:
+                    # Left over from a higher limit: already used up
+                    consumed.append(key_id)
+                    self._count(self._changes, slave_sae, -1, -_key_bytes(key))
+                    continue
+                found[key_id] = {"key": key, "slave_sae": slave_sae, "used_count": used_count + 1}
+                if self.max_retrievals and used_count + 1 >= self.max_retrievals:
+                    consumed.append(key_id)
+                    self._count(self._changes, slave_sae, -1, -_key_bytes(key))
+                else:
+                    used.append(key_id)
+
+            db.executemany("UPDATE keys SET used_count = used_count + 1 WHERE key_id = ?", [(key_id,) for key_id in used])
+            db.executemany("DELETE FROM keys WHERE key_id = ?", [(key_id,) for key_id in expired + consumed])
+            self._changes.update(
+                retrieved=len(found),
+                evicted_expired=len(expired),
+                evicted_retrieved=len(consumed)
+            )
+            return found
+
+        if not key_ids:
+            return {}
+        return await asyncio.wrap_future(self._submit(lookup))
+
+    def reap(self) -> int:
+        """
+        Delete expired keys, one batch per transaction (blocking).
+
+        Returns:
+            Number of keys deleted
+        """
+        def evict(db: sqlite3.Connection) -> int:
+            rows = db.execute(
+                "SELECT key_id, slave_sae, key FROM keys WHERE created_at < ? ORDER BY created_at LIMIT ?",
+                (time.time() - self.ttl, self.reaper_batch)
+            ).fetchall()
+            db.executemany("DELETE FROM keys WHERE key_id = ?", [(key_id,) for key_id, _, _ in rows])
+            for _, slave_sae, key in rows:
+                self._count(self._changes, slave_sae, -1, -_key_bytes(key))
+            self._changes.update(evicted_expired=len(rows))
+            return len(rows)
+
+        total = 0
+        while self.ttl and not self._stop.is_set():
+            # Requests queued meanwhile are committed between the batches
+            deleted = self._submit(evict).result()
+            total += deleted
+            if deleted < self.reaper_batch:
+                break
+        self.reaper_runs += 1
+        if total:
+            logger.info(f"Reaper deleted {total} expired key(s), {len(self)} left")
+        return total
+
+    def _reap_loop(self):
+        """Reaper thread: delete expired keys every reaper_interval"""
+        while not self._stop.wait(self.reaper_interval):
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Key reaper failed: {e}")
+
+    def stats(self) -> Dict:
+        """Store size, lifecycle settings and eviction counters"""
+        size = sum(
+            path.stat().st_size
+            for path in (self.path, Path(f"{self.path}-wal"))
+            if path.exists()
+        )
+        return {
+            "keys": len(self),
+            "bytes": self.counters["bytes"],
+            "bytes_on_disk": size,
+            "ttl": self.ttl,
+            "max_retrievals": self.max_retrievals,
+            "issued": self.counters["issued"],
+            "retrieved": self.counters["retrieved"],
+            "evicted_expired": self.counters["evicted_expired"],
+            "evicted_retrieved": self.counters["evicted_retrieved"],
+            "reaper_runs": self.reaper_runs,
+            "commits": self.commits
+        }
+
+    def _submit(self, operation: Callable[[sqlite3.Connection], object]) -> concurrent.futures.Future:
+        """Queue an operation for the writer; the future resolves after its commit"""
+        if self._db is None:
+            raise RuntimeError("Key store is not open")
+        future = concurrent.futures.Future()
+        self._queue.put((operation, future))
+        return future
+
+    def _write_loop(self):
+        """Writer thread: run queued operations in shared transactions"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.commit_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+            if stop:
+                return
+
+    def _commit(self, batch: List[tuple]):
+        """Run a batch of operations in one transaction and resolve their futures"""
+        results = []
+        changes = Counter()
+        try:
+            self._db.execute("BEGIN")
+            for operation, future in batch:
+                # A savepoint per operation keeps one failure from undoing the others
+                self._db.execute("SAVEPOINT operation")
+                self._changes = Counter()
+                try:
+                    results.append((operation(self._db), None))
+                    changes.update(self._changes)
+                except Exception as e:
+                    self._db.execute("ROLLBACK TO operation")
+                    results.append((None, e))
+                self._db.execute("RELEASE operation")
+            self._db.execute("COMMIT")
+            self.counters.update(changes)
+            self.commits += 1
+            self.operations += len(batch)
+        except Exception as e:
+            logger.error(f"Key store commit failed: {e}")
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            results = [(None, e)] * len(batch)
+
+        for (_, future), (result, error) in zip(batch, results):
+            if not future.set_running_or_notify_cancel():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+def _key_bytes(key_b64: str) -> int:
+    """Size of a base64-encoded key in bytes"""
+    return len(key_b64) * 3 // 4 - key_b64[-2:].count("=")
+
+
+key_store = KeyStore()
 
 def generate_key(size_bits = 256):
     key_bytes = secrets.token_bytes(size_bits//8)
     key_b64 = base64.b64encode(key_bytes).decode('utf-8')
     key_id = str(uuid.uuid4())
-    return key_id, key_b64
\ No newline at end of file
+    return key_id, key_b64
+
+def generate_keys(size_bits = 256, count = 1):
+    """Generate `count` (key_ID, key) pairs from one random read, sliced per key"""
+    key_len = size_bits // 8
+    stride = 16 + key_len  # 16 random bytes for the UUID, then the key
+    material = secrets.token_bytes(stride * count)
+    keys = []
+    for offset in range(0, stride * count, stride):
+        key_id = str(uuid.UUID(bytes=material[offset:offset + 16], version=4))
+        key_b64 = base64.b64encode(material[offset + 16:offset + stride]).decode('utf-8')
+        keys.append((key_id, key_b64))
+    return keys
@@ -306,6 +306,54 @@ function setupIpcHandlers(ipcMain, mainWindow) {
   ipcMain.on('show-notification', (event, title, body) => {
     new Notification({ title, body }).show();
   });
+  
+  // New mail is pushed by the backend (IMAP IDLE) instead of polled
+  subscribeToMailEvents(mainWindow);
+}
+
+// Forward the backend's server-sent mail events to the renderer
+function subscribeToMailEvents(mainWindow, retryDelay = 1000) {
+  let buffer = '';
+  let retrying = false;
+  
+  const retry = () => {
+    if (retrying || mainWindow.isDestroyed()) return;
+    retrying = true;
+    setTimeout(() => subscribeToMailEvents(mainWindow, Math.min(retryDelay * 2, 30000)), retryDelay);
+  };
+  
+  axios.get(`${BACKEND_URL}/events`, { responseType: 'stream', timeout: 0 })
+    .then((response) => {
+      retryDelay = 1000;
+      response.data.on('data', (chunk) => {
+        buffer += chunk.toString();
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const message = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          
+          // Lines starting with ':' are keepalive comments
+          const data = message
+            .split('\n')
+            .filter(line => line.startsWith('data: '))
+            .map(line => line.slice(6))
+            .join('\n');
+          if (!data || mainWindow.isDestroyed()) continue;
+          
+          try {
+            const event = JSON.parse(data);
+            if (event.type === 'new_messages') {
+              event.emails.forEach(email => mainWindow.webContents.send('new-email-received', email));
+            }
+          } catch (error) {
+            console.error('Invalid mail event:', error.message);
+          }
+        }
+      });
+      response.data.on('end', retry);
+      response.data.on('error', retry);
+    })
+    .catch(retry);
 }
 
 // Helper functions
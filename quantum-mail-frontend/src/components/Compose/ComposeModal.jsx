@@ -94,10 +94,10 @@ const ComposeModal = () => {
       if (type === 'reply' || type === 'replyAll') {
         setTo(originalEmail.from.email);
         setSubject(`Re: ${originalEmail.subject}`);
-        setBody(`\n\n--- Original Message ---\n${originalEmail.body.replace(/<[^>]*>/g, '')}`);
+        setBody(`\n\n--- Original Message ---\n${(originalEmail.body || '').replace(/<[^>]*>/g, '')}`);
       } else if (type === 'forward') {
         setSubject(`Fwd: ${originalEmail.subject}`);
-        setBody(`\n\n--- Forwarded Message ---\n${originalEmail.body.replace(/<[^>]*>/g, '')}`);
+        setBody(`\n\n--- Forwarded Message ---\n${(originalEmail.body || '').replace(/<[^>]*>/g, '')}`);
       }
     }
   }, [composeData]);
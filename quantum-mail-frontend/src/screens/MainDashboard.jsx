@@ -55,7 +55,15 @@ const MainDashboard = ({ onLogout }) => {
         }
       });
 
-      return cleanup;
+      // New mail pushed by the backend
+      const cleanupNewEmail = window.electronAPI.onNewEmail((email) => {
+        useStore.getState().receiveEmail(email);
+      });
+
+      return () => {
+        cleanup();
+        cleanupNewEmail();
+      };
     }
   }, []);
 
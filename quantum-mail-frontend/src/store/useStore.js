@@ -296,22 +296,7 @@ const useStore = create(
           const result = await window.electronAPI.fetchEmails(folder);
           if (result.success) {
             // Map backend email format to frontend format
-            const mappedEmails = result.emails.map(email => ({
-              id: email.id,
-              from: email.from || email.from_addr,
-              to: email.to,
-              subject: email.subject,
-              preview: email.body ? email.body.substring(0, 150) + '...' : '',
-              body: email.body,
-              date: email.date,
-              read: email.read || false,
-              starred: email.starred || false,
-              securityLevel: email.security_level ? parseInt(email.security_level.replace('L', '')) : 4,
-              keyId: email.key_id,
-              isEncrypted: email.is_encrypted || false,
-              hasAttachments: email.attachments?.length > 0 || false,
-              attachments: email.attachments || [],
-            }));
+            const mappedEmails = result.emails.map(mapBackendEmail);
             
             set((state) => {
               state.emails[folder] = mappedEmails;
@@ -332,6 +317,61 @@ const useStore = create(
         console.error('Failed to fetch emails:', error);
       }
     },
+
+    // Add a message pushed by the backend (IMAP IDLE) to its folder.
+    // Pushed messages are summaries without a body (needsBody); the body is
+    // loaded when the message is opened.
+    receiveEmail: (email) => {
+      const folder = (email.folder || 'inbox').toLowerCase();
+      set((state) => {
+        const emails = state.emails[folder] || [];
+        if (!emails.some(e => e.id === email.id)) {
+          state.emails[folder] = [mapBackendEmail(email), ...emails];
+        }
+      });
+    },
+    
+    // Load the body of a message listed from a summary (decrypted if encrypted)
+    loadEmailBody: async (email) => {
+      try {
+        if (!email.needsBody || !window.electronAPI) {
+          return email;
+        }
+        
+        const result = await window.electronAPI.decryptEmail(email.id, get().selectedFolder);
+        if (!result.success || result.decryptedBody == null) {
+          throw new Error(result.error || 'No body returned');
+        }
+        
+        const loadedEmail = {
+          ...email,
+          body: result.decryptedBody,
+          needsBody: false,
+          isDecrypted: email.isEncrypted,
+        };
+        
+        set((state) => {
+          const folder = state.selectedFolder;
+          const index = (state.emails[folder] || []).findIndex(e => e.id === email.id);
+          if (index !== -1) {
+            state.emails[folder][index] = loadedEmail;
+          }
+          if (state.selectedEmail?.id === email.id) {
+            state.selectedEmail = loadedEmail;
+          }
+        });
+        
+        return loadedEmail;
+      } catch (error) {
+        console.error('Failed to load email body:', error);
+        get().addNotification({
+          type: 'error',
+          title: 'Loading Failed',
+          message: 'Unable to load this email. Please try again.',
+        });
+        return email;
+      }
+    },
     
     decryptEmail: async (email) => {
       try {
@@ -479,6 +519,12 @@ const useStore = create(
         get().markAsRead(email.id);
       }
       
+      // Messages pushed without a body are loaded (and decrypted) first
+      if (email && email.needsBody) {
+        await get().loadEmailBody(email);
+        return;
+      }
+      
       // Auto-decrypt if encrypted and not already decrypted
       if (email && email.isEncrypted && !email.isDecrypted) {
         await get().decryptEmail(email);
@@ -497,7 +543,11 @@ const useStore = create(
       set((state) => { state.sidebarCollapsed = !state.sidebarCollapsed; });
     },
 
-    setShowCompose: (show, data = null) => {
+    setShowCompose: async (show, data = null) => {
+      // Replies and forwards quote the original, so load its body first
+      if (data?.originalEmail?.needsBody) {
+        data = { ...data, originalEmail: await get().loadEmailBody(data.originalEmail) };
+      }
       set((state) => {
         state.showCompose = show;
         state.composeData = data;
@@ -558,6 +608,29 @@ const useStore = create(
   }))
 );
 
+// Map backend email format to frontend format. Summaries (pushed messages)
+// carry a snippet instead of the body; needsBody marks them for loading.
+function mapBackendEmail(email) {
+  const hasBody = email.body != null;
+  return {
+    id: email.id,
+    from: email.from || email.from_addr,
+    to: email.to,
+    subject: email.subject,
+    preview: hasBody ? email.body.substring(0, 150) + '...' : (email.snippet || ''),
+    body: hasBody ? email.body : '',
+    needsBody: !hasBody,
+    date: email.date,
+    read: email.read || false,
+    starred: email.starred || false,
+    securityLevel: email.security_level ? parseInt(email.security_level.replace('L', '')) : 4,
+    keyId: email.key_id,
+    isEncrypted: email.is_encrypted || false,
+    hasAttachments: email.attachments?.length > 0 || false,
+    attachments: email.attachments || [],
+  };
+}
+
 // Mock data generators
 function generateMockKeys(count) {
   const keys = [];
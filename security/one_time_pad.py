@@ -1,6 +1,16 @@
 import requests
 import base64
 
+def xor_bytes(data, key_bytes):
+
+    # XOR the whole buffer in one bulk integer operation
+    length = len(data)
+    if len(key_bytes) < length:
+        raise ValueError("OTP key is shorter than the data")
+    data_int = int.from_bytes(data, 'little')
+    key_int = int.from_bytes(key_bytes[:length], 'little')
+    return (data_int ^ key_int).to_bytes(length, 'little')
+
 def otp_encryption(plaintext):
 
     # determine key length
@@ -21,16 +31,15 @@ def otp_encryption(plaintext):
     key_bytes = base64.b64decode(key_b64)
 
     # encode the plaintext
-    ciphertext_bytes = bytes([pt_bytes[i] ^ key_bytes[i] for i in range(pt_length)])
+    ciphertext_bytes = xor_bytes(pt_bytes, key_bytes)
     ciphertext_b64 = base64.b64encode(ciphertext_bytes).decode('utf-8')
 
     return ciphertext_b64, key_ID
 
 def otp_decryption(ciphertext, key_ID):
 
-    # determine key length
+    # decode the ciphertext
     ct_bytes = base64.b64decode(ciphertext)
-    ct_length = len(ct_bytes)
 
     # get key and key_ID from qkd simulator
     api_url="http://localhost:8000/api/v1/keys/1001/dec_keys"
@@ -48,7 +57,7 @@ def otp_decryption(ciphertext, key_ID):
     key_bytes = base64.b64decode(key_b64)
 
     # obtain the plaintext from the ciphertext
-    plaintext_bytes = bytes([ct_bytes[i] ^ key_bytes[i] for i in range(ct_length)])
+    plaintext_bytes = xor_bytes(ct_bytes, key_bytes)
     plaintext = plaintext_bytes.decode('utf-8')
 
     return plaintext
\ No newline at end of file
@@ -0,0 +1,125 @@
+import hashlib
+import multiprocessing
+import os
+import secrets
+import sys
+import tracemalloc
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# keep the message store in memory for this run
+os.environ["MESSAGE_STORE_PATH"] = ":memory:"
+
+from imap_standin import IMAPStandIn, DEFAULT_CAPABILITIES
+from email_receiver import EmailReceiver
+from xor_engine import XorStream, xor_bytes
+
+SCENARIOS = [
+    ("BINARY", DEFAULT_CAPABILITIES + ("BINARY",)),
+    ("BODY only", DEFAULT_CAPABILITIES),
+]
+
+ATTACHMENT = secrets.token_bytes(8 * 1024 * 1024)
+SECRET = secrets.token_bytes(100 * 1024)
+KEY = secrets.token_bytes(32)
+
+def make_message():
+
+    message = MIMEMultipart()
+    message["From"] = "Alice <alice@example.com>"
+    message["To"] = "bob@example.com"
+    message["Subject"] = "Attachments"
+    message["Date"] = "Mon, 10 Feb 2026 14:35:22 +0000"
+    message.attach(MIMEText("See attached", "plain"))
+    message.attach(MIMEApplication(ATTACHMENT, Name="data.bin"))
+    encrypted = MIMEApplication(xor_bytes(SECRET, KEY), Name="secret.bin")
+    encrypted["X-Quantum-Encryption"] = "true"
+    encrypted["X-Quantum-Key-ID"] = "key-1"
+    encrypted["X-Quantum-Security-Level"] = "L1"
+    message.attach(encrypted)
+    return message.as_bytes()
+
+def serve(capabilities, connection):
+
+    # the server runs in its own process so tracemalloc sees only the client
+    server = IMAPStandIn(capabilities=capabilities)
+    server.start()
+    uid = server.add_message("INBOX", make_message())
+    connection.send((server.port, uid))
+    connection.recv()
+    server.stop()
+
+def download(receiver, part, start=0, end=None, cipher=None):
+
+    # digest instead of collecting chunks, so only the stream's own memory counts
+    stream = receiver.open_part("INBOX", part, start=start, end=end, cipher=cipher)
+    digest = hashlib.sha256()
+    while True:
+        chunk = stream.read()
+        if not chunk:
+            break
+        digest.update(chunk)
+    stream.close()
+    return digest.digest(), stream
+
+def sha256(data):
+
+    return hashlib.sha256(data).digest()
+
+def l1_cipher(offset):
+
+    return XorStream(KEY, offset=offset).update
+
+results = []
+for name, capabilities in SCENARIOS:
+
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.get_context("fork").Process(target=serve, args=(capabilities, child))
+    process.start()
+    port, uid = parent.recv()
+
+    receiver = EmailReceiver("127.0.0.1", port, name, "secret", use_ssl=False)
+    receiver.part_chunk_size = 64 * 1024
+
+    part = receiver.describe_part("INBOX", str(uid), "2")
+    secret_part = receiver.describe_part("INBOX", str(uid), "3")
+    missing = receiver.describe_part("INBOX", str(uid), "9")
+
+    # peak memory of a full download of the 8 MB attachment
+    tracemalloc.start()
+    data, stream = download(receiver, part)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    middle, ranged = download(receiver, part, start=5_000_000, end=5_099_999)
+    tail, _ = download(receiver, part, start=len(ATTACHMENT) - 10)
+    secret, _ = download(receiver, secret_part, cipher=l1_cipher)
+    secret_range, _ = download(receiver, secret_part, start=1000, end=1999, cipher=l1_cipher)
+
+    ok = (
+        data == sha256(ATTACHMENT)
+        and middle == sha256(ATTACHMENT[5_000_000:5_100_000])
+        and tail == sha256(ATTACHMENT[-10:])
+        and secret == sha256(SECRET)
+        and secret_range == sha256(SECRET[1000:2000])
+        and missing is None
+        and secret_part["encryption"]["key_id"] == "key-1"
+        and receiver.pool.stats()["in_use"] == 0
+    )
+    print(
+        f"{name:10} size={part['size']} peak={peak / 1024 / 1024:.2f} MB "
+        f"fetches={stream.fetches} range_fetches={ranged.fetches} "
+        f"range_octets={ranged.octets_fetched} -> {ok}"
+    )
+    results.append(ok)
+
+    receiver.disconnect()
+    parent.send("stop")
+    process.join()
+
+print(all(results))
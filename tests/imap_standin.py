@@ -0,0 +1,874 @@
+"""
+Local IMAP Stand-in Server
+Minimal in-memory IMAP4rev1 server for exercising EmailReceiver against a
+real imaplib connection, including UIDPLUS, CONDSTORE, QRESYNC, IDLE and
+BINARY (when listed in its capabilities).
+
+Usage:
+    server = IMAPStandIn()
+    server.start()
+    uid = server.add_message("INBOX", raw_bytes)
+    receiver = EmailReceiver("127.0.0.1", server.port, "user", "pass", use_ssl=False)
+    ...
+    server.stop()
+
+Run directly to serve on 127.0.0.1:1143 with a few sample messages.
+"""
+import email
+import email.policy
+import re
+import select
+import socketserver
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+DEFAULT_CAPABILITIES = ("IMAP4rev1", "UIDPLUS", "ENABLE", "IDLE", "CONDSTORE", "QRESYNC")
+
+# Commands after which pending mailbox changes are not reported
+QUIET_COMMANDS = ('SELECT', 'EXAMINE', 'CLOSE', 'LOGOUT', 'IDLE')
+
+_LITERAL_AT_END = re.compile(rb'\{(\d+)\+?\}\r\n$')
+_CRLF_POLICY = email.policy.compat32.clone(linesep='\r\n')
+
+
+class _Message:
+    def __init__(self, uid: int, raw: bytes, flags: Iterable[str], modseq: int):
+        self.uid = uid
+        self.raw = raw
+        self.flags: Set[str] = set(flags)
+        self.modseq = modseq
+        self.parsed = email.message_from_bytes(raw)
+        self.sections: Dict[str, bytes] = {}  # rendered part sections, built on first use
+        try:
+            self.date = parsedate_to_datetime(self.parsed['Date'])
+        except Exception:
+            self.date = datetime.now(timezone.utc)
+
+
+class _Folder:
+    def __init__(self, name: str, uidvalidity: int):
+        self.name = name
+        self.uidvalidity = uidvalidity
+        self.uidnext = 1
+        self.highestmodseq = 1
+        self.messages: List[_Message] = []
+        self.vanished: List[tuple] = []  # (modseq, uid)
+
+    def by_uid(self, uid: int) -> Optional[_Message]:
+        for message in self.messages:
+            if message.uid == uid:
+                return message
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Wire format helpers
+# ---------------------------------------------------------------------------
+
+def _quote(text: str) -> bytes:
+    return b'"' + text.replace('\\', '\\\\').replace('"', '\\"').encode() + b'"'
+
+
+def _fmt(value) -> bytes:
+    """Serialize a nested Python value as an IMAP s-expression"""
+    if value is None:
+        return b'NIL'
+    if isinstance(value, int):
+        return str(value).encode()
+    if isinstance(value, bytes):
+        return b'{%d}\r\n' % len(value) + value
+    if isinstance(value, list):
+        return b'(' + b' '.join(_fmt(item) for item in value) + b')'
+    return _quote(str(value))
+
+
+def _tokenize(data: bytes) -> list:
+    """Parse command arguments into atoms (str), strings, literals and lists"""
+    pos = 0
+    stack = [[]]
+    while pos < len(data):
+        char = data[pos:pos + 1]
+        if char in (b' ', b'\r', b'\n'):
+            pos += 1
+        elif char == b'(':
+            stack.append([])
+            pos += 1
+        elif char == b')':
+            items = stack.pop()
+            stack[-1].append(items)
+            pos += 1
+        elif char == b'"':
+            pos += 1
+            chunks = []
+            while data[pos:pos + 1] != b'"':
+                if data[pos:pos + 1] == b'\\':
+                    pos += 1
+                chunks.append(data[pos:pos + 1])
+                pos += 1
+            pos += 1
+            stack[-1].append(b''.join(chunks).decode())
+        elif char == b'{':
+            end = data.index(b'}', pos)
+            length = int(data[pos + 1:end].rstrip(b'+'))
+            start = data.index(b'\n', end) + 1
+            stack[-1].append(data[start:start + length].decode('utf-8', errors='replace'))
+            pos = start + length
+        else:
+            start = pos
+            depth = 0
+            while pos < len(data):
+                char = data[pos:pos + 1]
+                if char == b'[':
+                    depth += 1
+                elif char == b']':
+                    depth -= 1
+                elif depth == 0 and char in (b' ', b')', b'\r', b'\n'):
+                    break
+                pos += 1
+            stack[-1].append(data[start:pos].decode())
+    return stack[0]
+
+
+def _parse_set(text: str, maximum: int) -> List[tuple]:
+    """Parse a sequence/UID set into inclusive (low, high) ranges"""
+    ranges = []
+    for part in text.split(','):
+        if ':' in part:
+            low, high = part.split(':')
+            low = maximum if low == '*' else int(low)
+            high = maximum if high == '*' else int(high)
+            ranges.append((min(low, high), max(low, high)))
+        else:
+            number = maximum if part == '*' else int(part)
+            ranges.append((number, number))
+    return ranges
+
+
+def _in_set(number: int, ranges: List[tuple]) -> bool:
+    return any(low <= number <= high for low, high in ranges)
+
+
+def _uid_set(uids: Iterable[int]) -> str:
+    numbers = sorted(uids)
+    ranges = []
+    start = prev = numbers[0]
+    for number in numbers[1:]:
+        if number != prev + 1:
+            ranges.append((start, prev))
+            start = number
+        prev = number
+    ranges.append((start, prev))
+    return ','.join(str(a) if a == b else f"{a}:{b}" for a, b in ranges)
+
+
+def _split_header(raw: bytes) -> tuple:
+    for separator in (b'\r\n\r\n', b'\n\n'):
+        index = raw.find(separator)
+        if index >= 0:
+            return raw[:index + len(separator)], raw[index + len(separator):]
+    return raw, b''
+
+
+def _part_bytes(part) -> bytes:
+    return part.as_bytes(policy=_CRLF_POLICY)
+
+
+def _bodystructure(part) -> list:
+    """Build a BODYSTRUCTURE value for an email.message part"""
+    if part.is_multipart():
+        children = [_bodystructure(child) for child in part.get_payload()]
+        return children + [part.get_content_subtype(), ["boundary", part.get_boundary() or ""], None, None, None]
+
+    main_type = part.get_content_maintype()
+    sub_type = part.get_content_subtype()
+    params = []
+    for key, value in part.get_params()[1:] if part.get_params() else []:
+        params.extend([key, value])
+    _, body = _split_header(_part_bytes(part))
+    encoding = part.get('Content-Transfer-Encoding', '7bit')
+
+    disposition = None
+    if part.get_content_disposition():
+        disposition_params = []
+        if part.get_filename():
+            disposition_params = ["filename", part.get_filename()]
+        disposition = [part.get_content_disposition(), disposition_params or None]
+
+    structure = [main_type, sub_type, params or None, part.get('Content-ID'), None, encoding, len(body)]
+    if main_type == 'text':
+        structure += [body.count(b'\n'), None, disposition, None, None]
+    elif main_type == 'message' and sub_type == 'rfc822':
+        inner = part.get_payload()[0]
+        structure += [None, _bodystructure(inner), body.count(b'\n'), None, disposition, None, None]
+    else:
+        structure += [None, disposition, None, None]
+    return structure
+
+
+def _find_part(message, numbers: List[int]):
+    """Resolve a numeric section path (e.g. [2, 1]) to an email.message part"""
+    part = message
+    for number in numbers:
+        if part.get_content_type() == 'message/rfc822':
+            part = part.get_payload()[0]
+        if part.is_multipart():
+            part = part.get_payload()[number - 1]
+        elif number != 1:
+            raise IndexError("No such part")
+    return part
+
+
+def _section_bytes(message: _Message, section: str) -> bytes:
+    """Return the bytes of a BODY[section] specification"""
+    spec = section.upper()
+    if spec == '':
+        return message.raw
+    if spec == 'HEADER':
+        return _split_header(message.raw)[0]
+    if spec == 'TEXT':
+        return _split_header(message.raw)[1]
+    if spec.startswith('HEADER.FIELDS'):
+        names = re.findall(r'[^\s()]+', section[section.index('(') + 1:])
+        names = {name.upper() for name in names}
+        exclude = spec.startswith('HEADER.FIELDS.NOT')
+        lines = []
+        for key, value in message.parsed.items():
+            if (key.upper() in names) != exclude:
+                lines.append(f"{key}: {value}\r\n".encode('utf-8', errors='replace'))
+        return b''.join(lines) + b'\r\n'
+
+    if spec not in message.sections:
+        match = re.match(r'^([\d.]+?)(?:\.(HEADER|TEXT|MIME))?$', spec)
+        if not match:
+            raise ValueError(f"Unsupported section {section}")
+        part = _find_part(message.parsed, [int(n) for n in match.group(1).split('.')])
+        header, body = _split_header(_part_bytes(part))
+        message.sections[spec] = header if match.group(2) in ('HEADER', 'MIME') else body
+    return message.sections[spec]
+
+
+def _binary_bytes(message: _Message, section: str) -> bytes:
+    """Return the content of a part with its transfer encoding removed (RFC 3516)"""
+    key = f'BINARY[{section}]'
+    if key not in message.sections:
+        part = _find_part(message.parsed, [int(n) for n in section.split('.')])
+        message.sections[key] = part.get_payload(decode=True) or b''
+    return message.sections[key]
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class IMAPStandIn:
+    """In-memory IMAP server running in a background thread"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, capabilities: Iterable[str] = DEFAULT_CAPABILITIES):
+        self.capabilities = tuple(capabilities)
+        self.folders: Dict[str, _Folder] = {}
+        self.lock = threading.Condition()
+        self.commands: List[str] = []  # command names received, e.g. "UID FETCH"
+        self.select_delays: Dict[str, float] = {}  # folder -> seconds a SELECT of it takes
+        self.command_delays: Dict[str, float] = {}  # command name, e.g. "UID FETCH" -> seconds it takes
+        self.idle_paused = False  # hold back updates to idling clients
+        self.throttle_selects = 0  # number of upcoming SELECTs refused with [LIMIT]
+        self._next_uidvalidity = int(time.time())
+        self.create_folder("INBOX")
+
+        standin = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                _Session(standin, self.rfile, self.wfile, self.connection).run()
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self._server = Server((host, port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread: Optional[threading.Thread] = None
+
+    # Mailbox manipulation (test side) ------------------------------------
+
+    def create_folder(self, name: str) -> _Folder:
+        with self.lock:
+            self._next_uidvalidity += 1
+            folder = _Folder(name, self._next_uidvalidity)
+            self.folders[name] = folder
+            return folder
+
+    def add_message(self, folder: str, raw: bytes, flags: Iterable[str] = ()) -> int:
+        with self.lock:
+            box = self.folders[folder]
+            box.highestmodseq += 1
+            message = _Message(box.uidnext, raw, flags, box.highestmodseq)
+            box.uidnext += 1
+            box.messages.append(message)
+            self.lock.notify_all()
+            return message.uid
+
+    def set_flags(self, folder: str, uid: int, flags: Iterable[str]):
+        with self.lock:
+            box = self.folders[folder]
+            box.highestmodseq += 1
+            message = box.by_uid(uid)
+            message.flags = set(flags)
+            message.modseq = box.highestmodseq
+            self.lock.notify_all()
+
+    def expunge(self, folder: str, uids: Iterable[int]):
+        with self.lock:
+            box = self.folders[folder]
+            uids = set(uids)
+            box.highestmodseq += 1
+            for uid in uids:
+                box.vanished.append((box.highestmodseq, uid))
+            box.messages = [message for message in box.messages if message.uid not in uids]
+            self.lock.notify_all()
+
+    def reset_uidvalidity(self, folder: str):
+        with self.lock:
+            self._next_uidvalidity += 1
+            self.folders[folder].uidvalidity = self._next_uidvalidity
+
+    # Lifecycle -----------------------------------------------------------
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _Session:
+    """One client connection"""
+
+    def __init__(self, standin: IMAPStandIn, rfile, wfile, sock):
+        self.standin = standin
+        self.rfile = rfile
+        self.wfile = wfile
+        self.sock = sock
+        self.folder: Optional[_Folder] = None
+        self.readonly = False
+        self.condstore = False
+        self.qresync = False
+        self.view: List[int] = []  # UIDs in sequence-number order as known by the client
+        self.known_modseq = 0
+        self.held: Optional[List[bytes]] = None  # lines collected for one write
+
+    def send(self, data: bytes):
+        if self.held is not None:
+            self.held.append(data)
+            return
+        self.wfile.write(data + b'\r\n')
+        self.wfile.flush()
+
+    def read_command(self) -> Optional[bytes]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        data = line
+        while True:
+            match = _LITERAL_AT_END.search(data)
+            if not match:
+                return data
+            if not data.rstrip().endswith(b'+}'):
+                self.send(b'+ Ready for literal')
+            data += self.rfile.read(int(match.group(1)))
+            data += self.rfile.readline()
+
+    def run(self):
+        caps = ' '.join(self.standin.capabilities)
+        self.send(f'* OK [CAPABILITY {caps}] IMAP stand-in ready'.encode())
+        while True:
+            data = self.read_command()
+            if data is None:
+                return
+            try:
+                tag, rest = data.rstrip(b'\r\n').split(b' ', 1)
+            except ValueError:
+                self.send(b'* BAD Invalid command')
+                continue
+            tag = tag.decode()
+            args = _tokenize(rest)
+            name = str(args.pop(0)).upper()
+            uid = False
+            if name == 'UID':
+                uid = True
+                name = str(args.pop(0)).upper()
+            self.standin.commands.append(('UID ' if uid else '') + name)
+
+            handler = getattr(self, 'cmd_' + name.lower(), None)
+            if handler is None:
+                self.send(f'{tag} BAD Unknown command {name}'.encode())
+                continue
+            if name in ('SELECT', 'EXAMINE') and args:
+                with self.standin.lock:
+                    throttled = self.standin.throttle_selects > 0
+                    if throttled:
+                        self.standin.throttle_selects -= 1
+                if throttled:
+                    self.send(f'{tag} NO [LIMIT] Too many commands, slow down'.encode())
+                    continue
+                # simulated server-side work, outside the lock like a real server
+                time.sleep(self.standin.select_delays.get(str(args[0]), 0.0))
+            time.sleep(self.standin.command_delays.get(('UID ' if uid else '') + name, 0.0))
+            try:
+                with self.standin.lock:
+                    result = handler(tag, args, uid) if name not in ('IDLE',) else None
+                    if result is not None and name not in QUIET_COMMANDS:
+                        # like real servers, report mailbox changes with any command response
+                        # (expunges not with FETCH/STORE/SEARCH, RFC 3501 7.4.1)
+                        self.notify(expunges=uid or name not in ('FETCH', 'STORE', 'SEARCH'))
+                if name == 'IDLE':
+                    result = self.cmd_idle(tag, args, uid)
+            except Exception as e:
+                self.send(f'{tag} BAD {type(e).__name__}: {e}'.encode())
+                continue
+            if result == 'LOGOUT':
+                return
+            if result is not None:
+                self.send(f'{tag} {result}'.encode())
+
+    # Helpers -------------------------------------------------------------
+
+    def messages(self, set_text: str, uid: bool) -> List[tuple]:
+        """Resolve a sequence/UID set to (seq, message) pairs"""
+        box = self.folder
+        current = {message.uid: message for message in box.messages}
+        if uid:
+            maximum = box.messages[-1].uid if box.messages else 0
+            ranges = _parse_set(set_text, maximum)
+            return [
+                (seq, current[u]) for seq, u in enumerate(self.view, 1)
+                if u in current and _in_set(u, ranges)
+            ]
+        ranges = _parse_set(set_text, len(self.view))
+        return [
+            (seq, current[u]) for seq, u in enumerate(self.view, 1)
+            if u in current and _in_set(seq, ranges)
+        ]
+
+    def notify(self, expunges: bool = True):
+        """Send pending EXPUNGE/VANISHED, EXISTS and flag updates"""
+        box = self.folder
+        if box is None:
+            return
+        current = {message.uid for message in box.messages}
+        gone = [u for u in self.view if u not in current]
+        if gone and expunges:
+            if self.qresync:
+                self.send(f'* VANISHED {_uid_set(gone)}'.encode())
+            else:
+                for u in reversed(gone):
+                    self.send(f'* {self.view.index(u) + 1} EXPUNGE'.encode())
+                    self.view.remove(u)
+            self.view = [u for u in self.view if u in current]
+
+        known = set(self.view)
+        messages = {message.uid: message for message in box.messages}
+        for seq, u in enumerate(self.view, 1):
+            message = messages.get(u)
+            if message is not None and message.modseq > self.known_modseq:
+                items = f'UID {message.uid} FLAGS ({" ".join(sorted(message.flags))})'
+                if self.condstore:
+                    items += f' MODSEQ ({message.modseq})'
+                self.send(f'* {seq} FETCH ({items})'.encode())
+
+        new = [message.uid for message in box.messages if message.uid not in known]
+        if new:
+            self.view.extend(new)
+            self.send(f'* {len(self.view)} EXISTS'.encode())
+        self.known_modseq = box.highestmodseq
+
+    # Commands ------------------------------------------------------------
+
+    def cmd_capability(self, tag, args, uid):
+        self.send(f'* CAPABILITY {" ".join(self.standin.capabilities)}'.encode())
+        return 'OK CAPABILITY completed'
+
+    def cmd_login(self, tag, args, uid):
+        return 'OK LOGIN completed'
+
+    def cmd_logout(self, tag, args, uid):
+        self.send(b'* BYE Logging out')
+        self.send(f'{tag} OK LOGOUT completed'.encode())
+        return 'LOGOUT'
+
+    def cmd_noop(self, tag, args, uid):
+        self.notify()
+        return 'OK NOOP completed'
+
+    cmd_check = cmd_noop
+
+    def cmd_enable(self, tag, args, uid):
+        enabled = []
+        for capability in args:
+            capability = str(capability).upper()
+            if capability in self.standin.capabilities:
+                enabled.append(capability)
+                if capability == 'QRESYNC':
+                    self.qresync = self.condstore = True
+                if capability == 'CONDSTORE':
+                    self.condstore = True
+        self.send(f'* ENABLED {" ".join(enabled)}'.encode())
+        return 'OK ENABLE completed'
+
+    def cmd_list(self, tag, args, uid):
+        for name in self.standin.folders:
+            self.send(f'* LIST (\\HasNoChildren) "/" "{name}"'.encode())
+        return 'OK LIST completed'
+
+    def cmd_status(self, tag, args, uid):
+        box = self.standin.folders.get(str(args[0]))
+        if box is None:
+            return 'NO No such mailbox'
+        values = {
+            'MESSAGES': len(box.messages),
+            'UIDNEXT': box.uidnext,
+            'UIDVALIDITY': box.uidvalidity,
+            'UNSEEN': sum(1 for m in box.messages if '\\Seen' not in m.flags),
+            'HIGHESTMODSEQ': box.highestmodseq
+        }
+        items = ' '.join(f'{item} {values[str(item).upper()]}' for item in args[1])
+        self.send(f'* STATUS {_quote(box.name).decode()} ({items})'.encode())
+        return 'OK STATUS completed'
+
+    def cmd_select(self, tag, args, uid, readonly=False):
+        box = self.standin.folders.get(str(args[0]))
+        if box is None:
+            self.folder = None
+            return 'NO No such mailbox'
+        self.folder = box
+        self.readonly = readonly
+
+        qresync_params = None
+        for modifier in args[1] if len(args) > 1 else []:
+            if isinstance(modifier, str) and modifier.upper() == 'CONDSTORE':
+                self.condstore = True
+            elif isinstance(modifier, list):
+                qresync_params = modifier
+            elif isinstance(modifier, str) and modifier.upper() == 'QRESYNC':
+                continue
+        if qresync_params is not None and not self.qresync:
+            return 'BAD QRESYNC not enabled'
+
+        self.view = [message.uid for message in box.messages]
+        self.known_modseq = box.highestmodseq
+        self.send(b'* FLAGS (\\Answered \\Flagged \\Deleted \\Seen \\Draft)')
+        self.send(f'* {len(box.messages)} EXISTS'.encode())
+        self.send(b'* 0 RECENT')
+        self.send(f'* OK [UIDVALIDITY {box.uidvalidity}] UIDs valid'.encode())
+        self.send(f'* OK [UIDNEXT {box.uidnext}] Predicted next UID'.encode())
+        if 'CONDSTORE' in self.standin.capabilities:
+            self.send(f'* OK [HIGHESTMODSEQ {box.highestmodseq}] Highest'.encode())
+
+        if qresync_params is not None and int(qresync_params[0]) == box.uidvalidity:
+            since = int(qresync_params[1])
+            known = _parse_set(str(qresync_params[2]), box.uidnext) if len(qresync_params) > 2 else None
+            vanished = [
+                u for modseq, u in box.vanished
+                if modseq > since and (known is None or _in_set(u, known))
+            ]
+            if vanished:
+                self.send(f'* VANISHED (EARLIER) {_uid_set(set(vanished))}'.encode())
+            for seq, message in enumerate(box.messages, 1):
+                if message.modseq > since:
+                    flags = ' '.join(sorted(message.flags))
+                    self.send(f'* {seq} FETCH (UID {message.uid} FLAGS ({flags}) MODSEQ ({message.modseq}))'.encode())
+
+        return f'OK [{"READ-ONLY" if readonly else "READ-WRITE"}] {"EXAMINE" if readonly else "SELECT"} completed'
+
+    def cmd_examine(self, tag, args, uid):
+        return self.cmd_select(tag, args, uid, readonly=True)
+
+    def cmd_close(self, tag, args, uid):
+        self.folder = None
+        return 'OK CLOSE completed'
+
+    def cmd_search(self, tag, args, uid):
+        if self.folder is None:
+            return 'BAD No mailbox selected'
+        if args and str(args[0]).upper() == 'CHARSET':
+            args = args[2:]
+        matches = []
+        for seq, message in self.messages('1:*', False) if self.view else []:
+            if self.match(args, seq, message):
+                matches.append(message.uid if uid else seq)
+        self.send(('* SEARCH ' + ' '.join(str(n) for n in matches)).strip().encode())
+        return 'OK SEARCH completed'
+
+    def match(self, criteria: list, seq: int, message: _Message) -> bool:
+        queue = list(criteria)
+        while queue:
+            if not self._match_one(queue, seq, message):
+                return False
+        return True
+
+    def _match_one(self, queue: list, seq: int, message: _Message) -> bool:
+        key = queue.pop(0)
+        if isinstance(key, list):
+            return self.match(key, seq, message)
+        key_upper = key.upper()
+        flag_keys = {
+            'SEEN': '\\Seen', 'ANSWERED': '\\Answered', 'FLAGGED': '\\Flagged',
+            'DELETED': '\\Deleted', 'DRAFT': '\\Draft'
+        }
+        if key_upper == 'ALL':
+            return True
+        if key_upper in flag_keys:
+            return flag_keys[key_upper] in message.flags
+        if key_upper.startswith('UN') and key_upper[2:] in flag_keys:
+            return flag_keys[key_upper[2:]] not in message.flags
+        if key_upper == 'KEYWORD':
+            return queue.pop(0) in message.flags
+        if key_upper == 'UNKEYWORD':
+            return queue.pop(0) not in message.flags
+        if key_upper == 'NOT':
+            return not self._match_one(queue, seq, message)
+        if key_upper == 'OR':
+            first = self._match_one(queue, seq, message)
+            second = self._match_one(queue, seq, message)
+            return first or second
+        if key_upper in ('FROM', 'TO', 'CC', 'BCC', 'SUBJECT'):
+            value = str(message.parsed.get(key_upper.capitalize(), ''))
+            return str(queue.pop(0)).lower() in value.lower()
+        if key_upper == 'HEADER':
+            name, needle = str(queue.pop(0)), str(queue.pop(0))
+            value = message.parsed.get(name)
+            return value is not None and needle.lower() in str(value).lower()
+        if key_upper in ('BODY', 'TEXT'):
+            needle = str(queue.pop(0)).lower().encode()
+            haystack = message.raw if key_upper == 'TEXT' else _split_header(message.raw)[1]
+            return needle in haystack.lower()
+        if key_upper in ('LARGER', 'SMALLER'):
+            size = int(queue.pop(0))
+            return len(message.raw) > size if key_upper == 'LARGER' else len(message.raw) < size
+        if key_upper in ('SINCE', 'BEFORE', 'ON', 'SENTSINCE', 'SENTBEFORE', 'SENTON'):
+            day = datetime.strptime(str(queue.pop(0)), '%d-%b-%Y').date()
+            message_day = message.date.date()
+            op = key_upper.replace('SENT', '')
+            if op == 'SINCE':
+                return message_day >= day
+            if op == 'BEFORE':
+                return message_day < day
+            return message_day == day
+        if key_upper == 'UID':
+            maximum = self.folder.messages[-1].uid if self.folder.messages else 0
+            return _in_set(message.uid, _parse_set(str(queue.pop(0)), maximum))
+        if key_upper == 'MODSEQ':
+            return message.modseq >= int(queue.pop(0))
+        if re.match(r'^[\d*:,]+$', key):
+            return _in_set(seq, _parse_set(key, len(self.view)))
+        raise ValueError(f"Unsupported search key {key}")
+
+    def cmd_fetch(self, tag, args, uid):
+        if self.folder is None:
+            return 'BAD No mailbox selected'
+        set_text, items = str(args[0]), args[1]
+        if not isinstance(items, list):
+            items = [items]
+        macros = {
+            'ALL': ['FLAGS', 'INTERNALDATE', 'RFC822.SIZE'],
+            'FAST': ['FLAGS', 'INTERNALDATE', 'RFC822.SIZE'],
+            'FULL': ['FLAGS', 'INTERNALDATE', 'RFC822.SIZE', 'BODY']
+        }
+        if len(items) == 1 and str(items[0]).upper() in macros:
+            items = macros[str(items[0]).upper()]
+        items = [str(item) for item in items]
+
+        changed_since = None
+        vanished = False
+        if len(args) > 2:
+            modifiers = args[2]
+            for index, modifier in enumerate(modifiers):
+                if str(modifier).upper() == 'CHANGEDSINCE':
+                    changed_since = int(modifiers[index + 1])
+                    self.condstore = True
+                if str(modifier).upper() == 'VANISHED':
+                    if not (uid and self.qresync):
+                        return 'BAD VANISHED requires UID FETCH and QRESYNC'
+                    vanished = True
+
+        if uid and 'UID' not in [item.upper() for item in items]:
+            items = ['UID'] + items
+        if changed_since is not None and 'MODSEQ' not in [item.upper() for item in items]:
+            items.append('MODSEQ')
+
+        targets = self.messages(set_text, uid)
+
+        if vanished:
+            maximum = self.folder.uidnext
+            ranges = _parse_set(set_text, maximum)
+            gone = {u for modseq, u in self.folder.vanished if modseq > changed_since and _in_set(u, ranges)}
+            if gone:
+                self.send(f'* VANISHED (EARLIER) {_uid_set(gone)}'.encode())
+
+        for seq, message in targets:
+            if changed_since is not None and message.modseq <= changed_since:
+                continue
+            parts = []
+            for item in items:
+                parts.append(self.fetch_item(message, item))
+            self.send(b'* %d FETCH (' % seq + b' '.join(parts) + b')')
+        return 'OK FETCH completed'
+
+    def fetch_item(self, message: _Message, item: str) -> bytes:
+        upper = item.upper()
+        if upper == 'UID':
+            return b'UID %d' % message.uid
+        if upper == 'FLAGS':
+            return b'FLAGS (' + ' '.join(sorted(message.flags)).encode() + b')'
+        if upper == 'RFC822.SIZE':
+            return b'RFC822.SIZE %d' % len(message.raw)
+        if upper == 'INTERNALDATE':
+            return b'INTERNALDATE ' + _quote(message.date.strftime('%d-%b-%Y %H:%M:%S %z'))
+        if upper == 'MODSEQ':
+            return b'MODSEQ (%d)' % message.modseq
+        if upper in ('BODYSTRUCTURE', 'BODY'):
+            return upper.encode() + b' ' + _fmt(_bodystructure(message.parsed))
+        if upper == 'RFC822':
+            self.mark_seen(message)
+            return b'RFC822 ' + _fmt(message.raw)
+        if upper == 'RFC822.HEADER':
+            return b'RFC822.HEADER ' + _fmt(_split_header(message.raw)[0])
+        if upper == 'RFC822.TEXT':
+            self.mark_seen(message)
+            return b'RFC822.TEXT ' + _fmt(_split_header(message.raw)[1])
+
+        if 'BINARY' in self.standin.capabilities:
+            match = re.match(r'^BINARY\.SIZE\[([\d.]+)\]$', item, re.IGNORECASE)
+            if match:
+                return f'BINARY.SIZE[{match.group(1)}] '.encode() + b'%d' % len(_binary_bytes(message, match.group(1)))
+            match = re.match(r'^BINARY(\.PEEK)?\[([\d.]+)\](?:<(\d+)\.(\d+)>)?$', item, re.IGNORECASE)
+            if match:
+                if not match.group(1):
+                    self.mark_seen(message)
+                data = _binary_bytes(message, match.group(2))
+                key = f'BINARY[{match.group(2)}]'
+                if match.group(3) is not None:
+                    origin, length = int(match.group(3)), int(match.group(4))
+                    data = data[origin:origin + length]
+                    key += f'<{origin}>'
+                return key.encode() + b' ~' + _fmt(data)
+
+        match = re.match(r'^BODY(\.PEEK)?\[(.*)\](?:<(\d+)\.(\d+)>)?$', item, re.IGNORECASE | re.DOTALL)
+        if not match:
+            raise ValueError(f"Unsupported fetch item {item}")
+        if not match.group(1):
+            self.mark_seen(message)
+        section = match.group(2)
+        data = _section_bytes(message, section)
+        key = f'BODY[{section}]'
+        if match.group(3) is not None:
+            origin, length = int(match.group(3)), int(match.group(4))
+            data = data[origin:origin + length]
+            key += f'<{origin}>'
+        return key.encode() + b' ' + _fmt(data)
+
+    def mark_seen(self, message: _Message):
+        if self.readonly or '\\Seen' in message.flags:
+            return
+        message.flags.add('\\Seen')
+        self.folder.highestmodseq += 1
+        message.modseq = self.folder.highestmodseq
+
+    def cmd_store(self, tag, args, uid):
+        if self.folder is None:
+            return 'BAD No mailbox selected'
+        set_text = str(args.pop(0))
+        unchanged_since = None
+        if isinstance(args[0], list):
+            modifiers = args.pop(0)
+            unchanged_since = int(modifiers[1])
+        action = str(args[0]).upper()
+        flags = args[1] if isinstance(args[1], list) else args[1:]
+        flags = {str(flag) for flag in flags}
+        silent = action.endswith('.SILENT')
+        action = action.replace('.SILENT', '')
+
+        modified = []
+        for seq, message in self.messages(set_text, uid):
+            if unchanged_since is not None and message.modseq > unchanged_since:
+                modified.append(message.uid if uid else seq)
+                continue
+            if action == '+FLAGS':
+                message.flags |= flags
+            elif action == '-FLAGS':
+                message.flags -= flags
+            else:
+                message.flags = set(flags)
+            self.folder.highestmodseq += 1
+            message.modseq = self.folder.highestmodseq
+            if not silent:
+                items = f'FLAGS ({" ".join(sorted(message.flags))})'
+                if uid:
+                    items = f'UID {message.uid} ' + items
+                if self.condstore:
+                    items += f' MODSEQ ({message.modseq})'
+                self.send(f'* {seq} FETCH ({items})'.encode())
+        self.known_modseq = self.folder.highestmodseq
+        if modified:
+            return f'OK [MODIFIED {_uid_set(modified)}] Conditional STORE failed for some'
+        return 'OK STORE completed'
+
+    def cmd_expunge(self, tag, args, uid):
+        if self.folder is None:
+            return 'BAD No mailbox selected'
+        box = self.folder
+        ranges = _parse_set(str(args[0]), box.uidnext) if uid and args else None
+        doomed = [
+            message.uid for message in box.messages
+            if '\\Deleted' in message.flags and (ranges is None or _in_set(message.uid, ranges))
+        ]
+        if doomed:
+            box.highestmodseq += 1
+            for u in doomed:
+                box.vanished.append((box.highestmodseq, u))
+            box.messages = [message for message in box.messages if message.uid not in doomed]
+        self.notify()
+        return 'OK EXPUNGE completed'
+
+    def cmd_idle(self, tag, args, uid):
+        # the continuation and pending changes go out in one write, so the
+        # client reads them together
+        self.held = [b'+ idling']
+        with self.standin.lock:
+            if not self.standin.idle_paused:
+                self.notify()
+        held, self.held = self.held, None
+        self.send(b'\r\n'.join(held))
+        while True:
+            readable, _, _ = select.select([self.sock], [], [], 0.05)
+            if readable:
+                line = self.rfile.readline()
+                if not line or line.strip().upper() == b'DONE':
+                    break
+            with self.standin.lock:
+                self.standin.lock.wait(0.05)
+                if not self.standin.idle_paused:
+                    self.notify()
+        return 'OK IDLE terminated'
+
+
+if __name__ == '__main__':
+    server = IMAPStandIn(port=1143)
+    for number in range(1, 4):
+        server.add_message("INBOX", (
+            f"From: Alice <alice@example.com>\r\nTo: bob@example.com\r\n"
+            f"Subject: Sample {number}\r\nDate: Mon, 10 Feb 2026 14:35:2{number} +0000\r\n\r\n"
+            f"Hello {number}\r\n"
+        ).encode())
+    server.start()
+    print(f"IMAP stand-in listening on 127.0.0.1:{server.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,119 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# keep the message store in memory for this run
+os.environ["MESSAGE_STORE_PATH"] = ":memory:"
+
+from imap_standin import IMAPStandIn, DEFAULT_CAPABILITIES
+from email_receiver import EmailReceiver
+from config import config
+from message_store import message_store
+
+SCENARIOS = [
+    ("QRESYNC", DEFAULT_CAPABILITIES),
+    ("CONDSTORE only", ("IMAP4rev1", "UIDPLUS", "ENABLE", "IDLE", "CONDSTORE")),
+    ("no extensions", ("IMAP4rev1", "UIDPLUS", "IDLE")),
+]
+
+def make_message(number):
+
+    return (
+        f"From: Alice <alice@example.com>\r\nTo: bob@example.com\r\n"
+        f"Subject: Message {number}\r\nDate: Mon, 10 Feb 2026 14:35:22 +0000\r\n"
+        f"Message-ID: <{number}@example.com>\r\n\r\nHello {number}\r\n"
+    ).encode()
+
+def refresh(server, receiver):
+
+    # returns the IMAP commands one /fetch (headers only) costs
+    start = len(server.commands)
+    receiver.fetch_email_summaries("INBOX", limit=50)
+    return server.commands[start:]
+
+def cache_matches_server(server, receiver):
+
+    folder = server.folders["INBOX"]
+    expected = {message.uid: sorted(message.flags) for message in folder.messages}
+    cached = message_store.get_messages(receiver.username, "INBOX", expected)
+    return (
+        message_store.uids(receiver.username, "INBOX") == sorted(expected)
+        and all(sorted(cached[uid]["flags"]) == flags for uid, flags in expected.items())
+    )
+
+results = []
+for name, capabilities in SCENARIOS:
+
+    server = IMAPStandIn(capabilities=capabilities)
+    server.start()
+    for number in range(1, 31):
+        server.add_message("INBOX", make_message(number))
+
+    receiver = EmailReceiver("127.0.0.1", server.port, name, "secret", use_ssl=False)
+    receiver.connect()
+    receiver.flag_sync_interval = 3600  # no periodic diff during the test
+
+    refresh(server, receiver)
+    warm = refresh(server, receiver)
+
+    # changes made by another client
+    server.set_flags("INBOX", 3, ["\\Seen", "\\Flagged"])
+    server.expunge("INBOX", [5, 6])
+    server.add_message("INBOX", make_message(31))
+    changed = refresh(server, receiver)
+    ok = warm == ["SELECT"] and cache_matches_server(server, receiver)
+
+    # a flag change alone leaves UIDNEXT and the message count untouched
+    server.set_flags("INBOX", 20, ["\\Seen"])
+    if name == "no extensions":
+        receiver.flag_sync_interval = 0  # only the periodic UID/flags diff sees it
+    flags_only = refresh(server, receiver)
+    ok = ok and cache_matches_server(server, receiver)
+
+    print(f"{name:16} warm={warm} changed={changed} flags_only={flags_only} -> {ok}")
+    results.append(ok)
+
+    receiver.disconnect()
+    server.stop()
+
+# a cold /fetch downloads bodies for the requested page only
+server = IMAPStandIn()
+server.start()
+for number in range(1, 41):
+    server.add_message("INBOX", make_message(number))
+receiver = EmailReceiver("127.0.0.1", server.port, "cold", "secret", use_ssl=False)
+receiver.connect()
+emails = receiver.fetch_emails("INBOX", limit=10)
+stored = message_store.get_messages("cold", "INBOX", list(range(1, 41)))
+bodies = sum(1 for email_data in stored.values() if email_data.get("body") is not None)
+ok = len(emails) == 10 and all(email_data["body"] for email_data in emails) and len(stored) == 40 and bodies == 10
+print(f"cold fetch       emails={len(emails)} summaries={len(stored)} bodies={bodies} -> {ok}")
+results.append(ok)
+
+# with the in-memory cache off, stored bodies are still served without IMAP
+config.MESSAGE_CACHE_ENABLED = False
+start = len(server.commands)
+found = receiver.get_emails_by_ids("INBOX", [email_data["id"] for email_data in emails])
+ok = len(found) == 10 and server.commands[start:] == []
+print(f"cache disabled   commands={server.commands[start:]} -> {ok}")
+results.append(ok)
+config.MESSAGE_CACHE_ENABLED = True
+
+# IDs are UIDs: anything non-numeric is skipped instead of raising
+found = receiver.get_emails_by_ids("INBOX", ["abc", emails[0]["id"]])
+ok = list(found) == [emails[0]["id"]] and receiver.describe_part("INBOX", "abc", "1") is None
+print(f"invalid IDs      found={list(found)} -> {ok}")
+results.append(ok)
+
+# with the server gone, locally available messages are still returned
+receiver.disconnect()
+server.stop()
+found = receiver.get_emails_by_ids("INBOX", [email_data["id"] for email_data in emails] + ["1"])
+ok = sorted(found) == sorted(email_data["id"] for email_data in emails)
+print(f"server down      found={len(found)} of 11 -> {ok}")
+results.append(ok)
+
+print(all(results))
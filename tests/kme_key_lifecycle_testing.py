@@ -0,0 +1,79 @@
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "qkd-simulator"))
+
+import store_keys
+from store_keys import KeyStore, generate_key
+
+directory = Path(tempfile.mkdtemp())
+
+# start from empty databases, without importing a legacy JSON store
+store_keys.KEY_STORE_FILE = directory / "qkd_keys.json"
+
+async def issue(store, number):
+
+    keys = [generate_key(256) for _ in range(number)]
+    await store.add("RECEIVER_SAE", keys)
+    return [key_id for key_id, _ in keys]
+
+async def main():
+
+    results = []
+
+    # keys are deleted after their last allowed retrieval
+    store = KeyStore(directory / "limited.db", max_retrievals=2)
+    store.open()
+    key_id, = await issue(store, 1)
+    found = [await store.retrieve([key_id]) for _ in range(3)]
+    ok = [len(f) for f in found] == [1, 1, 0] and len(store) == 0 and store.stats()["evicted_retrieved"] == 1
+    print(f"max 2 retrievals -> {[len(f) for f in found]} {store.stats()} -> {ok}")
+    results.append(ok)
+    store.close()
+
+    # delete-on-first-retrieve mode
+    store = KeyStore(directory / "once.db", delete_on_retrieve=True)
+    store.open()
+    key_ids = await issue(store, 3)
+    first = await store.retrieve(key_ids[:2])
+    second = await store.retrieve(key_ids)
+    ok = len(first) == 2 and list(second) == [key_ids[2]] and len(store) == 0
+    print(f"delete on retrieve -> {len(first)} then {list(second) == [key_ids[2]]} -> {ok}")
+    results.append(ok)
+    store.close()
+
+    # expired keys: refused on retrieval and reaped in small batches in the background
+    store = KeyStore(directory / "ttl.db", ttl=0.5, reaper_interval=0.1, reaper_batch=200)
+    store.open()
+    old = []
+    for _ in range(20):
+        old.extend(await issue(store, 100))
+    await asyncio.sleep(0.5)
+    expired = await store.retrieve(old[:1])
+
+    # requests keep being served while the reaper works through the backlog
+    slowest = 0.0
+    fresh = []
+    while store.stats()["evicted_expired"] < len(old):
+        start = time.perf_counter()
+        fresh.extend(await issue(store, 10))
+        slowest = max(slowest, time.perf_counter() - start)
+        await asyncio.sleep(0.005)
+    stats = store.stats()
+    ok = (
+        expired == {}
+        and stats["evicted_expired"] == len(old)
+        and len(store) == len(fresh)
+        and stats["reaper_runs"] >= 1
+        and slowest < 0.1
+    )
+    print(f"ttl -> {stats}, slowest enc_keys {slowest * 1000:.1f} ms -> {ok}")
+    results.append(ok)
+    store.close()
+
+    print(all(results))
+
+asyncio.run(main())
@@ -0,0 +1,72 @@
+import asyncio
+import base64
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "qkd-simulator"))
+
+from store_keys import generate_key, generate_keys
+from key_pool import KeyPool
+
+REQUESTS = 20000
+
+results = []
+
+# bulk generation: right sizes, valid and unique key IDs
+keys = generate_keys(512, 1000)
+ok = (
+    all(len(base64.b64decode(key)) == 64 for _, key in keys)
+    and all(uuid.UUID(key_id).version == 4 for key_id, _ in keys)
+    and len({key_id for key_id, _ in keys}) == len({key for _, key in keys}) == 1000
+)
+print(f"generate_keys(512, 1000) -> {ok}")
+results.append(ok)
+
+# requests pop from the pool; overflow and other sizes are generated inline
+pool = KeyPool(sizes=[256], capacity=50, refill_batch=20)
+pool.fill()
+first = pool.take(256, 10)
+rest = pool.take(256, 45)
+odd = pool.take(384, 2)
+issued = first + rest
+ok = (
+    len(issued) == 55 and len({key_id for key_id, _ in issued}) == 55
+    and pool.hits == 50 and pool.misses == 7
+    and all(len(base64.b64decode(key)) == 48 for _, key in odd)
+)
+print(f"take -> hits={pool.hits} misses={pool.misses} -> {ok}")
+results.append(ok)
+
+# the producer tops the pool up in the background
+async def refill():
+
+    pool.start()
+    await asyncio.sleep(0.05)
+    available = pool.stats()["available"]["256"]
+    await pool.close()
+    return available
+
+available = asyncio.run(refill())
+ok = available == 50
+print(f"refilled to {available} -> {ok}")
+results.append(ok)
+
+# number=10 requests: per-key generation versus popping from a filled pool
+start = time.perf_counter()
+for _ in range(REQUESTS):
+    [generate_key(256) for _ in range(10)]
+inline = REQUESTS / (time.perf_counter() - start)
+
+pool = KeyPool(sizes=[256], capacity=REQUESTS * 10)
+pool.fill()
+start = time.perf_counter()
+for _ in range(REQUESTS):
+    pool.take(256, 10)
+pooled = REQUESTS / (time.perf_counter() - start)
+ok = pooled > inline * 3 and pool.misses == 0
+print(f"number=10: {inline:.0f} req/s inline, {pooled:.0f} req/s from the pool ({pooled / inline:.1f}x) -> {ok}")
+results.append(ok)
+
+print(all(results))
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "qkd-simulator"))
+
+import store_keys
+from store_keys import KeyStore, generate_key
+
+directory = Path(tempfile.mkdtemp())
+
+async def issue(store, number):
+
+    keys = [generate_key(256) for _ in range(number)]
+    await store.add("RECEIVER_SAE", keys)
+    return keys
+
+async def timed_requests(store, requests):
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await issue(store, 10)
+    return (time.perf_counter() - start) / requests
+
+async def main():
+
+    results = []
+
+    # legacy JSON keys are imported into a new database
+    legacy = {"legacy-1": {"key": "AAAA", "slave_sae": "RECEIVER_SAE", "used_count": 2}}
+    store_keys.KEY_STORE_FILE = directory / "qkd_keys.json"
+    store_keys.KEY_STORE_FILE.write_text(json.dumps(legacy))
+
+    store = KeyStore(directory / "keys.db")
+    store.open()
+    found = await store.retrieve(["legacy-1", "missing"])
+    ok = len(store) == 1 and found == {"legacy-1": {"key": "AAAA", "slave_sae": "RECEIVER_SAE", "used_count": 3}}
+    print(f"imported legacy keys {found} -> {ok}")
+    results.append(ok)
+
+    # concurrent requests share commits
+    commits = store.commits
+    batches = await asyncio.gather(*(issue(store, 10) for _ in range(200)))
+    commits = store.commits - commits
+    ok = len(store) == 2001 and commits < 50
+    print(f"200 concurrent enc_keys requests -> {commits} commit(s) -> {ok}")
+    results.append(ok)
+
+    # per-request cost does not grow with the number of keys issued
+    early = await timed_requests(store, 50)
+    for _ in range(40):
+        await asyncio.gather(*(issue(store, 50) for _ in range(25)))
+    late = await timed_requests(store, 50)
+    ok = late < early * 3
+    print(f"enc_keys at {2001} keys {early * 1000:.2f} ms, at {len(store)} keys {late * 1000:.2f} ms -> {ok}")
+    results.append(ok)
+
+    # retrieval counts survive a restart, which only opens the database
+    key_id, key = batches[0][0]
+    await store.retrieve([key_id])
+    count = len(store)
+    store.close()
+
+    start = time.perf_counter()
+    store = KeyStore(directory / "keys.db")
+    store.open()
+    opened = time.perf_counter() - start
+    found = await store.retrieve([key_id])
+    ok = len(store) == count and found[key_id] == {"key": key, "slave_sae": "RECEIVER_SAE", "used_count": 2}
+    print(f"reopened {len(store)} keys in {opened * 1000:.1f} ms, {found[key_id]['used_count']} retrievals -> {ok}")
+    results.append(ok)
+    store.close()
+
+    print(all(results))
+
+asyncio.run(main())
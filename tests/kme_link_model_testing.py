@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "qkd-simulator"))
+
+from link_model import LinkModel, LinkRegistry, LinkExhausted, parse_schedule
+
+
+class Clock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+results = []
+
+# the buffer refills at the link rate and never beyond its capacity
+clock = Clock()
+link = LinkModel(rate=1000, capacity=2560, mode="reject", clock=clock)
+granted = asyncio.run(link.acquire_keys(10, 256))
+try:
+    asyncio.run(link.acquire_keys(1, 256))
+    rejected = None
+except LinkExhausted as e:
+    rejected = e.retry_after
+clock.now = 1.0
+level = link.level()
+clock.now = 100.0
+ok = granted == 10 and rejected is not None and abs(rejected - 0.256) < 1e-6 and level == 1000 and link.level() == 2560
+print(f"reject -> granted={granted} retry_after={rejected} level={level} -> {ok}")
+results.append(ok)
+
+# partial mode hands out what the buffer holds, then refuses an empty buffer
+clock = Clock()
+link = LinkModel(rate=1000, capacity=2560, mode="partial", clock=clock)
+first = asyncio.run(link.acquire_keys(15, 256))
+try:
+    asyncio.run(link.acquire_keys(1, 256))
+    empty = False
+except LinkExhausted:
+    empty = True
+ok = first == 10 and empty and link.partials == 1 and link.rejections == 1
+print(f"partial -> granted={first} empty_rejected={empty} -> {ok}")
+results.append(ok)
+
+# downtime and noise: nothing is distilled while down, half while noisy
+clock = Clock()
+link = LinkModel(rate=1000, capacity=10000, schedule=parse_schedule("2:1,1:0.5,1:0"), mode="reject", clock=clock)
+asyncio.run(link.acquire_keys(1, 10000))
+clock.now = 3.5
+mid = link.level()
+eta = link.eta(3500)
+clock.now = 4.0
+cycle = link.level()
+states = []
+for now in (0.5, 2.5, 3.5):
+    clock.now = now + 4.0
+    states.append(link.stats()["state"])
+ok = (
+    abs(mid - 2500) < 1e-6 and abs(cycle - 2500) < 1e-6
+    and states == ["up", "degraded", "down"] and abs(eta - 1.5) < 1e-6
+)
+print(f"schedule -> level={mid:.0f}/{cycle:.0f} states={states} eta={eta} -> {ok}")
+results.append(ok)
+
+# block mode waits, first come first served, and gives up after max_wait
+async def blocking():
+    link = LinkModel(rate=25600, capacity=2560, mode="block", max_wait=0.5)
+    await link.acquire_keys(10, 256)
+    start = time.monotonic()
+    order = []
+
+    async def request(name, count):
+        await link.acquire_keys(count, 256)
+        order.append((name, time.monotonic() - start))
+
+    await asyncio.gather(request("a", 5), request("b", 5))
+    down = LinkModel(rate=25600, capacity=2560, schedule=[(10.0, 0.0)], mode="block", max_wait=0.2)
+    await down.acquire_keys(10, 256)
+    try:
+        await down.acquire_keys(1, 256)
+        refused = False
+    except LinkExhausted as e:
+        refused = e.retry_after is None
+    return link, order, refused
+
+link, order, refused = asyncio.run(blocking())
+ok = (
+    [name for name, _ in order] == ["a", "b"]
+    and 0.04 <= order[0][1] < 0.2 and 0.09 <= order[1][1] < 0.3
+    and link.waits == 2 and refused
+)
+print(f"block -> order={[(name, round(t, 3)) for name, t in order]} refused_while_down={refused} -> {ok}")
+results.append(ok)
+
+# per-SAE configuration; SAEs without a rate keep unlimited keys
+registry = LinkRegistry({"LIMITED_SAE": {"rate": 5000, "capacity": 4096, "mode": "partial"}})
+limited = registry.get("LIMITED_SAE")
+ok = (
+    limited is not None and limited is registry.get("LIMITED_SAE")
+    and limited.mode == "partial" and limited.stats()["buffer_keys"] == 16
+    and registry.get("OTHER_SAE") is None
+)
+print(f"registry -> {ok}")
+results.append(ok)
+
+print(all(results))
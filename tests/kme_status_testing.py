@@ -0,0 +1,67 @@
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "qkd-simulator"))
+
+import store_keys
+from store_keys import KeyStore, generate_key
+from metrics import RateWindow, LatencyRecorder, KMEMetrics
+
+directory = Path(tempfile.mkdtemp())
+store_keys.KEY_STORE_FILE = directory / "qkd_keys.json"
+
+results = []
+
+# sliding-window rates
+window = RateWindow(span=300)
+for second in range(1000, 1300):
+    window.add(10 if second >= 1290 else 1, now=second)
+rates = (window.rate(10, now=1299), window.rate(60, now=1299), window.rate(300, now=1299), window.rate(10, now=1600))
+ok = rates == (10.0, 150 / 60, 390 / 300, 0.0)
+print(f"rates {rates} -> {ok}")
+results.append(ok)
+
+# latency percentiles over the most recent calls
+recorder = LatencyRecorder(samples=100)
+for milliseconds in range(1000, 0, -1):
+    recorder.record(milliseconds / 1000)
+percentiles = recorder.percentiles()
+ok = percentiles == {"p50": 50.0, "p90": 90.0, "p99": 99.0} and recorder.calls == 1000
+print(f"latency {percentiles} -> {ok}")
+results.append(ok)
+
+metrics = KMEMetrics()
+metrics.record_issued("RECEIVER_SAE", 5)
+metrics.record_latency("enc_keys", 0.002)
+snapshot = metrics.snapshot("RECEIVER_SAE")
+ok = snapshot["issue_rate"]["10s"] == 0.5 and snapshot["retrieve_rate"]["60s"] == 0.0 and snapshot["latency_ms"]["enc_keys"]["p50"] == 2.0
+print(f"snapshot {snapshot} -> {ok}")
+results.append(ok)
+
+# per-SAE key counts and bytes stay equal to a full recount
+async def main():
+
+    store = KeyStore(directory / "keys.db", max_retrievals=1)
+    store.open()
+    bob = [generate_key(256) for _ in range(30)]
+    carol = [generate_key(512) for _ in range(7)]
+    await store.add("BOB_SAE", bob)
+    await store.add("CAROL_SAE", carol)
+    await store.retrieve([key_id for key_id, _ in bob[:10]])
+    live = (store.sae_stats("BOB_SAE"), store.sae_stats("CAROL_SAE"), len(store), store.stats()["bytes"])
+    store.close()
+
+    store = KeyStore(directory / "keys.db")
+    store.open()
+    recount = (store.sae_stats("BOB_SAE"), store.sae_stats("CAROL_SAE"), len(store), store.stats()["bytes"])
+    store.close()
+    return live, recount
+
+live, recount = asyncio.run(main())
+ok = live == recount and live[0] == {"keys": 20, "bytes": 640} and live[1] == {"keys": 7, "bytes": 448}
+print(f"stored {live} (recount {recount}) -> {ok}")
+results.append(ok)
+
+print(all(results))
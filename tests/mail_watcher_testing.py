@@ -0,0 +1,120 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# keep the message store in memory for this run
+os.environ["MESSAGE_STORE_PATH"] = ":memory:"
+os.environ["IMAP_USE_SSL"] = "false"
+
+from imap_standin import IMAPStandIn
+from config import config
+from email_receiver import EmailReceiver
+from mail_watcher import MailWatcher
+
+RENEW_INTERVAL = 30.0  # an update IDLE misses would stay unseen this long
+
+def make_message(number):
+
+    return (
+        f"From: Alice <alice@example.com>\r\nTo: bob@example.com\r\n"
+        f"Subject: Message {number}\r\nDate: Mon, 10 Feb 2026 14:35:22 +0000\r\n"
+        f"Message-ID: <{number}@example.com>\r\n\r\nHello {number}\r\n"
+    ).encode()
+
+async def next_new(queue, timeout):
+
+    # UIDs of the next new_messages event, or None if none arrives in time
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            event = await asyncio.wait_for(queue.get(), deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            return None
+        if event["type"] == "new_messages":
+            return sorted(email_data["uid"] for email_data in event["emails"])
+    return None
+
+async def wait_for_command(server, name, start):
+
+    while name not in server.commands[start:]:
+        await asyncio.sleep(0.01)
+
+results = []
+
+server = IMAPStandIn()
+server.start()
+server.add_message("INBOX", make_message(1))
+config.IMAP_SERVER = "127.0.0.1"
+config.IMAP_PORT = server.port
+config.IMAP_USERNAME = "watcher"
+config.IMAP_PASSWORD = "secret"
+
+# an update announced with a command response of the watcher's sync (not
+# during IDLE) still wakes it up right away
+async def watch():
+
+    watcher = MailWatcher(folders=["INBOX"], renew_interval=RENEW_INTERVAL, poll_interval=0.1)
+    queue = watcher.subscribe()
+    watcher.start()
+    try:
+        await wait_for_command(server, "IDLE", 0)
+
+        # message 2 wakes the watcher; message 3 arrives while it fetches message 2
+        server.command_delays["UID FETCH"] = 0.3
+        start = len(server.commands)
+        server.add_message("INBOX", make_message(2))
+        await wait_for_command(server, "UID FETCH", start)
+        server.add_message("INBOX", make_message(3))
+        first = await next_new(queue, 5)
+        server.command_delays.clear()
+
+        began = time.monotonic()
+        second = await next_new(queue, 5)
+        seconds = time.monotonic() - began
+
+        # message 4 is stored by another sync of the same account (a background
+        # round or /fetch) before the watcher hears of it
+        server.idle_paused = True
+        while server.commands[-1] != "IDLE":
+            await asyncio.sleep(0.01)
+        server.add_message("INBOX", make_message(4))
+        other = EmailReceiver("127.0.0.1", server.port, "watcher", "secret", use_ssl=False)
+        await asyncio.get_running_loop().run_in_executor(None, other.fetch_emails, "INBOX", 10)
+        other.disconnect()
+        server.idle_paused = False
+        third = await next_new(queue, 5)
+        return first, second, seconds, third
+    finally:
+        await watcher.close()
+
+first, second, seconds, third = asyncio.run(watch())
+ok = first == [2] and second == [3] and seconds < 2
+print(f"update during sync -> events {first}, {second} after {seconds:.2f}s -> {ok}")
+results.append(ok)
+
+ok = third == [4]
+print(f"stored by another sync -> event {third} -> {ok}")
+results.append(ok)
+
+# an update that arrives together with the IDLE continuation sits in
+# imaplib's read buffer, where select() cannot see it
+receiver = EmailReceiver("127.0.0.1", server.port, "buffered", "secret", use_ssl=False)
+receiver.connect()
+receiver.sync_folder("INBOX")
+server.add_message("INBOX", make_message(5))
+began = time.monotonic()
+updates = receiver.idle("INBOX", 3.0)
+seconds = time.monotonic() - began
+ok = b"* 5 EXISTS" in updates and seconds < 1
+print(f"buffered update -> {updates} after {seconds:.2f}s -> {ok}")
+results.append(ok)
+receiver.disconnect()
+
+server.stop()
+
+print(all(results))
@@ -0,0 +1,101 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# keep the message store in memory for this run
+os.environ["MESSAGE_STORE_PATH"] = ":memory:"
+
+from imap_standin import IMAPStandIn
+from email_receiver import EmailReceiver, StaleCursorError
+
+PAGE = 5
+
+def make_message(number, sender="Alice <alice@example.com>"):
+
+    return (
+        f"From: {sender}\r\nTo: bob@example.com\r\n"
+        f"Subject: Report {number}\r\nDate: Mon, 10 Feb 2026 14:35:22 +0000\r\n"
+        f"Message-ID: <{number}@example.com>\r\n\r\nHello {number}\r\n"
+    ).encode()
+
+def page(**kwargs):
+
+    # one page as /fetch builds it: emails plus the cursors of the next requests
+    start = len(server.commands)
+    emails = receiver.fetch_email_summaries("INBOX", limit=PAGE, **kwargs)
+    uids = [email["uid"] for email in emails]
+    before = EmailReceiver.page_cursor(emails[-1]["uidvalidity"], uids[-1]) if len(uids) == PAGE else None
+    after = EmailReceiver.page_cursor(emails[0]["uidvalidity"], uids[0]) if uids else kwargs.get("after_uid")
+    return uids, before, after, server.commands[start:]
+
+server = IMAPStandIn()
+server.start()
+for number in range(1, 24):
+    server.add_message("INBOX", make_message(number, "Carol <carol@example.com>" if number % 3 == 0 else "Alice <alice@example.com>"))
+
+receiver = EmailReceiver("127.0.0.1", server.port, "user", "secret", use_ssl=False)
+# sync only the first page so that scrolling has to extend the stored window
+receiver.sync_window = PAGE
+
+results = []
+
+# scroll down the whole mailbox, one page per request
+seen = []
+uids, cursor, newest, commands = page()
+seen.extend(uids)
+while cursor:
+    uids, cursor, _, commands = page(before_uid=cursor)
+    seen.extend(uids)
+    fetches = sum(1 for command in commands if command.endswith("FETCH"))
+    print(f"page {uids} {commands}")
+    results.append(fetches <= 1)
+ok = seen == list(range(23, 0, -1))
+print(f"scrolled {len(seen)} emails contiguously -> {ok}")
+results.append(ok)
+
+# scrolling back down is served from the store
+uids, cursor, _, _ = page()
+uids, _, _, commands = page(before_uid=cursor)
+ok = uids == [18, 17, 16, 15, 14] and not any(command.endswith("FETCH") for command in commands)
+print(f"cached page {uids} {commands} -> {ok}")
+results.append(ok)
+
+# poll for newer emails
+for number in range(24, 31):
+    server.add_message("INBOX", make_message(number))
+uids, _, next_newest, _ = page(after_uid=newest)
+uids_2, _, _, _ = page(after_uid=next_newest)
+empty, _, echoed, _ = page(after_uid=EmailReceiver.page_cursor(server.folders["INBOX"].uidvalidity, 30))
+ok = uids == [28, 27, 26, 25, 24] and uids_2 == [30, 29] and empty == [] and echoed is not None
+print(f"newer {uids} then {uids_2}, none after 30 -> {ok}")
+results.append(ok)
+
+# filtered listings page the same way
+uids, cursor, _, _ = page(filters={"from_addr": "carol"})
+uids_2, cursor_2, _, _ = page(filters={"from_addr": "carol"}, before_uid=cursor)
+ok = uids == [21, 18, 15, 12, 9] and uids_2 == [6, 3] and cursor_2 is None
+print(f"filtered {uids} then {uids_2} -> {ok}")
+results.append(ok)
+
+# malformed and stale cursors
+try:
+    EmailReceiver.decode_cursor("not a cursor")
+    ok = False
+except ValueError:
+    ok = True
+server.reset_uidvalidity("INBOX")
+try:
+    page(before_uid=cursor)
+    ok = False
+except StaleCursorError:
+    pass
+print(f"malformed and stale cursors rejected -> {ok}")
+results.append(ok)
+
+receiver.disconnect()
+server.stop()
+
+print(all(results))
@@ -0,0 +1,61 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# keep the message store in memory for this run
+os.environ["MESSAGE_STORE_PATH"] = ":memory:"
+
+from imap_standin import IMAPStandIn
+from email_receiver import EmailReceiver
+
+def make_message(number, sender, level=None, day=10, body="Hello"):
+
+    headers = (
+        f"From: {sender}\r\nTo: bob@example.com\r\n"
+        f"Subject: Report {number}\r\nDate: Mon, {day} Feb 2026 14:35:22 +0000\r\n"
+        f"Message-ID: <{number}@example.com>\r\n"
+    )
+    if level:
+        headers += f"X-Quantum-Encryption: true\r\nX-Quantum-Security-Level: {level}\r\n"
+    return (headers + f"\r\n{body} {number}\r\n").encode()
+
+server = IMAPStandIn()
+server.start()
+server.add_message("INBOX", make_message(1, "Alice <alice@example.com>", "L1", day=2))
+server.add_message("INBOX", make_message(2, "Carol <carol@example.com>", "L3", day=5))
+server.add_message("INBOX", make_message(3, "Alice <alice@example.com>", "L3", day=12))
+server.add_message("INBOX", make_message(4, "Alice <alice@example.com>", day=20, body="Grüße " + "x" * 2000))
+server.add_message("INBOX", make_message(5, "Dave <dave@example.com>", "L2", day=25))
+
+receiver = EmailReceiver("127.0.0.1", server.port, "user", "secret", use_ssl=False)
+
+CASES = [
+    ({"security_level": "L3"}, [3, 2]),
+    ({"from_addr": "alice", "security_level": "L3"}, [3]),
+    ({"since": "2026-02-05", "before": "2026-02-21"}, [4, 3, 2]),
+    ({"encrypted": False}, [4]),
+    ({"larger": 1000}, [4]),
+    ({"text": "grüße"}, [4]),
+    ({"text": "grüße", "from_addr": "carol"}, []),
+    ({"subject": 'Report "5"'}, []),
+    ({}, [5, 4, 3, 2, 1]),
+    ({"security_level": "L3"}, [3, 2]),
+]
+
+results = []
+for filters, expected in CASES:
+
+    start = len(server.commands)
+    summaries = receiver.fetch_email_summaries("INBOX", limit=50, filters=filters)
+    uids = [summary["uid"] for summary in summaries]
+    ok = uids == expected
+    print(f"{str(filters):55} -> {uids} {server.commands[start:]} {ok}")
+    results.append(ok)
+
+receiver.disconnect()
+server.stop()
+
+print(all(results))
@@ -0,0 +1,79 @@
+import os
+import sys
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# keep the message store in memory for this run
+os.environ["MESSAGE_STORE_PATH"] = ":memory:"
+
+from imap_standin import IMAPStandIn
+from email_receiver import EmailReceiver
+
+TEXT = "Grüße aus Köln, the report is attached"
+
+def headers(message, number):
+
+    message["From"] = "Alice <alice@example.com>"
+    message["To"] = "bob@example.com"
+    message["Subject"] = f"Message {number}"
+    message["Date"] = "Mon, 10 Feb 2026 14:35:22 +0000"
+    return message.as_bytes()
+
+def single(number):
+
+    return headers(MIMEText(TEXT, "plain", "utf-8"), number)
+
+def alternative(number):
+
+    message = MIMEMultipart("alternative")
+    message.attach(MIMEText(TEXT, "plain", "utf-8"))
+    message.attach(MIMEText(f"<p>{TEXT}</p>", "html", "utf-8"))
+    return headers(message, number)
+
+def nested(number, charset):
+
+    # multipart/mixed around multipart/alternative: section 1 is a multipart
+    body = MIMEMultipart("alternative")
+    body.attach(MIMEText(TEXT, "plain", charset))
+    body.attach(MIMEText(f"<p>{TEXT}</p>", "html", charset))
+    message = MIMEMultipart("mixed")
+    message.attach(body)
+    message.attach(MIMEApplication(b"\x00" * 4096, Name="report.bin"))
+    return headers(message, number)
+
+MESSAGES = [single(1), alternative(2), nested(3, "utf-8"), nested(4, "iso-8859-1"), nested(5, "utf-8")]
+
+results = []
+
+server = IMAPStandIn()
+server.start()
+for raw in MESSAGES:
+    server.add_message("INBOX", raw)
+
+receiver = EmailReceiver("127.0.0.1", server.port, "snippets", "secret", use_ssl=False)
+receiver.connect()
+
+start = len(server.commands)
+summaries = receiver.fetch_email_summaries("INBOX", limit=10, snippet_length=200)
+commands = server.commands[start:]
+snippets = {summary["uid"]: summary["snippet"] for summary in summaries}
+
+# every structure previews its text part, decoded with that part's charset
+ok = len(snippets) == 5 and all(snippet == TEXT for snippet in snippets.values())
+print(f"snippets -> {sorted(snippets.items())} -> {ok}")
+results.append(ok)
+
+# nested messages cost one extra UID FETCH per distinct section (1.1 here)
+ok = commands.count("UID FETCH") == 1 and commands.count("FETCH") == 1
+print(f"commands -> {commands} -> {ok}")
+results.append(ok)
+
+receiver.disconnect()
+server.stop()
+
+print(all(results))
@@ -0,0 +1,135 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+# keep the message store in memory for this run
+os.environ["MESSAGE_STORE_PATH"] = ":memory:"
+
+from imap_standin import IMAPStandIn
+from email_receiver import EmailReceiver
+from sync_scheduler import SyncScheduler
+
+def make_message(number):
+
+    return (
+        f"From: Alice <alice@example.com>\r\nTo: bob@example.com\r\n"
+        f"Subject: Report {number}\r\nDate: Mon, 10 Feb 2026 14:35:22 +0000\r\n"
+        f"Message-ID: <{number}@example.com>\r\n\r\nHello {number}\r\n"
+    ).encode()
+
+def make_server(delays):
+
+    # one server per account; every folder holds a few messages and takes `delay` seconds to SELECT
+    server = IMAPStandIn()
+    server.start()
+    for folder, delay in delays.items():
+        if folder not in server.folders:
+            server.create_folder(folder)
+        for number in range(5):
+            server.add_message(folder, make_message(number))
+        server.select_delays[folder] = delay
+    return server
+
+class Recorder:
+
+    # wraps receiver.sync_folder to record start order and peak concurrency
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.order = []
+        self.running = 0
+        self.peak = 0
+
+    def wrap(self, receiver):
+        sync_folder = receiver.sync_folder
+        def recorded(folder):
+            with self.lock:
+                self.order.append((receiver.username, folder))
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            try:
+                return sync_folder(folder)
+            finally:
+                with self.lock:
+                    self.running -= 1
+        receiver.sync_folder = recorded
+
+def statuses(report):
+
+    return {(account, folder): result["status"] for account, folders in report.items() for folder, result in folders.items()}
+
+DELAYS_A = {"INBOX": 0.2, "Archive": 0.6, "Sent": 0.4}
+DELAYS_B = {"INBOX": 0.2, "Archive": 0.5}
+server_a, server_b = make_server(DELAYS_A), make_server(DELAYS_B)
+receiver_a = EmailReceiver("127.0.0.1", server_a.port, "alice", "secret", use_ssl=False, pool_size=3)
+receiver_b = EmailReceiver("127.0.0.1", server_b.port, "bob", "secret", use_ssl=False, pool_size=2)
+recorder = Recorder()
+recorder.wrap(receiver_a)
+recorder.wrap(receiver_b)
+
+scheduler = SyncScheduler(max_concurrency=8, backoff=0.2, max_backoff=1.0, retries=3)
+scheduler.add_account(receiver_a, list(DELAYS_A), connections=3)
+scheduler.add_account(receiver_b, list(DELAYS_B), connections=2)
+
+results = []
+
+# baseline round: wall time follows the slowest folder, not the sum
+serial = sum(DELAYS_A.values()) + sum(DELAYS_B.values())
+report = scheduler.sync_all()
+ok = set(statuses(report).values()) == {"ok"} and scheduler.last_round_seconds < serial / 2
+print(f"round {scheduler.last_round_seconds:.2f}s (serial {serial:.1f}s, slowest {max(DELAYS_A.values())}s) peak={recorder.peak} -> {ok}")
+results.append(ok)
+
+# incremental round picks up new mail
+server_a.add_message("Sent", make_message(99))
+report = scheduler.sync_all()
+ok = report["alice"]["Sent"]["new"] == 1 and report["alice"]["INBOX"]["new"] == 0
+print(f"new mail {report['alice']['Sent']} -> {ok}")
+results.append(ok)
+
+# global cap, per-account budget and priorities
+scheduler.max_concurrency = 2
+scheduler.accounts["alice"].connections = 1
+scheduler.set_active("Sent", account="alice")
+recorder.order.clear()
+recorder.peak = 0
+scheduler.sync_all()
+alice_order = [folder for account, folder in recorder.order if account == "alice"]
+ok = recorder.peak <= 2 and alice_order == ["Sent", "INBOX", "Archive"] and recorder.order[0] == ("alice", "Sent")
+print(f"order {recorder.order} peak={recorder.peak} -> {ok}")
+results.append(ok)
+
+# throttled account backs off and retries; the other account is unaffected
+scheduler.max_concurrency = 8
+server_b.throttle_selects = 2
+started = time.monotonic()
+report = scheduler.sync_all(["alice", "bob"])
+ok = (
+    set(statuses(report).values()) == {"ok"}
+    and max(result["attempts"] for result in report["bob"].values()) > 1
+    and scheduler.accounts["bob"].throttled == 2
+    and scheduler.accounts["alice"].throttled == 0
+)
+print(f"throttled {report['bob']} in {time.monotonic() - started:.2f}s -> {ok}")
+results.append(ok)
+
+# a server that keeps throttling gives up after the retries
+server_b.throttle_selects = 100
+report = scheduler.sync_all(["bob"])
+ok = set(statuses(report).values()) == {"throttled"} and list(report) == ["bob"]
+print(f"gave up {statuses(report)} -> {ok}")
+results.append(ok)
+server_b.throttle_selects = 0
+
+print(scheduler.stats())
+
+receiver_a.disconnect()
+receiver_b.disconnect()
+server_a.stop()
+server_b.stop()
+
+print(all(results))
@@ -0,0 +1,51 @@
+import sys
+import time
+import secrets
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from xor_engine import XorStream, xor_bytes
+
+SIZES = [
+    ("1 KB", 1024),
+    ("1 MB", 1024 * 1024),
+    ("50 MB", 50 * 1024 * 1024),
+]
+
+def legacy_xor(data, key_bytes):
+
+    # byte-at-a-time XOR, as previously done in _encrypt_otp/_decrypt_otp
+    length = len(data)
+    if len(key_bytes) < length:
+        key_bytes = (key_bytes * ((length // len(key_bytes)) + 1))[:length]
+    return bytes([data[i] ^ key_bytes[i] for i in range(length)])
+
+def incremental_xor(data, key_bytes, piece_size=1024 * 1024):
+
+    # feed the engine in 1 MB pieces, as a streaming caller would
+    stream = XorStream(key_bytes)
+    return b"".join(
+        stream.update(data[i:i + piece_size]) for i in range(0, len(data), piece_size)
+    )
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+print(f"{'size':>8} {'legacy (s)':>12} {'one-shot (s)':>14} {'incremental (s)':>16} {'speedup':>9}")
+
+for label, size in SIZES:
+    data = secrets.token_bytes(size)
+    key_bytes = secrets.token_bytes(size)
+
+    expected, legacy_time = timed(legacy_xor, data, key_bytes)
+    one_shot, one_shot_time = timed(xor_bytes, data, key_bytes)
+    incremental, incremental_time = timed(incremental_xor, data, key_bytes)
+
+    assert one_shot == expected
+    assert incremental == expected
+
+    speedup = legacy_time / one_shot_time if one_shot_time else float("inf")
+    print(f"{label:>8} {legacy_time:>12.4f} {one_shot_time:>14.4f} {incremental_time:>16.4f} {speedup:>8.1f}x")